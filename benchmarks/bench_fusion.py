@@ -0,0 +1,56 @@
+"""Per-element overhead of nested versus fused Pipelines.
+
+Run with `python benchmarks/bench_fusion.py`.
+"""
+
+import argparse
+import timeit
+
+import imchain.operator as iop
+
+
+def _inc(x):
+    return x + 1
+
+
+def _even(x):
+    return x % 2 == 0
+
+
+def _ignore(x):
+    pass
+
+
+def build_chain(depth: int) -> iop.Pipeline:
+    """A chain of `depth` cheap stateless stages, cycling Map/Effect/Filter."""
+    stages = [iop.Map(_inc), iop.Effect(_ignore), iop.Filter(_even), iop.Map(_inc)]
+    return iop.Pipeline(*(stages[i % len(stages)] for i in range(depth)))
+
+
+def _best_of(op: iop.Operator, source, repeat: int) -> float:
+    return min(timeit.repeat(lambda: op.drain(source), number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    args = parser.parse_args()
+
+    source = range(args.items)
+    print(f"{'depth':>5}  {'nested ns/elem':>14}  {'fused ns/elem':>13}  {'speedup':>7}")
+    for depth in args.depths:
+        nested = build_chain(depth)
+        fused = nested.compile()
+        assert nested.process(source) == fused.process(source)
+
+        t_nested = _best_of(nested, source, args.repeat)
+        t_fused = _best_of(fused, source, args.repeat)
+        ns_nested = 1e9 * t_nested / args.items
+        ns_fused = 1e9 * t_fused / args.items
+        print(f"{depth:>5}  {ns_nested:>14.1f}  {ns_fused:>13.1f}  {t_nested / t_fused:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
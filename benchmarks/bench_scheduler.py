@@ -0,0 +1,97 @@
+"""PoolMap throughput under skewed task latencies.
+
+Compares the completion-queue scheduler against the previous `cf.wait` based one,
+for a few latency distributions built on `WaitData` and `WaitRandom`.
+
+Run with `python benchmarks/bench_scheduler.py`.
+"""
+
+import argparse
+import collections
+import concurrent.futures as cf
+import random
+import time
+
+import imchain.operator as iop
+import imchain.operator.util as iopu
+
+
+class LegacyPoolMap(iop.PoolMap):
+    """The previous ordered scheduler: rescans in-flight futures after every `cf.wait`."""
+
+    def _handle(self, chunks, executor, task, sizer):
+        queue = collections.deque()
+        not_done = set()
+        for chunk in chunks:
+            fut = self.transport.submit(executor, task, chunk)
+            queue.append(fut)
+            not_done.add(fut)
+            if len(not_done) < self.pool_size:
+                continue
+
+            _done, not_done = cf.wait(not_done, return_when=cf.FIRST_COMPLETED)
+            while queue and queue[0].done():
+                yield from self.transport.result(queue.popleft())
+            not_done = {f for f in not_done if not f.done()}
+
+        while queue:
+            yield from self.transport.result(queue.popleft())
+
+
+def lognormal(n, rng):
+    """Mostly ~1ms tasks, with a heavy tail."""
+    return [min(rng.lognormvariate(-7, 1.0), 0.1) for _ in range(n)]
+
+
+def head_of_line(n, rng):
+    """Cheap tasks, with every 25th one taking 50ms."""
+    return [0.05 if i % 25 == 0 else 0.0005 for i in range(n)]
+
+
+def uniform(n, rng):
+    return [rng.uniform(0, 0.004) for _ in range(n)]
+
+
+SCENARIOS = {"lognormal": lognormal, "head-of-line": head_of_line, "uniform": uniform}
+
+
+def throughput(op: iop.Operator, source) -> float:
+    start = time.perf_counter()
+    op.drain(source)
+    return len(source) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=314)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    n = args.pool_size
+    configs = {
+        "legacy": lambda: LegacyPoolMap(iopu.WaitData(), pool_size=n),
+        "default": lambda: iop.PoolMap(iopu.WaitData(), pool_size=n),
+        "inflight=2x": lambda: iop.PoolMap(iopu.WaitData(), pool_size=n, max_inflight=2 * n),
+        "window=8x": lambda: iop.PoolMap(iopu.WaitData(), pool_size=n, reorder_window=8 * n),
+        "unordered": lambda: iop.UnorderedPoolMap(iopu.WaitData(), pool_size=n),
+    }
+
+    print(f"{'scenario':<14}" + "".join(f"{name:>24}" for name in configs))
+    for scenario, make_source in SCENARIOS.items():
+        source = make_source(args.items, rng)
+        row = []
+        for make_op in configs.values():
+            op = make_op()
+            op.executor_cls = cf.ThreadPoolExecutor
+            row.append(throughput(op, source))
+        print(f"{scenario:<14}" + "".join(f"{rate:>18.0f} it/s" for rate in row))
+
+    # WaitRandom sleeps up to a second per element, so only run a handful.
+    op = iop.PoolMap(iopu.WaitRandom(), pool_size=n, executor_cls=cf.ThreadPoolExecutor)
+    print(f"{'WaitRandom':<14}{throughput(op, list(range(4 * n))):>18.1f} it/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""Benchmark suite for imchain operators.
+
+Covers per-element overhead of deep chains, PoolMap throughput across pool sizes and
+executor types, and memory high-water marks for image-sized payloads. Results can be
+saved as a baseline and compared against later.
+
+Examples:
+
+    python benchmarks/suite.py --save baseline.json
+    python benchmarks/suite.py --compare baseline.json --fail-on-regression
+    python benchmarks/suite.py --filter poolmap
+"""
+
+import argparse
+import concurrent.futures as cf
+import dataclasses
+import json
+import sys
+import time
+import timeit
+import tracemalloc
+
+import imchain.operator as iop
+import imchain.operator.util as iopu
+
+# Metrics where a larger value is better. Everything else is "lower is better".
+HIGHER_IS_BETTER = frozenset({"items_per_s"})
+
+BENCHMARKS = {}
+
+
+@dataclasses.dataclass
+class Result:
+    name: str
+    metrics: dict
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def _inc(x):
+    return x + 1
+
+
+def _ignore(x):
+    pass
+
+
+def _even(x):
+    return x % 2 == 0
+
+
+def _invert(x):
+    return 255 - x
+
+
+def _chain(depth):
+    stages = [iop.Map(_inc), iop.Effect(_ignore), iop.Filter(_even), iop.Map(_inc)]
+    return iop.Pipeline(*(stages[i % len(stages)] for i in range(depth)))
+
+
+def _best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def _peak_bytes(func):
+    """Peak Python-tracked allocation (including NumPy buffers) while running `func`."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# ---- Per-element overhead ----
+
+
+def _overhead(depth, compiled, items, repeat):
+    chain = _chain(depth)
+    if compiled:
+        chain = chain.compile()
+    source = range(items)
+    elapsed = _best_time(lambda: chain.drain(source), repeat)
+    return {"ns_per_item": 1e9 * elapsed / items}
+
+
+for _depth in (1, 5, 10, 20):
+    for _compiled in (False, True):
+        _name = f"overhead/depth={_depth}/{'compiled' if _compiled else 'nested'}"
+        benchmark(_name)(
+            lambda items, repeat, d=_depth, c=_compiled: _overhead(d, c, items, repeat)
+        )
+
+
+def _send(depth, items, repeat):
+    chain = _chain(depth)
+    n = items // 10
+    elapsed = _best_time(lambda: [chain.send_to_tuple(x) for x in range(n)], repeat)
+    return {"ns_per_item": 1e9 * elapsed / n}
+
+
+for _depth in (1, 5, 20):
+    benchmark(f"overhead/send/depth={_depth}")(
+        lambda items, repeat, d=_depth: _send(d, items, repeat)
+    )
+
+
+@benchmark("overhead/buffer+chain")
+def _buffer_chain(items, repeat):
+    chain = iop.Buffer(16) | iop.Chain()
+    source = range(items)
+    elapsed = _best_time(lambda: chain.drain(source), repeat)
+    return {"ns_per_item": 1e9 * elapsed / items}
+
+
+# ---- PoolMap throughput ----
+
+EXECUTORS = {"thread": cf.ThreadPoolExecutor, "process": cf.ProcessPoolExecutor}
+
+
+def _poolmap(executor, pool_size, work, items, repeat):
+    # Pool throughput doesn't need as many elements as per-element overhead does.
+    n = max(items // 100, 4 * pool_size)
+    op = iop.PoolMap(work, pool_size=pool_size, executor_cls=EXECUTORS[executor])
+    with op:
+        op.drain(range(pool_size))  # Warm up the workers.
+        elapsed = _best_time(lambda: op.drain(range(n)), repeat)
+    return {"items_per_s": n / elapsed}
+
+
+for _executor in EXECUTORS:
+    for _pool_size in (1, 2, 4, 8):
+        benchmark(f"poolmap/sleep/{_executor}/pool_size={_pool_size}")(
+            lambda items, repeat, e=_executor, p=_pool_size: _poolmap(
+                e, p, iopu.Wait(0.002), items, repeat
+            )
+        )
+        benchmark(f"poolmap/cpu/{_executor}/pool_size={_pool_size}")(
+            lambda items, repeat, e=_executor, p=_pool_size: _poolmap(
+                e, p, iopu.Spin(0.002), items, repeat
+            )
+        )
+
+
+# ---- Image-sized payloads ----
+
+
+def _arrays(n):
+    return iopu.random_arrays(n, shape=(1024, 1024, 3))
+
+
+def _payload(transport, items, repeat):
+    n = max(items // 2000, 8)
+    # Generate the frames up front, so only the transfer is timed.
+    frames = list(_arrays(n))
+    op = iop.PoolMap(_invert, pool_size=4, transport=transport)
+    with op:
+        op.drain(frames[:4])
+        elapsed = _best_time(lambda: op.drain(frames), repeat)
+        peak = _peak_bytes(lambda: op.drain(frames))
+    return {"items_per_s": n / elapsed, "peak_bytes": peak}
+
+
+@benchmark("payload/poolmap/pickle")
+def _payload_pickle(items, repeat):
+    return _payload(None, items, repeat)
+
+
+@benchmark("payload/poolmap/shared_memory")
+def _payload_shm(items, repeat):
+    transport = iop.SharedMemoryTransport()
+    try:
+        return _payload(transport, items, repeat)
+    finally:
+        transport.close()
+
+
+def _normalize(x):
+    # Several small NumPy calls, whose per-call overhead dominates for small elements.
+    x = x.astype("float32") * (1 / 255)
+    return (x - x.mean(axis=-1, keepdims=True)) / (x.std(axis=-1, keepdims=True) + 1e-6)
+
+
+def _vectorized(op, items, repeat):
+    n = max(items // 10, 64)
+    frames = list(iopu.random_arrays(n, shape=(32,)))
+    elapsed = _best_time(lambda: op.drain(frames), repeat)
+    return {"items_per_s": n / elapsed}
+
+
+@benchmark("vectorized/map")
+def _vectorized_map(items, repeat):
+    return _vectorized(iop.Map(_normalize), items, repeat)
+
+
+@benchmark("vectorized/batch_map")
+def _vectorized_batch_map(items, repeat):
+    return _vectorized(iop.BatchMap(_normalize, 32), items, repeat)
+
+
+@benchmark("memory/buffer")
+def _memory_buffer(items, repeat):
+    chain = iop.Buffer(8) | iop.Chain()
+    return {"peak_bytes": _peak_bytes(lambda: chain.drain(_arrays(32)))}
+
+
+@benchmark("memory/poolmap/reorder_window")
+def _memory_window(items, repeat):
+    # A slow head element makes completed results pile up behind it.
+    op = iop.PoolMap(
+        iopu.MakeArray((1024, 1024, 3)) | iopu.Wait(0.001),
+        pool_size=4,
+        executor_cls=cf.ThreadPoolExecutor,
+        reorder_window=8,
+    )
+    return {"peak_bytes": _peak_bytes(lambda: op.drain(range(64)))}
+
+
+# ---- Running and comparing ----
+
+
+def run(pattern, items, repeat):
+    results = []
+    for name, func in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        start = time.perf_counter()
+        metrics = func(items, repeat)
+        print(f"{name:<45} {_format(metrics)}  ({time.perf_counter() - start:.1f}s)")
+        results.append(Result(name, metrics))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print changes relative to `baseline`, returning the names of regressed metrics."""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'metric':<12} {'baseline':>12} {'current':>12} {'change':>8}")
+    for result in results:
+        for metric, value in result.metrics.items():
+            base = baseline.get(result.name, {}).get(metric)
+            if not base:
+                continue
+
+            change = value / base - 1
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            if flag:
+                regressions.append(f"{result.name}:{metric}")
+            print(
+                f"{result.name:<45} {metric:<12} {base:>12.4g} {value:>12.4g}"
+                f" {100 * change:>+7.1f}%{flag}"
+            )
+    return regressions
+
+
+def _format(metrics):
+    return ", ".join(f"{key}={value:.4g}" for key, value in metrics.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--filter", default="", help="Only run benchmarks containing this.")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Write results to this JSON file.")
+    parser.add_argument("--compare", help="Compare results against this JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Regression tolerance.")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.items, args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({r.name: r.metrics for r in results}, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"\n{len(regressions)} regression(s).")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,64 @@
 __all__ = [
+    "AsyncMap",
+    "AsyncOperator",
+    "BatchMap",
+    "Broadcast",
     "Buffer",
+    "Cache",
+    "CacheStats",
     "Chain",
+    "Checkpoint",
     "Effect",
     "Filter",
     "FlatMap",
+    "FrameSink",
+    "FrameSource",
     "Map",
     "Noop",
     "Operator",
     "Pipeline",
     "PoolMap",
+    "PoolStats",
+    "Prefetch",
+    "Profile",
+    "RemoteExecutor",
+    "RemotePoolMap",
+    "Seekable",
+    "ShardedPipe",
+    "SharedMemoryTransport",
     "Skip",
     "Slice",
+    "Stage",
+    "StageStats",
     "Take",
+    "Tee",
+    "Tile",
+    "Tracer",
+    "Transport",
+    "UnorderedAsyncMap",
     "UnorderedPoolMap",
+    "UnorderedRemotePoolMap",
+    "Untile",
     "Where",
+    "Window",
     "util",
 ]
 from . import util
+from .aio import AsyncMap, UnorderedAsyncMap
 from .basics import Effect, Filter, Map, Noop, Where
-from .core import Operator, Pipeline
-from .meta import Buffer, Chain, FlatMap
+from .batch import BatchMap
+from .cache import Cache, CacheStats
+from .checkpoint import Checkpoint
+from .core import AsyncOperator, Operator, Pipeline
+from .fanout import Broadcast, Tee
+from .frames import FrameSink, FrameSource
+from .meta import Buffer, Chain, FlatMap, Window
 from .pool import PoolMap, UnorderedPoolMap
-from .slice import Skip, Slice, Take
+from .profile import PoolStats, Profile, StageStats
+from .remote import RemoteExecutor, RemotePoolMap, UnorderedRemotePoolMap
+from .shard import ShardedPipe
+from .slice import Seekable, Skip, Slice, Take
+from .stage import Prefetch, Stage
+from .tile import Tile, Untile
+from .trace import Tracer
+from .transport import SharedMemoryTransport, Transport
@@ -0,0 +1,128 @@
+"""Adapters between synchronous generators and asynchronous generators."""
+
+import asyncio
+import threading
+
+import typing_extensions as tp
+
+T = tp.TypeVar("T")
+U = tp.TypeVar("U")
+
+_DONE = object()
+
+
+async def _anext(aiterator: tp.AsyncIterator[T]) -> T:
+    return await aiterator.__anext__()
+
+
+async def aiter_sync(iterable: tp.Iterable[T]) -> tp.AsyncGenerator[T, None]:
+    """Iterate a synchronous iterable from async code, pulling each item in a thread.
+
+    Upstream synchronous work thus overlaps with whatever else the event loop is doing.
+    """
+    iterator = iter(iterable)
+    try:
+        while True:
+            item = await asyncio.to_thread(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+async def threaded_apipe(
+    pipe: tp.Callable[[tp.Iterable[T]], tp.Iterable[U]],
+    aiterable: tp.AsyncIterable[T],
+    *,
+    maxsize: int = 1,
+) -> tp.AsyncGenerator[U, None]:
+    """Run a synchronous `pipe` over an async iterable without blocking the event loop.
+
+    `pipe` runs in its own thread. It pulls its inputs from `aiterable` on the event
+    loop, and hands back at most `maxsize` outputs ahead of the consumer.
+    """
+    loop = asyncio.get_running_loop()
+    aiterator = aiterable.__aiter__()
+    outputs: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(maxsize)
+    stop = threading.Event()
+
+    def pull():
+        while not stop.is_set():
+            try:
+                yield asyncio.run_coroutine_threadsafe(_anext(aiterator), loop).result()
+            except StopAsyncIteration:
+                return
+
+    def emit(done, value):
+        try:
+            loop.call_soon_threadsafe(outputs.put_nowait, (done, value))
+        except RuntimeError:
+            # The loop is closed; nobody is listening anymore.
+            pass
+
+    def work():
+        results = iter(pipe(pull()))
+        try:
+            for item in results:
+                while not slots.acquire(timeout=0.05):
+                    if stop.is_set():
+                        return
+                if stop.is_set():
+                    return
+                emit(False, item)
+            emit(True, None)
+        except BaseException as exc:
+            emit(True, exc)
+        finally:
+            close = getattr(results, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    try:
+        while True:
+            done, value = await outputs.get()
+            if done:
+                if value is not None:
+                    raise value
+                return
+            slots.release()
+            yield value
+    finally:
+        stop.set()
+        await asyncio.to_thread(thread.join)
+        aclose = getattr(aiterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def drive_async(
+    apipe: tp.Callable[[tp.AsyncIterable[T]], tp.AsyncIterator[U]],
+    iterable: tp.Iterable[T],
+) -> tp.Generator[U, None, None]:
+    """Run an async `apipe` over a synchronous iterable, as a synchronous generator.
+
+    A private event loop is driven from the consumer's thread each time it asks for an
+    item, so nothing runs ahead of the consumer. This can't be used from a thread which
+    is already running an event loop; use `apipe` there instead.
+    """
+    loop = asyncio.new_event_loop()
+    aiterator = apipe(aiter_sync(iterable)).__aiter__()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(_anext(aiterator))
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(aiterator, "aclose", None)
+        if aclose is not None:
+            loop.run_until_complete(aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
@@ -1,6 +1,7 @@
 import functools
 import inspect
 import logging
+import sys
 
 import typing_extensions as tp
 
@@ -64,3 +65,11 @@ def check_callable(caller, arg, *, arg_name="func"):
 
     msg = f"Expected {caller.__class__.__name__}.{arg_name} to be a callable, but got {type(arg)}."
     raise ValueError(msg)
+
+
+def sizeof(obj) -> int:
+    """Approximate size of `obj` in bytes: `nbytes` for arrays, else `sys.getsizeof`."""
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(obj)
@@ -0,0 +1,70 @@
+import asyncio
+import collections
+
+import typing_extensions as tp
+
+from ._helpers import check_callable
+from .core import AsyncOperator
+
+T = tp.TypeVar("T")
+U = tp.TypeVar("U")
+
+__all__ = ("AsyncMap", "UnorderedAsyncMap")
+
+
+class AsyncMap(AsyncOperator[T, U]):
+    """Applies a coroutine function to each element, with up to `concurrency` at once.
+
+    Results are yielded in iteration order. This is the asyncio counterpart to `PoolMap`,
+    for I/O-bound work such as fetching images over the network.
+
+    Examples:
+        >>> async def fetch(url): ...
+        >>> chain = iop.Map(make_url) | iop.AsyncMap(fetch, concurrency=16) | iop.Map(decode)
+        >>> images = chain.process(ids)  # or: `async for image in chain.apipe(aids)`
+    """
+
+    def __init__(self, func: tp.Callable[[T], tp.Awaitable[U]], *, concurrency: int = 8) -> None:
+        check_callable(self, func)
+        if concurrency < 1:
+            msg = f"Expected `concurrency` to be positive, but got {concurrency}."
+            raise ValueError(msg)
+
+        self.func = func
+        self.concurrency = concurrency
+
+    async def apipe(self, aiterable: tp.AsyncIterable[T]) -> tp.AsyncGenerator[U, None]:
+        pending: collections.deque[asyncio.Future[U]] = collections.deque()
+        try:
+            async for elem in aiterable:
+                pending.append(asyncio.ensure_future(self.func(elem)))
+                if len(pending) >= self.concurrency:
+                    yield await pending.popleft()
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+
+class UnorderedAsyncMap(AsyncMap[T, U]):
+    """An AsyncMap variant which yields results as they complete."""
+
+    async def apipe(self, aiterable: tp.AsyncIterable[T]) -> tp.AsyncGenerator[U, None]:
+        pending: set[asyncio.Future[U]] = set()
+        try:
+            async for elem in aiterable:
+                pending.add(asyncio.ensure_future(self.func(elem)))
+                if len(pending) < self.concurrency:
+                    continue
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+
+            for fut in asyncio.as_completed(pending):
+                yield await fut
+        finally:
+            for fut in pending:
+                fut.cancel()
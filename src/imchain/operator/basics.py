@@ -1,3 +1,6 @@
+import queue
+import threading
+
 import typing_extensions as tp
 
 from ._helpers import check_callable, zero_or_one_args
@@ -12,16 +15,38 @@ __all__ = ("Effect", "Filter", "Map", "Noop")
 # TODO: implement __str__ and __repr__ for everything.
 
 
+def _tap(func: tp.Callable[[T], tp.Any]) -> tp.Callable[[T], T]:
+    def tapped(item):
+        func(item)
+        return item
+
+    return tapped
+
+
 class Map(Operator[T, U]):
-    """Applies a function to each element of an iterable."""
+    """Applies a function to each element of an iterable.
+
+    Pass `pure=True` if `func` has no side effects. A Pipeline may then apply a later
+    `Slice` (or `Take`, `Skip`) before this Map, so skipped elements are never computed.
+    """
 
-    def __init__(self, func: tp.Callable[[T], U]) -> None:
+    def __init__(self, func: tp.Callable[[T], U], *, pure: bool = False) -> None:
         check_callable(self, func)
         self.func = func
+        self.pure = pure
 
     def pipe(self, iterable):
         yield from map(self.func, iterable)
 
+    def _fuse(self, iterable):
+        return map(self.func, iterable)
+
+    def _apply(self, value):
+        return (self.func(value),)
+
+    def _apply_many(self, values):
+        return list(map(self.func, values))
+
 
 class Filter(Operator[T, T]):
     """Filter out one or more elements of an iterable."""
@@ -32,6 +57,16 @@ class Filter(Operator[T, T]):
     def pipe(self, iterable):
         yield from filter(self.predicate, iterable)
 
+    def _fuse(self, iterable):
+        return filter(self.predicate, iterable)
+
+    def _apply(self, value):
+        keep = value if self.predicate is None else self.predicate(value)
+        return (value,) if keep else ()
+
+    def _apply_many(self, values):
+        return list(filter(self.predicate, values))
+
 
 class Effect(Operator[T, T]):
     """Perform a side-effect for each element of an iterable."""
@@ -46,19 +81,115 @@ class Effect(Operator[T, T]):
             self.func(item)
             yield item
 
+    def _fuse(self, iterable):
+        return map(_tap(self.func), iterable)
+
+    def _apply(self, value):
+        self.func(value)
+        return (value,)
+
+    def _apply_many(self, values):
+        values = list(values)
+        for value in values:
+            self.func(value)
+        return values
+
 
 class Noop(Operator[T, T]):
     """A do-nothing operator for testing or dynamic replacement of other operators."""
 
+    pure = True
+
     def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[T, None, None]:
         yield from iterable
 
+    def _fuse(self, iterable):
+        return iterable
+
+    def _apply(self, value):
+        return (value,)
+
+    def _apply_many(self, values):
+        return list(values)
+
+
+# Sent by a Where branch when its operator asks for its next element.
+_READY = object()
+
+
+class _Branch:
+    """A Where branch which isn't element-wise, running its operator in a thread.
+
+    Elements are handed over one at a time. Once the operator asks for its next element,
+    it has produced every output it will for the previous one, and the branch reports
+    that it's ready. Messages go onto the queue shared by the branches, as
+    `(idx, done, value)` with `value` either an output, `_READY`, or (when `done`) the
+    end of the branch or an error.
+    """
+
+    def __init__(self, op: Operator, idx: int, outputs: queue.Queue, stop) -> None:
+        self.idx = idx
+        self.inputs = queue.Queue(1)
+        self.ready = False
+        self.done = False
+        # Sequence number of the last element handed to the branch.
+        self.consumed = -1
+        self.thread = threading.Thread(target=self._run, args=(op, outputs, stop), daemon=True)
+        self.thread.start()
+
+    def send(self, seq: int, elem) -> None:
+        self.ready = False
+        self.consumed = seq
+        self.inputs.put((False, elem))
+
+    def end(self) -> None:
+        self.ready = False
+        self.inputs.put((True, None))
+
+    def _run(self, op, outputs, stop) -> None:
+        # The stage module imports this one.
+        from .stage import _get, _put
+
+        def inputs():
+            while _put(outputs, (self.idx, False, _READY), stop):
+                done, elem = _get(self.inputs, stop)
+                if done:
+                    return
+                yield elem
+
+        results = None
+        try:
+            results = op.pipe(inputs())
+            for item in results:
+                if not _put(outputs, (self.idx, False, item), stop):
+                    return
+            _put(outputs, (self.idx, True, None), stop)
+        except BaseException as exc:
+            _put(outputs, (self.idx, True, exc), stop)
+        finally:
+            close = getattr(results, "close", None)
+            if close is not None:
+                close()
+
 
 class Where(Operator[T, tp.Union[U, V]]):
     """Operator to switch an operation based on the result of a predicate function.
 
     Can be configured at init time or via a fluent interface.
 
+    Element-wise branches (e.g. `Map`) are sent each element in turn. Any other branch
+    runs in a thread of its own, fed through a single `pipe` call for the whole stream,
+    so stateful (e.g. `Buffer`, `Take`) and pooled operators work inside a branch. Each
+    element is read from the source only once the branch which takes it is ready for it.
+
+    By default, outputs are merged in input order: the next element is only read once
+    the branch has produced every output for the last one, and an output is yielded at
+    the position of the element its branch was processing when it produced it. For
+    operators which read ahead of their outputs (e.g. `PoolMap`), that can be later than
+    the element it came from, but never earlier; what a branch holds when the stream
+    ends (e.g. a partial `Buffer`) comes last. With `ordered=False`, the next element is
+    read without waiting for those outputs, which are yielded as soon as they're produced.
+
     Examples:
         >>> chain = Where(lambda x: x % 2 == 0).then(lambda x: x // 2).otherwise(lambda x: 3*x+1)
         >>> assert chain.process([0, 1, 2, 3]) == [0, 4, 2, 10]
@@ -69,8 +200,11 @@ class Where(Operator[T, tp.Union[U, V]]):
         predicate: tp.Callable[[T], bool],
         then: tp.Union[Operator[T, U], tp.Callable[[T], U], None] = None,
         otherwise: tp.Union[Operator[T, V], tp.Callable[[T], V], None] = None,
+        *,
+        ordered: bool = True,
     ):
         self.predicate = predicate
+        self.ordered = ordered
         self.then(then).otherwise(otherwise)
 
     def then(self, op: tp.Union[Operator[T, U], tp.Callable[[T], U], None]):
@@ -94,8 +228,72 @@ class Where(Operator[T, tp.Union[U, V]]):
         return self
 
     def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[tp.Union[U, V], None, None]:
-        for elem in iterable:
-            if self.predicate(elem):
-                yield from self.then_op.send_to_tuple(elem)
+        ops = (self.then_op, self.otherwise_op)
+        outputs = queue.Queue(1)
+        stop = threading.Event()
+        branches = [
+            None if op._elementwise else _Branch(op, idx, outputs, stop)
+            for idx, op in enumerate(ops)
+        ]
+        source = iter(iterable)
+        try:
+            for seq, elem in enumerate(source):
+                idx = 0 if self.predicate(elem) else 1
+                branch = branches[idx]
+                if branch is None:
+                    yield from ops[idx].send_to_tuple(elem)
+                    continue
+
+                yield from self._wait(branch, branches, outputs)
+                if branch.done:
+                    # E.g. a Take which has all it needs.
+                    continue
+                branch.send(seq, elem)
+                if self.ordered:
+                    # Merge the element's outputs before reading the next one.
+                    yield from self._wait(branch, branches, outputs)
+
+            # The source is exhausted; flush whatever the branches still hold (e.g. a
+            # partial Buffer), in order of the elements they last processed.
+            running = sorted((b for b in branches if b is not None), key=lambda b: b.consumed)
+            for branch in running:
+                yield from self._wait(branch, branches, outputs)
+                if not branch.done:
+                    branch.end()
+                if self.ordered:
+                    yield from self._wait(branch, branches, outputs)
+            for branch in running:
+                yield from self._wait(branch, branches, outputs)
+        finally:
+            stop.set()
+            for branch in branches:
+                if branch is not None:
+                    branch.thread.join()
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+
+    @staticmethod
+    def _wait(branch: _Branch, branches: list, outputs: queue.Queue):
+        """Yield the branches' outputs until `branch` is ready for an element, or done."""
+        while not (branch.ready or branch.done):
+            idx, done, value = outputs.get()
+            if done:
+                branches[idx].done = True
+                if value is not None:
+                    raise value
+            elif value is _READY:
+                branches[idx].ready = True
             else:
-                yield from self.otherwise_op.send_to_tuple(elem)
+                yield value
+
+    @property
+    def _elementwise(self) -> bool:
+        return self.then_op._elementwise and self.otherwise_op._elementwise
+
+    def _apply(self, value):
+        if not self._elementwise:
+            # As for a Pipeline, only element-wise branches may skip `pipe`.
+            return tuple(self.pipe((value,)))
+        branch = self.then_op if self.predicate(value) else self.otherwise_op
+        return branch.send_to_tuple(value)
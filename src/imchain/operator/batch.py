@@ -0,0 +1,99 @@
+"""Vectorized operators, which apply NumPy functions to stacked batches of elements."""
+
+import lazy_loader as lazy
+import typing_extensions as tp
+
+from ._helpers import check_callable
+from .meta import Buffer
+
+np = lazy.load("numpy")
+
+__all__ = ("BatchMap",)
+
+
+def _aliases(outputs, batch) -> bool:
+    """Whether `outputs`, or any array in a sequence of them, shares memory with `batch`."""
+    if isinstance(outputs, np.ndarray):
+        return np.may_share_memory(outputs, batch)
+    return any(isinstance(out, np.ndarray) and np.may_share_memory(out, batch) for out in outputs)
+
+
+class BatchMap(Buffer):
+    """Applies a vectorized function to batches of stacked arrays.
+
+    Elements are grouped with `Buffer`, copied into a single contiguous array of shape
+    `(batch_size, *element_shape)`, and passed to `func` in one call. `func` must return
+    an array (or sequence) with one result per row, which are yielded individually; for
+    an array, those are views into it. Holding on to one result keeps its whole batch
+    alive.
+
+    The batch array is allocated once per `pipe` call, and reused for every batch with
+    the same shape and dtype. If `func` returns a view of its input (e.g. an in-place
+    operation), a new batch array is allocated for the next batch instead, so earlier
+    results are never overwritten. The same goes for a sequence of results, any of
+    which is a view of the input.
+
+    A short final batch is passed to `func` as-is, unless `pad` is set, in which case it
+    is padded to `batch_size` by repeating its last element and the padded results are
+    dropped. Use this when `func` requires a fixed batch shape. A batch whose elements
+    don't share the same shape and dtype falls back to calling `func` on each element,
+    as a batch of one.
+
+    Examples:
+        >>> chain = iop.Map(load) | iop.BatchMap(lambda x: x.astype(np.float32) / 255, 32)
+    """
+
+    def __init__(
+        self,
+        func: tp.Callable[["np.ndarray"], tp.Sequence],
+        batch_size: int,
+        *,
+        pad: bool = False,
+    ) -> None:
+        """
+        Args:
+            func: A function of an array whose first axis indexes the batch.
+            batch_size: Number of elements stacked into each call.
+            pad: Flag to pad a short final batch to `batch_size`.
+        """
+        check_callable(self, func)
+        if batch_size < 1:
+            msg = f"Expected `batch_size` to be positive, but got {batch_size}."
+            raise ValueError(msg)
+
+        super().__init__(batch_size)
+        self.func = func
+        self.pad = pad
+
+    def pipe(self, iterable):
+        batch = None
+        for items in super().pipe(iterable):
+            arrays = [np.asarray(item) for item in items]
+            first = arrays[0]
+            if any(a.shape != first.shape or a.dtype != first.dtype for a in arrays[1:]):
+                for array in arrays:
+                    yield self.func(array[np.newaxis])[0]
+                continue
+
+            if batch is None or batch.shape[1:] != first.shape or batch.dtype != first.dtype:
+                batch = np.empty((self.buffer_size, *first.shape), dtype=first.dtype)
+
+            n = len(arrays)
+            np.stack(arrays, out=batch[:n])
+            if n == self.buffer_size:
+                inputs = batch
+            elif self.pad:
+                batch[n:] = batch[n - 1]
+                inputs = batch
+            else:
+                inputs = batch[:n]
+
+            outputs = self.func(inputs)
+            if len(outputs) < n:
+                msg = f"Expected {n} results from {self.func!r}, but got {len(outputs)}."
+                raise ValueError(msg)
+
+            if _aliases(outputs, batch):
+                # The results alias the batch array, so don't overwrite it.
+                batch = None
+            yield from outputs[:n]
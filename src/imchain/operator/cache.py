@@ -0,0 +1,252 @@
+"""Memoization of per-element results, in memory and optionally on disk."""
+
+import collections
+import dataclasses
+import hashlib
+import os
+import pickle
+import tempfile
+
+import lazy_loader as lazy
+import typing_extensions as tp
+
+from ._helpers import sizeof
+from .basics import Map
+from .core import Operator
+
+np = lazy.load("numpy")
+
+T = tp.TypeVar("T")
+U = tp.TypeVar("U")
+
+__all__ = ("Cache", "CacheStats", "content_key")
+
+_MISS = object()
+
+
+def content_key(item) -> str:
+    """A digest of an element's contents, used as the default cache key.
+
+    Arrays are hashed by dtype, shape and data; bytes-like objects directly; and
+    anything else by its pickle.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        digest.update(item)
+    elif hasattr(item, "__array_interface__"):
+        array = np.ascontiguousarray(item)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.reshape(-1).view(np.uint8))
+    else:
+        digest.update(pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """Hit and miss counts for a Cache."""
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class Cache(Operator[T, U]):
+    """Memoizes a one-to-one operator, skipping it for elements it has already seen.
+
+    Results are kept in an in-memory LRU, bounded by `max_entries` and/or `max_bytes`
+    (as measured by `sizer`). If `directory` is set, results are also written there, so
+    they persist across runs and processes: arrays as `.npy` files, which are read back
+    memory-mapped, and anything else pickled.
+
+    Misses are streamed through a single `op.pipe` call, so a wrapped `PoolMap` still
+    runs them in parallel, while hits never reach it. The wrapped operator must yield
+    exactly one output per input, in order (e.g. `Map`, `PoolMap` or `AsyncMap`).
+    Outputs are yielded in input order.
+
+    Cached results are shared between hits, so they shouldn't be modified in place;
+    memory-mapped results are read-only.
+
+    Examples:
+        >>> chain = iop.Map(load) | iop.Cache(iop.PoolMap(denoise), directory="cache/")
+        >>> chain.drain(paths)
+        >>> print(chain[-1].stats)
+    """
+
+    def __init__(
+        self,
+        op: tp.Union[Operator[T, U], tp.Callable[[T], U]],
+        *,
+        key: tp.Optional[tp.Callable[[T], tp.Hashable]] = None,
+        max_entries: tp.Optional[int] = None,
+        max_bytes: tp.Optional[int] = None,
+        directory: tp.Union[str, os.PathLike, None] = None,
+        sizer: tp.Callable[[tp.Any], int] = sizeof,
+    ) -> None:
+        """
+        Args:
+            op: The operator to memoize, or a function to wrap with `Map`.
+            key: A function of an element returning its cache key. Defaults to
+                `content_key`, a digest of the element's contents.
+            max_entries: Maximum number of results held in memory.
+            max_bytes: Maximum total size of the results held in memory.
+            directory: Directory for the on-disk tier. Created if missing.
+            sizer: A function returning the size of a result in bytes.
+        """
+        for name, value in (("max_entries", max_entries), ("max_bytes", max_bytes)):
+            if value is not None and value < 0:
+                msg = f"Expected `{name}` to be non-negative, but got {value}."
+                raise ValueError(msg)
+
+        self.op = op if isinstance(op, Operator) else Map(op)
+        self.key = content_key if key is None else key
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = None if directory is None else os.fspath(directory)
+        self.sizer = sizer
+        self.stats = CacheStats()
+        self.nbytes = 0
+        self._entries: collections.OrderedDict[tp.Hashable, tuple[U, int]] = (
+            collections.OrderedDict()
+        )
+
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def clear(self) -> None:
+        """Empty the in-memory tier. Files in `directory` are kept."""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[U, None, None]:
+        source = iter(iterable)
+        # One [key, value] slot per element, in input order. A miss has `_MISS` as its
+        # value until the wrapped operator produces it.
+        slots: collections.deque[list] = collections.deque()
+        # Misses not yet fed to `op`, and the slots of those awaiting their output.
+        misses: collections.deque[T] = collections.deque()
+        waiting: collections.deque[list] = collections.deque()
+
+        def pull() -> bool:
+            try:
+                item = next(source)
+            except StopIteration:
+                return False
+
+            key = self.key(item)
+            slot = [key, self._lookup(key)]
+            slots.append(slot)
+            if slot[1] is _MISS:
+                misses.append(item)
+                waiting.append(slot)
+            return True
+
+        def feed():
+            while True:
+                while not misses:
+                    if not pull():
+                        return
+                yield misses.popleft()
+
+        outputs = self.op.pipe(feed())
+        try:
+            while slots or pull():
+                slot = slots[0]
+                while slot[1] is _MISS:
+                    value = next(outputs, _MISS)
+                    if value is _MISS:
+                        msg = f"Expected {self.op!r} to yield one output per input."
+                        raise ValueError(msg)
+                    done = waiting.popleft()
+                    done[1] = value
+                    self._store(done[0], value)
+                slots.popleft()
+                yield slot[1]
+        finally:
+            close = getattr(outputs, "close", None)
+            if close is not None:
+                close()
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+
+    # ---- Storage ----
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+        if self.directory is not None:
+            value = self._read(key)
+            if value is not _MISS:
+                self.stats.disk_hits += 1
+                self._remember(key, value)
+                return value
+
+        self.stats.misses += 1
+        return _MISS
+
+    def _store(self, key, value) -> None:
+        self._remember(key, value)
+        if self.directory is not None:
+            self._write(key, value)
+
+    def _remember(self, key, value) -> None:
+        size = self.sizer(value)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        self._entries[key] = (value, size)
+        self.nbytes += size
+
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+            self.stats.evictions += 1
+
+    def _path(self, key) -> str:
+        name = key if isinstance(key, str) and key.isalnum() else content_key(repr(key))
+        return os.path.join(self.directory, name)
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            return np.load(path + ".npy", mmap_mode="r")
+        except FileNotFoundError:
+            pass
+
+        try:
+            with open(path + ".pkl", "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return _MISS
+
+    def _write(self, key, value) -> None:
+        path = self._path(key)
+        is_array = hasattr(value, "__array_interface__") and not np.asarray(value).dtype.hasobject
+        suffix = ".npy" if is_array else ".pkl"
+
+        # Write to a temporary file, then rename, so readers never see a partial file.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if is_array:
+                    np.save(f, np.asarray(value), allow_pickle=False)
+                else:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path + suffix)
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,142 @@
+"""Resumable runs, which commit their progress through a stream to a file."""
+
+import itertools
+import os
+import pickle
+import tempfile
+
+import typing_extensions as tp
+
+from .core import Operator, Pipeline, _has_fast_path
+from .slice import _slice_source
+
+T = tp.TypeVar("T")
+U = tp.TypeVar("U")
+
+__all__ = ("Checkpoint",)
+
+
+class _Cursor:
+    """Counts the elements pulled from a source."""
+
+    def __init__(self, offset: int) -> None:
+        self.offset = offset
+
+    def count(self, iterable: tp.Iterable[T]) -> tp.Generator[T, None, None]:
+        for item in iterable:
+            self.offset += 1
+            yield item
+
+
+def _stateful(op: Operator) -> list[Operator]:
+    """The operators of `op` which hold state, checking that each can be checkpointed."""
+    operators = list(op._flatten()) if isinstance(op, Pipeline) else [op]
+    stateful = []
+    for operator in operators:
+        if _has_fast_path(type(operator), "_checkpoint"):
+            stateful.append(operator)
+        elif not operator._elementwise:
+            # Element-wise operators work on each element on its own, holding nothing.
+            msg = f"{type(operator).__name__} can't be checkpointed."
+            raise TypeError(msg)
+    return stateful
+
+
+class Checkpoint(Operator[T, U]):
+    """Runs an operator, periodically committing its progress so that a rerun resumes.
+
+    Every `every` outputs, and at the end of the stream, the number of elements pulled
+    from the source is written to `path`, along with the state of each stateful operator:
+    the position of a `Slice`, the part of an iterable which `Chain` hasn't yielded, and
+    the elements of a `PoolMap` whose results haven't all been yielded. A commit happens
+    once an output has been consumed, when each of these is exactly what the outputs so
+    far haven't covered. (A `Buffer` has just yielded at that point, so only holds the
+    item which didn't fit under its `max_bytes`, if any.)
+
+    If `path` exists, the source is instead sliced past the committed offset, and the
+    operators carry on from their committed state. Elements which were in flight (such
+    as those in a PoolMap's reorder window) are processed again, but no output is
+    yielded twice, provided the operators are deterministic. Once a run completes, a
+    rerun yields nothing; delete `path` to start over.
+
+    The operator may only contain the stateful operators above (PoolMap in order, and
+    Buffer without `max_wait`), and element-wise ones such as `Map` and `Filter`, so
+    that there is no state which the checkpoint would miss. Don't pipe it elsewhere
+    while it is being checkpointed.
+
+    Examples:
+        >>> chain = iop.Map(load) | iop.PoolMap(denoise) | iop.Buffer(8) | iop.Map(save_batch)
+        >>> iop.Checkpoint(chain, "run.ckpt", every=100).drain(frames)
+    """
+
+    def __init__(
+        self, op: Operator[T, U], path: tp.Union[str, os.PathLike], *, every: int = 1000
+    ) -> None:
+        if every < 1:
+            msg = f"Expected `every` to be positive, but got {every}."
+            raise ValueError(msg)
+
+        self.op = op
+        self.path = os.fspath(path)
+        self.every = every
+        self._stateful = _stateful(op)
+
+    def load(self) -> tp.Optional[dict]:
+        """The committed checkpoint, or None if there isn't one."""
+        try:
+            with open(self.path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[U, None, None]:
+        names = [type(operator).__name__ for operator in self._stateful]
+        checkpoint = self.load()
+        if checkpoint is None:
+            offset, states = 0, [None] * len(self._stateful)
+        elif checkpoint["operators"] != names:
+            msg = (
+                f"The checkpoint at {self.path!r} is for the operators"
+                f" {checkpoint['operators']}, not {names}."
+            )
+            raise ValueError(msg)
+        else:
+            offset, states = checkpoint["offset"], checkpoint["states"]
+
+        for operator, state in zip(self._stateful, states):
+            operator._restore(state)
+
+        source = iterable
+        if offset:
+            source = _slice_source(iterable, offset, None, None)
+            if source is None:
+                source = itertools.islice(iterable, offset, None)
+
+        cursor = _Cursor(offset)
+        uncommitted = 0
+        for output in self.op.pipe(cursor.count(source)):
+            yield output
+            # The consumer has asked for more, so the output has been fully handled.
+            uncommitted += 1
+            if uncommitted == self.every:
+                self._commit(cursor.offset, names)
+                uncommitted = 0
+
+        self._commit(cursor.offset, names)
+
+    def _commit(self, offset: int, names: list[str]) -> None:
+        checkpoint = {
+            "offset": offset,
+            "operators": names,
+            "states": [operator._checkpoint() for operator in self._stateful],
+        }
+
+        # Write to a temporary file, then rename, so a crash never leaves a partial file.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
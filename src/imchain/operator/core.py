@@ -1,7 +1,12 @@
 import abc
+import time
 
 import typing_extensions as tp
 
+from ._bridge import drive_async, threaded_apipe
+from .profile import PoolStats, Profile, StageStats
+from .trace import Tracer
+
 T = tp.TypeVar("T")
 U = tp.TypeVar("U")
 V = tp.TypeVar("V")
@@ -9,18 +14,32 @@ V = tp.TypeVar("V")
 # TODO: implement __str__ and __repr__ for everything.
 
 
+def _has_fast_path(cls: type, hook: str) -> bool:
+    """Check whether instances of `cls` may use `hook` in place of `pipe`.
+
+    Hooks such as `_fuse` and `_apply` reimplement `pipe` more cheaply. Subclasses which
+    override `pipe` never use an inherited hook, since it would bypass their custom
+    behavior.
+    """
+    owner = next((base for base in cls.__mro__ if hook in vars(base)), None)
+    return owner is not None and cls.pipe is owner.pipe
+
+
 class Operator(abc.ABC, tp.Generic[T, U]):
     """A stream operator.
 
     Stream operators apply transformations and/or filters
     to an iterable of data. The main entry point is `pipe`,
     which wraps another iterable. A few convenience functions
-    are defined: `process`, `send`, and `drain`.
+    are defined: `process`, `send`, `send_many`, and `drain`.
 
     - `process`: Pipes an iterable through the Operator into a sink, such `min` or `list`.
     - `send`: Pipes a single value through the Operator.
+    - `send_many`: Pipes a small batch of values through the Operator into a list.
     - `drain`: Empties an iterable through the Operator, without capturing any results.
 
+    `apipe` is the asynchronous counterpart of `pipe`, which wraps an async iterable.
+
     Operators can be chained by using the binary OR operator. For example,
     OperatorA | OperatorB produces another Operator which applies A then B.
 
@@ -30,6 +49,25 @@ class Operator(abc.ABC, tp.Generic[T, U]):
     does not change the type of elements passing through it.
     """
 
+    # Whether the operator is one-to-one, order-preserving and free of side effects, so
+    # that a following `Slice` can be applied before it instead. See `Pipeline.pipe`.
+    pure: bool = False
+
+    # Whether `_apply` and `_apply_many` may stand in for `pipe`, resolved per class.
+    _has_apply: tp.ClassVar[bool] = False
+    _has_apply_many: tp.ClassVar[bool] = False
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._has_apply = _has_fast_path(cls, "_apply")
+        cls._has_apply_many = _has_fast_path(cls, "_apply_many")
+
+    # Whether `_apply` handles each element on its own, giving the same outputs and side
+    # effects as `pipe`, so that a chain of such operators can skip `pipe` altogether.
+    @property
+    def _elementwise(self) -> bool:
+        return self._has_apply
+
     @abc.abstractmethod
     def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[U]:
         """Transform or filter an iterable through this Operator.
@@ -54,7 +92,7 @@ class Operator(abc.ABC, tp.Generic[T, U]):
             >>> chain = iop.Map(lambda x: (x, x)) | iop.Chain()
             >>> assert chain.send(1) == (1, 1)
         """
-        res = self.process([value], sink=tuple)
+        res = self.send_to_tuple(value)
         if len(res) == 1:
             return res[0]
         return res
@@ -70,13 +108,56 @@ class Operator(abc.ABC, tp.Generic[T, U]):
             >>> chain = iop.Map(lambda x: (x, x)) | iop.Chain()
             >>> assert chain.send_to_tuple(1) == (1, 1)
         """
-        return self.process([value], sink=tuple)
+        if self._has_apply:
+            return self._apply(value)
+        return tuple(self.pipe((value,)))
+
+    def send_many(self, values: tp.Iterable[T]) -> list[U]:
+        """Send a batch of values through the Operator and return the results as a list.
+
+        Equivalent to `process(values)`, but operators implementing `_apply_many` skip
+        the generator machinery of `pipe`.
+
+        Examples:
+            >>> assert iop.Map(lambda x: x+1).send_many([1, 2]) == [2, 3]
+        """
+        if self._has_apply_many:
+            return self._apply_many(values)
+        return list(self.pipe(values))
 
     def drain(self, iterable: tp.Iterable[T]) -> None:
         """Drain a given iterable through this Operator."""
         for _ in self.pipe(iterable):
             pass
 
+    def apipe(self, aiterable: tp.AsyncIterable[T]) -> tp.AsyncIterator[U]:
+        """Transform or filter an async iterable through this Operator.
+
+        By default, `pipe` runs in a worker thread, so synchronous operators can sit in
+        an async pipeline without blocking the event loop.
+
+        Args:
+            aiterable: An async iterable of values.
+
+        Returns:
+            An async iterator of filtered or transformed values.
+        """
+        return threaded_apipe(self.pipe, aiterable)
+
+    def profile(self, iterable: tp.Iterable[T]) -> Profile:
+        """Drain `iterable` through this Operator, collecting per-stage statistics.
+
+        See `Pipeline.profile`.
+        """
+        return Pipeline(self).profile(iterable)
+
+    def trace(self, iterable: tp.Iterable[T], tracer: Tracer) -> tp.Generator[U, None, None]:
+        """Pipe `iterable` through this Operator, recording spans into `tracer`.
+
+        See `Pipeline.trace`.
+        """
+        return Pipeline(self).trace(iterable, tracer)
+
     def __or__(self, other: "Operator"):
         # self | other
         if not isinstance(other, Operator):
@@ -86,15 +167,245 @@ class Operator(abc.ABC, tp.Generic[T, U]):
         return Pipeline(self, other)
 
 
+class AsyncOperator(Operator[T, U]):
+    """A stream operator implemented natively with asyncio.
+
+    Subclasses implement `apipe`. Their `pipe` drives a private event loop, so they can
+    also be used in synchronous pipelines.
+    """
+
+    @abc.abstractmethod
+    def apipe(self, aiterable: tp.AsyncIterable[T]) -> tp.AsyncIterator[U]:
+        pass
+
+    def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[U, None, None]:
+        yield from drive_async(self.apipe, iterable)
+
+
+def _is_fusable(op: Operator) -> bool:
+    """Check whether `op` can be folded into a `Fused` operator.
+
+    An operator is fusable if it implements `_fuse`, which wraps an iterator
+    without a generator frame of its own.
+    """
+    return _has_fast_path(type(op), "_fuse")
+
+
+def _push_down_slices(operators: tp.Sequence[Operator]) -> tp.Sequence[Operator]:
+    from .slice import Slice
+
+    if not any(isinstance(operator, Slice) for operator in operators):
+        return operators
+
+    reordered = list(operators)
+    for idx in range(1, len(reordered)):
+        if not isinstance(reordered[idx], Slice):
+            continue
+        # Bubble the slice left past pure operators; they neither add, drop nor reorder
+        # elements, so slicing first gives the same results.
+        pos = idx
+        while pos > 0 and reordered[pos - 1].pure:
+            reordered[pos - 1], reordered[pos] = reordered[pos], reordered[pos - 1]
+            pos -= 1
+    return reordered
+
+
+def _apply_chain(operators: tp.Sequence[Operator], value) -> tuple:
+    # Only for element-wise operators (see `Operator._elementwise`).
+    values = (value,)
+    for idx, operator in enumerate(operators):
+        if len(values) != 1:
+            # Carry each value through the rest of the chain before the next, as `pipe`
+            # would; this also skips the remaining operators once nothing is left.
+            rest = operators[idx:]
+            return tuple(out for value in values for out in _apply_chain(rest, value))
+        values = operator.send_to_tuple(values[0])
+    return tuple(values)
+
+
+def _apply_many_chain(operators: tp.Sequence[Operator], values: tp.Iterable) -> list:
+    # Element by element, so that side effects happen in the same order as with `pipe`.
+    return [out for value in values for out in _apply_chain(operators, value)]
+
+
+class Fused(Operator[T, U]):
+    """A run of stateless operators executed in a single generator frame.
+
+    Each operator contributes a builtin iterator (e.g. `map` or `filter`) via its
+    `_fuse` method, so elements move through the whole run without resuming
+    one Python generator per stage. Use `Pipeline.compile` to build these.
+    """
+
+    def __init__(self, *operators: Operator):
+        self.operators = tuple(operators)
+
+    @property
+    def pure(self) -> bool:
+        return all(operator.pure for operator in self.operators)
+
+    def pipe(self, iterable):
+        for operator in self.operators:
+            iterable = operator._fuse(iterable)
+        yield from iterable
+
+    def _apply(self, value):
+        return _apply_chain(self.operators, value)
+
+    def _apply_many(self, values):
+        return _apply_many_chain(self.operators, values)
+
+
 class Pipeline(Operator[T, U], tp.MutableSequence[Operator]):
     def __init__(self, *operators: Operator):
         self.operators = list(operators)
 
+    @property
+    def pure(self) -> bool:
+        return all(operator.pure for operator in self.operators)
+
     def pipe(self, iterable):
-        for operator in self.operators:
+        """Pipe `iterable` through each operator in turn.
+
+        Slices are first moved ahead of any pure operators before them (see
+        `Operator.pure`), so skipped elements are never computed. A slice which reaches
+        the front is applied to the source directly, by indexing or seeking if the
+        source supports it.
+        """
+        for operator in _push_down_slices(self.operators):
             iterable = operator.pipe(iterable)
         yield from iterable
 
+    @property
+    def _elementwise(self) -> bool:
+        return all(operator._elementwise for operator in self.operators)
+
+    def _apply(self, value):
+        if not self._elementwise:
+            # Otherwise, e.g. an Effect ahead of a Take could see elements which `pipe`
+            # never pulls through it.
+            return tuple(self.pipe((value,)))
+        return _apply_chain(self.operators, value)
+
+    def _apply_many(self, values):
+        if not self._elementwise:
+            return list(self.pipe(values))
+        return _apply_many_chain(self.operators, values)
+
+    def apipe(self, aiterable):
+        # Native async operators are chained directly, while each run of synchronous
+        # operators shares a single worker thread.
+        run = []
+        for operator in self._flatten():
+            if not isinstance(operator, AsyncOperator):
+                run.append(operator)
+                continue
+
+            if run:
+                aiterable = threaded_apipe(Pipeline(*run).pipe, aiterable)
+                run = []
+            aiterable = operator.apipe(aiterable)
+
+        if run:
+            aiterable = threaded_apipe(Pipeline(*run).pipe, aiterable)
+        return aiterable
+
+    def profile(self, iterable: tp.Iterable[T]) -> Profile:
+        """Drain `iterable` through this Pipeline, collecting per-stage statistics.
+
+        Each stage records its items in and out, the time spent inside it excluding
+        upstream, and the latency of pulling each output. Stages with a `stats`
+        attribute, such as `PoolMap`, also record scheduling statistics. Instrumentation
+        only exists for the duration of this call; `pipe` is never slowed down.
+
+        Examples:
+            >>> print(chain.profile(frames))  # Print a summary table.
+        """
+        profile = Profile()
+        enabled = []
+        for operator in self._flatten():
+            stage = StageStats(type(operator).__name__)
+            if getattr(operator, "stats", False) is None:
+                operator.stats = PoolStats(pool_size=getattr(operator, "pool_size", 1))
+                enabled.append(operator)
+            stage.pool = getattr(operator, "stats", None)
+
+            profile.stages.append(stage)
+            iterable = stage.meter_output(operator.pipe(stage.meter_input(iterable)))
+
+        start = time.perf_counter()
+        try:
+            for _ in iterable:
+                pass
+        finally:
+            profile.wall_time = time.perf_counter() - start
+            for operator in enabled:
+                operator.stats = None
+        return profile
+
+    def trace(self, iterable: tp.Iterable[T], tracer: Tracer) -> tp.Generator[U, None, None]:
+        """Pipe `iterable` through this Pipeline, recording spans into `tracer`.
+
+        Each stage records one span per element it yields, covering the time taken to
+        pull it, so spans of upstream stages nest inside those of downstream stages.
+        Stages with a `tracer` attribute, such as `PoolMap`, also record a span per
+        element inside their workers, tagged with the worker's process and thread.
+
+        Examples:
+            >>> tracer = iop.Tracer()
+            >>> for frame in chain.trace(frames, tracer):
+            ...     save(frame)
+            >>> tracer.flush("trace.json")
+        """
+        enabled = []
+        try:
+            for operator in self._flatten():
+                if getattr(operator, "tracer", False) is None:
+                    operator.tracer = tracer
+                    enabled.append(operator)
+                iterable = tracer.meter(type(operator).__name__, operator.pipe(iterable))
+
+            yield from iterable
+        finally:
+            for operator in enabled:
+                operator.tracer = None
+
+    def compile(self) -> "Pipeline[T, U]":
+        """Create an equivalent Pipeline with adjacent stateless operators fused.
+
+        Nested Pipelines are flattened, then each run of two or more fusable
+        operators (`Map`, `Filter`, `Effect`, `Noop`) is replaced by a single
+        `Fused` operator. Laziness and ordering are unchanged; only the
+        per-element overhead of the nested generators is removed.
+
+        The returned Pipeline is a snapshot: later changes to this Pipeline are
+        not reflected in it.
+
+        Examples:
+            >>> chain = (iop.Map(lambda x: x + 1) | iop.Filter(bool) | iop.Take(2)).compile()
+            >>> assert len(chain) == 2
+            >>> assert chain.process(range(-1, 5)) == [1, 2]
+        """
+        compiled = []
+        run = []
+        for operator in self._flatten():
+            if _is_fusable(operator):
+                run.append(operator)
+                continue
+
+            compiled.extend(_collapse(run))
+            run = []
+            compiled.append(operator)
+
+        compiled.extend(_collapse(run))
+        return Pipeline(*compiled)
+
+    def _flatten(self) -> tp.Iterator[Operator]:
+        for operator in self.operators:
+            if isinstance(operator, Pipeline):
+                yield from operator._flatten()
+            else:
+                yield operator
+
     # ---- Chaining ----
 
     def __or__(self, other: Operator):
@@ -147,3 +458,9 @@ class Pipeline(Operator[T, U], tp.MutableSequence[Operator]):
 
     def insert(self, idx, val):
         return self.operators.insert(idx, val)
+
+
+def _collapse(run: list[Operator]) -> list[Operator]:
+    if len(run) > 1:
+        return [Fused(*run)]
+    return run
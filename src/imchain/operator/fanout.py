@@ -0,0 +1,215 @@
+"""Feeding one stream into several operators in a single pass."""
+
+import collections
+import queue
+import threading
+
+import typing_extensions as tp
+
+from .core import Operator
+from .stage import _END, _forward, _get, _put, _receive
+
+T = tp.TypeVar("T")
+
+__all__ = ("Broadcast", "Tee")
+
+_EMPTY = object()
+
+
+def _distribute(iterable, queues, stop) -> None:
+    """Put every item of `iterable` onto each of `queues`, then end or fail each one."""
+    try:
+        for item in iterable:
+            for q in queues:
+                if not _put(q, (False, item), stop):
+                    return
+        msg = _END
+    except BaseException as exc:
+        msg = (True, exc)
+    finally:
+        close = getattr(iterable, "close", None)
+        if close is not None:
+            close()
+
+    for q in queues:
+        _put(q, msg, stop)
+
+
+def _check_max_lag(max_lag: int) -> None:
+    if max_lag < 1:
+        msg = f"Expected `max_lag` to be positive, but got {max_lag}."
+        raise ValueError(msg)
+
+
+class Broadcast(Operator[T, tuple]):
+    """Feeds each element to several branches, yielding a tuple of their results.
+
+    Every branch sees the whole stream through a single `pipe` call, and must yield
+    exactly one output per input, in order (e.g. `Map`, `PoolMap`). Unlike
+    `itertools.tee`, no branch can fall more than `max_lag` elements behind another.
+
+    By default, branches run in the calling thread, taking turns to produce the outputs
+    for each element; if a branch reads more than `max_lag` elements ahead of the
+    others, `BufferError` is raised. With `concurrent=True`, each branch runs in its own
+    thread instead, and is paused once it's `max_lag` elements ahead.
+
+    Examples:
+        >>> chain = iop.Map(decode) | iop.Broadcast(iop.Map(thumbnail), iop.Map(features))
+        >>> for thumb, feats in chain.pipe(paths):
+        ...     ...
+    """
+
+    def __init__(self, *branches: Operator, max_lag: int = 16, concurrent: bool = False) -> None:
+        _check_max_lag(max_lag)
+        self.branches = branches
+        self.max_lag = max_lag
+        self.concurrent = concurrent
+
+    def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[tuple, None, None]:
+        if self.concurrent:
+            rows = self._pipe_threads(iterable)
+        else:
+            rows = self._pipe_sequential(iterable)
+
+        for row in rows:
+            if _EMPTY in row:
+                if all(output is _EMPTY for output in row):
+                    return
+                msg = f"Expected each branch of {self!r} to yield one output per input."
+                raise ValueError(msg)
+            yield row
+
+    def _pipe_sequential(self, iterable):
+        source = iter(iterable)
+        inboxes = [collections.deque() for _ in self.branches]
+
+        def pull() -> bool:
+            item = next(source, _EMPTY)
+            if item is _EMPTY:
+                return False
+            for inbox in inboxes:
+                inbox.append(item)
+                if len(inbox) > self.max_lag:
+                    msg = (
+                        f"A branch of {self!r} lagged more than {self.max_lag} elements"
+                        " behind. Increase `max_lag`, or use `concurrent=True`."
+                    )
+                    raise BufferError(msg)
+            return True
+
+        def feed(inbox):
+            while True:
+                while not inbox:
+                    if not pull():
+                        return
+                yield inbox.popleft()
+
+        outputs = [branch.pipe(feed(inbox)) for branch, inbox in zip(self.branches, inboxes)]
+        try:
+            while True:
+                yield tuple(next(it, _EMPTY) for it in outputs)
+        finally:
+            for it in outputs:
+                close = getattr(it, "close", None)
+                if close is not None:
+                    close()
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+
+    def _pipe_threads(self, iterable):
+        stop = threading.Event()
+        inputs = [queue.Queue(self.max_lag) for _ in self.branches]
+        outputs = [queue.Queue(self.max_lag) for _ in self.branches]
+        threads = [threading.Thread(target=_distribute, args=(iterable, inputs, stop))]
+        for branch, q_in, q_out in zip(self.branches, inputs, outputs):
+            results = branch.pipe(_receive(q_in, stop))
+            threads.append(threading.Thread(target=_forward, args=(results, q_out, stop)))
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            while True:
+                row = []
+                for q in outputs:
+                    done, value = _get(q, stop)
+                    if done and value is not None:
+                        raise value
+                    row.append(_EMPTY if done else value)
+                yield tuple(row)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+
+class Tee(Operator[T, T]):
+    """Feeds each element to several sink branches, yielding the elements unchanged.
+
+    Each branch runs in its own thread, over the whole stream, and may yield any number
+    of outputs, which are discarded; use it for side effects such as writing files.
+    Elements are yielded downstream as soon as every branch has received them, and no
+    branch falls more than `max_lag` elements behind. When the stream ends, the branches
+    are waited on, and the first error raised by a branch is re-raised.
+
+    Examples:
+        >>> chain = iop.Map(decode) | iop.Tee(iop.Map(checksum) | iop.Effect(log)) | iop.Map(model)
+    """
+
+    def __init__(self, *branches: Operator, max_lag: int = 16) -> None:
+        _check_max_lag(max_lag)
+        self.branches = branches
+        self.max_lag = max_lag
+
+    def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[T, None, None]:
+        stop = threading.Event()
+        passthrough = queue.Queue(self.max_lag)
+        inputs = [queue.Queue(self.max_lag) for _ in self.branches]
+        errors = queue.SimpleQueue()
+
+        def drain(branch, q):
+            ended = False
+
+            def receive():
+                nonlocal ended
+                yield from _receive(q, stop)
+                ended = True
+
+            try:
+                for _ in branch.pipe(receive()):
+                    if stop.is_set():
+                        return
+                if not ended:
+                    # The branch finished early (e.g. a Take), but the distributor still
+                    # needs room on our queue until the stream ends.
+                    for _ in _receive(q, stop):
+                        pass
+            except BaseException as exc:
+                errors.put(exc)
+                # The distributor may be blocked on our queue, so stop everything.
+                stop.set()
+
+        threads = [
+            threading.Thread(target=_distribute, args=(iterable, [passthrough, *inputs], stop))
+        ]
+        threads.extend(
+            threading.Thread(target=drain, args=(branch, q))
+            for branch, q in zip(self.branches, inputs)
+        )
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        finished = False
+        try:
+            yield from _receive(passthrough, stop)
+            finished = True
+        finally:
+            if not finished:
+                stop.set()
+            for thread in threads:
+                thread.join()
+
+        if not errors.empty():
+            raise errors.get()
@@ -0,0 +1,183 @@
+"""Memory-mapped sources and sinks for files of fixed-shape frames."""
+
+import collections.abc
+import os
+
+import lazy_loader as lazy
+import typing_extensions as tp
+
+from .core import Operator
+from .slice import Seekable
+
+np = lazy.load("numpy")
+
+__all__ = ("FrameSink", "FrameSource")
+
+
+def _is_npy(path: str) -> bool:
+    return path.endswith(".npy")
+
+
+class FrameSource(collections.abc.Sequence, Seekable):
+    """A file of fixed-shape frames, read through a memory map.
+
+    The file is either a `.npy` stack, whose first axis indexes frames, or a raw dump of
+    frames of the given `frame_shape` and `dtype`, starting at byte `offset`. Iterating
+    or indexing yields zero-copy views of the mapped file, so only frames which are
+    actually read get paged in.
+
+    A FrameSource can be passed to `pipe` like any other iterable. It is a `Seekable`
+    sequence, so slices (including `Take`, `Skip` and a Pipeline's pushed-down slices)
+    jump straight to the frames they select. It pickles by path, and is reopened in
+    the receiving process.
+
+    Examples:
+        >>> frames = iop.FrameSource("video.raw", frame_shape=(1080, 1920, 3), dtype="uint8")
+        >>> chain = iop.Skip(100) | iop.Slice(step=2) | iop.Map(denoise)
+        >>> chain.drain(frames)
+    """
+
+    def __init__(
+        self,
+        path: tp.Union[str, os.PathLike],
+        *,
+        frame_shape: tp.Optional[tuple[int, ...]] = None,
+        dtype: tp.Any = None,
+        offset: int = 0,
+    ) -> None:
+        """
+        Args:
+            path: A `.npy` file, or a raw file of frames.
+            frame_shape: Shape of each frame. Required for raw files.
+            dtype: Data type of each frame. Required for raw files.
+            offset: Byte offset of the first frame in a raw file.
+        """
+        self.path = os.fspath(path)
+        if not _is_npy(self.path) and (frame_shape is None or dtype is None):
+            msg = f"Expected `frame_shape` and `dtype` for raw frame file {self.path!r}."
+            raise ValueError(msg)
+
+        self.frame_shape = None if frame_shape is None else tuple(frame_shape)
+        self.dtype = dtype
+        self.offset = offset
+        self._frames = None
+
+    @property
+    def frames(self) -> "np.ndarray":
+        """The memory-mapped array of all frames, opened on first use."""
+        if self._frames is None:
+            self._frames = self._open()
+        return self._frames
+
+    def _open(self):
+        if _is_npy(self.path):
+            return np.load(self.path, mmap_mode="r")
+
+        dtype = np.dtype(self.dtype)
+        frame_nbytes = dtype.itemsize * int(np.prod(self.frame_shape))
+        n = max(0, os.path.getsize(self.path) - self.offset) // frame_nbytes
+        if n == 0:
+            return np.empty((0, *self.frame_shape), dtype=dtype)
+        return np.memmap(
+            self.path, dtype=dtype, mode="r", offset=self.offset, shape=(n, *self.frame_shape)
+        )
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def slice(self, start, stop, step) -> "np.ndarray":
+        """A strided view of the frames from `start` to `stop`."""
+        return self.frames[start:stop:step]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_frames"] = None
+        return state
+
+
+class FrameSink(Operator):
+    """Writes each frame into a preallocated, memory-mapped file, and yields it on.
+
+    The file holds `length` frames and is created on the first frame, as a `.npy` stack
+    or a raw dump depending on the path's suffix. Frame shape and dtype default to those
+    of the first frame. Frames are written to indices `start`, `start + step`, ..., so
+    several sinks (e.g. in different processes) can fill disjoint frames of one file
+    opened with `mode="r+"`. The map is flushed when the stream ends.
+
+    Examples:
+        >>> chain = iop.Map(denoise) | iop.FrameSink("out.npy", length=len(frames))
+        >>> chain.drain(frames)
+    """
+
+    def __init__(
+        self,
+        path: tp.Union[str, os.PathLike],
+        length: int,
+        *,
+        frame_shape: tp.Optional[tuple[int, ...]] = None,
+        dtype: tp.Any = None,
+        start: int = 0,
+        step: int = 1,
+        mode: tp.Literal["w+", "r+"] = "w+",
+    ) -> None:
+        """
+        Args:
+            path: Destination file. With `mode="w+"`, it is created or overwritten.
+            length: Number of frames the file holds.
+            frame_shape: Shape of each frame. Defaults to that of the first frame.
+            dtype: Data type of the file. Defaults to that of the first frame.
+            start: Index of the first frame written.
+            step: Distance between the indices of consecutive frames.
+            mode: "w+" to create the file, or "r+" to write into an existing one.
+        """
+        if length < 0 or start < 0 or step < 1:
+            msg = (
+                "Expected non-negative `length` and `start`, and positive `step`, but got"
+                f" {length}, {start} and {step}."
+            )
+            raise ValueError(msg)
+        if mode not in ("w+", "r+"):
+            msg = f'Expected `mode` to be "w+" or "r+", but got {mode!r}.'
+            raise ValueError(msg)
+
+        self.path = os.fspath(path)
+        self.length = length
+        self.frame_shape = None if frame_shape is None else tuple(frame_shape)
+        self.dtype = dtype
+        self.start = start
+        self.step = step
+        self.mode = mode
+
+    def open(self, frame_shape: tuple[int, ...], dtype) -> "np.memmap":
+        """Map the destination file, creating it if `mode` is "w+"."""
+        shape = (self.length, *frame_shape)
+        if _is_npy(self.path):
+            return np.lib.format.open_memmap(self.path, mode=self.mode, dtype=dtype, shape=shape)
+        return np.memmap(self.path, dtype=dtype, mode=self.mode, shape=shape)
+
+    def pipe(self, iterable):
+        frames = None
+        index = self.start
+        try:
+            for frame in iterable:
+                if frames is None:
+                    frame = np.asarray(frame)
+                    frame_shape = frame.shape if self.frame_shape is None else self.frame_shape
+                    dtype = frame.dtype if self.dtype is None else self.dtype
+                    frames = self.open(frame_shape, dtype)
+
+                if index >= self.length:
+                    msg = f"Expected at most {self.length} frames to fit in {self.path!r}."
+                    raise ValueError(msg)
+                frames[index] = frame
+                index += self.step
+                yield frame
+        finally:
+            if frames is not None:
+                frames.flush()
@@ -1,18 +1,40 @@
+import collections
+import itertools
+import queue
+import threading
+import time
+
+import lazy_loader as lazy
 import typing_extensions as tp
 
+from ._helpers import sizeof
 from .basics import Map
 from .core import Operator, Pipeline
+from .stage import _forward
+
+np = lazy.load("numpy")
 
 T = tp.TypeVar("T")
 U = tp.TypeVar("U")
 
-__all__ = ["Buffer", "Chain", "FlatMap"]
+__all__ = ["Buffer", "Chain", "FlatMap", "Window"]
 
 # TODO: implement __str__ and __repr__ for everything.
 
 
 class Buffer(Operator[T, tp.Iterable[T]]):
-    """Operator which buffers inputs."""
+    """Operator which buffers inputs.
+
+    With `max_bytes`, a buffer is also yielded early if adding the next item would take
+    its total size (as measured by `sizer`) over the budget. A single item larger than
+    the budget is yielded on its own. `nbytes` holds the size of the items currently
+    buffered.
+
+    With `max_wait`, a buffer is also yielded once its oldest item has waited
+    `max_wait` seconds, so that a partial buffer isn't held indefinitely while inputs
+    arrive slowly. Upstream is then iterated in a background thread, staying at most
+    `buffer_size` items ahead.
+    """
 
     def __init__(
         self,
@@ -20,6 +42,9 @@ class Buffer(Operator[T, tp.Iterable[T]]):
         *,
         drop_last=False,
         sink: tp.Callable[[list[T]], tp.Iterable[T]] = tuple,
+        max_bytes: tp.Optional[int] = None,
+        sizer: tp.Callable[[T], int] = sizeof,
+        max_wait: tp.Optional[float] = None,
     ):
         """
         Args:
@@ -27,12 +52,31 @@ class Buffer(Operator[T, tp.Iterable[T]]):
             drop_last: Flag to exclude the last buffer if it is not `buffer_size` long.
             sink: An Iterable constructor for the yielded buffers., or a callable which
                 converts list[T] to an Iterable[T].
+            max_bytes: Maximum total size of the items in a buffer.
+            sizer: A function returning the size of an item in bytes.
+            max_wait: Maximum time in seconds for an item to wait in a buffer.
         """
         self.buffer_size = buffer_size
         self.drop_last = drop_last
         self.sink = sink
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.max_wait = max_wait
+        self.nbytes = 0
 
     def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[tp.Iterable[T], None, None]:
+        resumed, self._resume = self._resume, None
+        if resumed:
+            # Items taken from upstream, but not buffered, when a checkpoint was committed.
+            iterable = itertools.chain(resumed, iterable)
+
+        if self.max_wait is not None:
+            yield from self._pipe_timed(iterable)
+            return
+        if self.max_bytes is not None:
+            yield from self._pipe_budgeted(iterable)
+            return
+
         buffer = []
         for item in iterable:
             buffer.append(item)
@@ -44,14 +88,199 @@ class Buffer(Operator[T, tp.Iterable[T]]):
             yield self.sink(buffer)
             buffer.clear()
 
+    def _pipe_budgeted(self, iterable):
+        buffer = []
+        self.nbytes = 0
+        try:
+            for item in iterable:
+                size = self.sizer(item)
+                if buffer and self.nbytes + size > self.max_bytes:
+                    # The item which overflowed is already taken, but not yet buffered.
+                    self._overflow = (item,)
+                    yield self.sink(buffer)
+                    self._overflow = ()
+                    buffer.clear()
+                    self.nbytes = 0
+
+                buffer.append(item)
+                self.nbytes += size
+                if len(buffer) == self.buffer_size:
+                    yield self.sink(buffer)
+                    buffer.clear()
+                    self.nbytes = 0
+
+            if buffer and not self.drop_last:
+                yield self.sink(buffer)
+                buffer.clear()
+        finally:
+            self.nbytes = 0
+
+    def _pipe_timed(self, iterable):
+        items = queue.Queue(self.buffer_size)
+        stop = threading.Event()
+        worker = threading.Thread(target=_forward, args=(iterable, items, stop), daemon=True)
+        worker.start()
+
+        buffer = []
+        deadline = None
+        self.nbytes = 0
+        try:
+            while True:
+                try:
+                    if buffer:
+                        done, item = items.get(timeout=max(deadline - time.monotonic(), 0))
+                    else:
+                        done, item = items.get()
+                except queue.Empty:
+                    # The oldest item has waited long enough.
+                    yield self.sink(buffer)
+                    buffer.clear()
+                    self.nbytes = 0
+                    continue
+
+                if done:
+                    if item is not None:
+                        raise item
+                    break
+
+                size = self.sizer(item) if self.max_bytes is not None else 0
+                if buffer and self.max_bytes is not None and self.nbytes + size > self.max_bytes:
+                    yield self.sink(buffer)
+                    buffer.clear()
+                    self.nbytes = 0
+
+                if not buffer:
+                    deadline = time.monotonic() + self.max_wait
+                buffer.append(item)
+                self.nbytes += size
+                if len(buffer) == self.buffer_size:
+                    yield self.sink(buffer)
+                    buffer.clear()
+                    self.nbytes = 0
+
+            if buffer and not self.drop_last:
+                yield self.sink(buffer)
+                buffer.clear()
+        finally:
+            self.nbytes = 0
+            stop.set()
+            worker.join()
+
+    # ---- Checkpointing (see `Checkpoint`) ----
+
+    _overflow: tuple[T, ...] = ()
+    _resume: tp.Optional[list[T]] = None
+
+    def _checkpoint(self) -> list[T]:
+        # A Buffer is only suspended while yielding a buffer, when it holds nothing else
+        # but, with `max_bytes`, the item which didn't fit in it.
+        if self._resume is not None:
+            return list(self._resume)
+        return list(self._overflow)
+
+    def _restore(self, state: tp.Optional[list[T]]) -> None:
+        if self.max_wait is not None:
+            msg = "A Buffer with `max_wait` reads ahead in a thread, so can't be checkpointed."
+            raise TypeError(msg)
+        self._resume = list(state or ())
+
+
+class Window(Operator[T, tp.Sequence[T]]):
+    """Operator which yields sliding windows over the last `size` inputs.
+
+    A window is yielded once `size` items have arrived, then after every `step` more.
+    Windows are tuples of the items themselves, so frames are never copied.
+
+    With `stack=True`, items are arrays of one shape and dtype, and each window is an
+    array of shape `(size, *frame_shape)`, oldest first. Frames are written into a
+    preallocated ring buffer of twice `size` frames (each frame twice), so that every
+    window is a contiguous view of it, rather than a copy of `size` frames. A stacked
+    window is only valid until the next one is requested; copy it to keep it.
+
+    Examples:
+        >>> chain = iop.Window(5, stack=True) | iop.Map(lambda w: np.median(w, axis=0))
+    """
+
+    def __init__(self, size: int, step: int = 1, *, stack: bool = False) -> None:
+        if size < 1 or step < 1:
+            msg = f"Expected positive `size` and `step`, but got {size} and {step}."
+            raise ValueError(msg)
+
+        self.size = size
+        self.step = step
+        self.stack = stack
+
+    def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[tp.Sequence[T], None, None]:
+        if self.stack:
+            yield from self._pipe_stacked(iterable)
+            return
+
+        ring = collections.deque(maxlen=self.size)
+        for count, item in enumerate(iterable, 1):
+            ring.append(item)
+            if count >= self.size and (count - self.size) % self.step == 0:
+                yield tuple(ring)
+
+    def _pipe_stacked(self, iterable):
+        size = self.size
+        ring = None
+        for count, frame in enumerate(iterable, 1):
+            frame = np.asarray(frame)
+            if ring is None:
+                ring = np.empty((2 * size, *frame.shape), dtype=frame.dtype)
+            elif frame.shape != ring.shape[1:] or frame.dtype != ring.dtype:
+                msg = (
+                    f"Expected frames of shape {ring.shape[1:]} and dtype {ring.dtype}, but"
+                    f" got {frame.shape} and {frame.dtype}."
+                )
+                raise ValueError(msg)
+
+            # Position `pos` and its mirror hold the latest frame whose index is `pos`
+            # modulo `size`, so the last `size` frames are always contiguous.
+            pos = (count - 1) % size
+            ring[pos] = frame
+            ring[pos + size] = frame
+            if count >= size and (count - size) % self.step == 0:
+                oldest = count % size
+                yield ring[oldest : oldest + size]
+
 
 class Chain(Operator[tp.Iterable[T], T]):
     """Operator that 'flattens' a source iterable."""
 
+    # The iterable being flattened, and how many of its items have been yielded.
+    _position: tuple[list[T], int] = ([], 0)
+    _resume: tp.Optional[list[T]] = None
+
     def pipe(self, iterable: tp.Iterable[tp.Iterable[T]]) -> tp.Generator[T, None, None]:
+        if self._resume is not None:
+            yield from self._pipe_tracked(iterable)
+            return
+
         for subiter in iterable:
             yield from subiter
 
+    def _pipe_tracked(self, iterable):
+        # Each iterable is listed, so that the part not yet yielded can be saved.
+        rest, self._resume = self._resume, None
+        for subiter in itertools.chain([rest], iterable):
+            items = list(subiter)
+            for idx, item in enumerate(items, 1):
+                self._position = (items, idx)
+                yield item
+        self._position = ([], 0)
+
+    # ---- Checkpointing (see `Checkpoint`) ----
+
+    def _checkpoint(self) -> list[T]:
+        if self._resume is not None:
+            return list(self._resume)
+        items, idx = self._position
+        return items[idx:]
+
+    def _restore(self, state: tp.Optional[list[T]]) -> None:
+        self._resume = list(state or ())
+
 
 def FlatMap(func: tp.Callable[[T], tp.Iterable[U]]) -> Pipeline[T, U]:
     """An operator which combines Map with Chain.
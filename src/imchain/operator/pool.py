@@ -1,23 +1,188 @@
 import collections
 import concurrent.futures as cf
+import functools
+import itertools
 import os
+import pickle
+import queue
+import threading
+import time
+import uuid
 
 import typing_extensions as tp
 
+from ._helpers import sizeof
 from .basics import Map
 from .core import Operator
+from .profile import PoolStats
+from .trace import Tracer
+from .transport import Transport
 
 T = tp.TypeVar("T")
 U = tp.TypeVar("U")
 
 __all__ = ("PoolMap", "UnorderedPoolMap")
 
+# Operators installed in the current (worker) process, keyed by a token.
+# Executors populate this through their initializer, so each task only needs to carry
+# the token and the element, rather than a pickled copy of the whole operator.
+_WORKER_OPERATORS: dict[str, tuple[Operator, Transport]] = {}
+
+
+def _install_operator(token: str, op: Operator, transport: Transport) -> None:
+    _WORKER_OPERATORS[token] = (op, transport)
+
+
+def _run_installed(token: str, chunk: list, *, traced: bool = False) -> tuple:
+    """Send each element of `chunk` through the installed operator.
+
+    Returns:
+        The per-element results and the time spent computing them, in seconds. If
+        `traced`, also the worker's PID and thread ID, and a (start, end) span per element.
+    """
+    op, transport = _WORKER_OPERATORS[token]
+    start = time.perf_counter()
+    if not traced:
+        results = transport.apply(op.send, chunk)
+        return results, time.perf_counter() - start
+
+    spans = []
+
+    def send(elem):
+        elem_start = time.perf_counter()
+        try:
+            return op.send(elem)
+        finally:
+            spans.append((elem_start, time.perf_counter()))
+
+    results = transport.apply(send, chunk)
+    worker = (os.getpid(), threading.get_native_id(), spans)
+    return results, time.perf_counter() - start, worker
+
+
+def _run_shipped(token: str, payload: bytes, chunk: list, *, traced: bool = False) -> tuple:
+    """Like `_run_installed`, for executors we could not give an initializer.
+
+    The pickled operator travels with every task, but is only unpickled once per worker.
+    """
+    if token not in _WORKER_OPERATORS:
+        _install_operator(token, *pickle.loads(payload))
+    return _run_installed(token, chunk, traced=traced)
+
+
+class _ChunkSizer:
+    """Decides how many elements to put in each submitted task.
+
+    In adaptive mode, the chunk size is tuned so that each task takes roughly
+    `target_latency` seconds of worker time, based on an exponential moving average
+    of the observed per-element compute time.
+    """
+
+    target_latency = 0.02
+    max_chunksize = 1024
+    smoothing = 0.3
+
+    def __init__(self, chunksize: tp.Union[int, tp.Literal["auto"]]):
+        self.adaptive = chunksize == "auto"
+        self.size = 1 if self.adaptive else chunksize
+        self._per_item: tp.Optional[float] = None
+
+    def observe(self, fut: cf.Future) -> None:
+        if not self.adaptive or fut.cancelled() or fut.exception() is not None:
+            return
+
+        # A traced task also returns the worker's spans, after these.
+        results, elapsed = fut.result()[:2]
+        if not results:
+            return
+
+        per_item = elapsed / len(results)
+        if self._per_item is None:
+            self._per_item = per_item
+        else:
+            self._per_item += self.smoothing * (per_item - self._per_item)
+
+        ideal = self.target_latency / max(self._per_item, 1e-9)
+        self.size = max(1, min(self.max_chunksize, int(ideal)))
+
+    def chunk(self, iterable: tp.Iterable[T]) -> tp.Generator[list[T], None, None]:
+        iterator = iter(iterable)
+        while chunk := list(itertools.islice(iterator, self.size)):
+            yield chunk
+
+
+class _Progress:
+    """Chunks taken by a checkpointed PoolMap whose results haven't all been yielded."""
+
+    def __init__(self, skip: int) -> None:
+        self.chunks: collections.deque[list] = collections.deque()
+        # Results of the head chunk already yielded, and results still to drop because
+        # they were yielded before the run resumed.
+        self.done = 0
+        self.skip = skip
+
+    def emit(self, results: tp.Iterable) -> tp.Generator:
+        for result in results:
+            self.done += 1
+            if self.skip:
+                self.skip -= 1
+                continue
+            yield result
+        self.done = 0
+        self.chunks.popleft()
+
+    def state(self) -> tuple[list, int]:
+        return [elem for chunk in self.chunks for elem in chunk], self.done
+
 
 class PoolMap(Operator[T, U], tp.Generic[T, U]):
     """Operator that submits items to a cf.Executor for processing.
 
     The function for processing can be a simple callable or an Operator.
-    If an Operator is used, it is suggested that Filters are excluded.
+    If an Operator is used, it is suggested that Filters are excluded. Each element is
+    sent through it in isolation, so stateful operators should use `ShardedPipe`.
+
+    The operator is shipped to each worker once, through the executor's initializer,
+    so `executor_cls` must accept the `initializer` and `initargs` keyword arguments
+    (as `cf.ThreadPoolExecutor` and `cf.ProcessPoolExecutor` do). Each submitted
+    task then carries only its elements.
+
+    Elements are submitted in chunks of `chunksize`, which amortizes the IPC and
+    future bookkeeping for cheap operators. Results are still yielded one element at
+    a time. Pass `chunksize="auto"` to tune the chunk size from the observed task
+    latency.
+
+    At most `max_inflight` chunks (default: `pool_size`) are submitted at once. Raise
+    it to prefetch work for the pool. Results are yielded in submission order, so
+    one slow chunk holds back those completed after it. Set `reorder_window` to cap
+    how many chunks may be submitted but not yet yielded, which bounds the completed
+    results buffered behind a slow one at the cost of idling workers while it runs.
+    By default the window is unbounded.
+
+    Set `max_inflight_bytes` to also bound memory: each chunk counts the size of its
+    elements (as measured by `sizer`) from submission until its results are yielded,
+    and no chunk is submitted which would take the total over the budget, except
+    into an otherwise empty pool. Like `max_inflight`, it applies to each `pipe`
+    call. `inflight_bytes` holds the current total.
+
+    `transport` controls how elements and results cross the executor boundary. The
+    default pickles them; `SharedMemoryTransport` moves large arrays through shared
+    memory instead.
+
+    By default, each call to `pipe` starts and shuts down its own executor. To keep
+    warm workers across calls, either use the PoolMap as a context manager (or call
+    `open` and `close`), or pass an externally managed `executor`. Concurrent `pipe`
+    calls share the long-lived executor. An external executor was not created with
+    our initializer, so the operator is pickled once and sent with each task instead,
+    except for a `cf.ThreadPoolExecutor`, which needs no pickling at all.
+
+    Set `stats` to a `PoolStats` to record queue depth and worker utilization, or
+    `tracer` to a `Tracer` to record a span per element inside the workers.
+
+    Examples:
+        >>> with iop.PoolMap(heavy_op, pool_size=4) as op:
+        ...     for request in requests:
+        ...         respond(op.send(request))
     """
 
     def __init__(
@@ -26,6 +191,13 @@ class PoolMap(Operator[T, U], tp.Generic[T, U]):
         *,
         pool_size: tp.Optional[int] = None,
         executor_cls: type[cf.Executor] = cf.ProcessPoolExecutor,
+        chunksize: tp.Union[int, tp.Literal["auto"]] = 1,
+        transport: tp.Optional[Transport] = None,
+        executor: tp.Optional[cf.Executor] = None,
+        max_inflight: tp.Optional[int] = None,
+        reorder_window: tp.Optional[int] = None,
+        max_inflight_bytes: tp.Optional[int] = None,
+        sizer: tp.Callable[[tp.Any], int] = sizeof,
     ) -> None:
         if isinstance(func, Operator):
             self.op = func
@@ -35,64 +207,298 @@ class PoolMap(Operator[T, U], tp.Generic[T, U]):
         self.pool_size = (os.cpu_count() if pool_size is None else pool_size) or 1
         self.executor_cls = executor_cls
 
+        if chunksize != "auto" and (not isinstance(chunksize, int) or chunksize < 1):
+            msg = f'Expected `chunksize` to be a positive integer or "auto", but got {chunksize!r}.'
+            raise ValueError(msg)
+        self.chunksize = chunksize
+        self.transport = Transport() if transport is None else transport
+
+        self.max_inflight = self.pool_size if max_inflight is None else max_inflight
+        self.reorder_window = reorder_window
+        if self.max_inflight < 1 or (reorder_window is not None and reorder_window < 1):
+            msg = "Expected `max_inflight` and `reorder_window` to be positive."
+            raise ValueError(msg)
+        if max_inflight_bytes is not None and max_inflight_bytes < 1:
+            msg = f"Expected `max_inflight_bytes` to be positive, but got {max_inflight_bytes}."
+            raise ValueError(msg)
+        self.max_inflight_bytes = max_inflight_bytes
+        self.sizer = sizer
+        self.inflight_bytes = 0
+
+        self.stats: tp.Optional[PoolStats] = None
+        self.tracer: tp.Optional[Tracer] = None
+
+        self._lock = threading.Lock()
+        self._token = uuid.uuid4().hex
+        self._executor: tp.Optional[cf.Executor] = None
+        self._task: tp.Optional[tp.Callable] = None
+        # Whether the executor was created here, so must be shut down on `close`.
+        self._owns_executor = False
+        if executor is not None:
+            self._attach_executor(executor)
+
+    @property
+    def pure(self) -> bool:
+        return self.op.pure
+
+    # ---- Executor lifecycle ----
+
+    def open(self) -> tp.Self:
+        """Start a long-lived executor, which is reused by `pipe` until `close`."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor(self._token)
+                self._task = functools.partial(_run_installed, self._token)
+                self._owns_executor = True
+        return self
+
+    def close(self) -> None:
+        """Shut down a long-lived executor started by `open`.
+
+        External executors are left running; the PoolMap merely stops using them.
+        """
+        with self._lock:
+            executor, self._executor, self._task = self._executor, None, None
+            owned = self._owns_executor
+
+        if executor is not None and owned:
+            executor.shutdown(wait=True)
+        _WORKER_OPERATORS.pop(self._token, None)
+
+    def __enter__(self) -> tp.Self:
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __getstate__(self):
+        # Executors and locks can't be pickled; a copy falls back to one-shot executors.
+        state = self.__dict__.copy()
+        state.update(_lock=None, _executor=None, _task=None, _owns_executor=False)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _create_executor(self, token: str) -> cf.Executor:
+        return self.executor_cls(
+            max_workers=self.pool_size,
+            initializer=_install_operator,
+            initargs=(token, self.op, self.transport),
+        )
+
+    def _attach_executor(self, executor: cf.Executor) -> None:
+        self._executor = executor
+        self._owns_executor = False
+        if isinstance(executor, cf.ThreadPoolExecutor):
+            # Thread workers share our registry, so install the operator directly.
+            _install_operator(self._token, self.op, self.transport)
+            self._task = functools.partial(_run_installed, self._token)
+        else:
+            payload = pickle.dumps((self.op, self.transport))
+            self._task = functools.partial(_run_shipped, self._token, payload)
+
+    # ---- Processing ----
+
+    _progress: tp.Optional[_Progress] = None
+    _resume: tp.Optional[tuple[list, int]] = None
+
     def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[U, None, None]:
-        executor = self.executor_cls(max_workers=self.pool_size)
+        with self._lock:
+            executor, task = self._executor, self._task
+
+        if executor is not None:
+            yield from self._stream(iterable, executor, task)
+            return
+
+        token = uuid.uuid4().hex
+        executor = self._create_executor(token)
+        task = functools.partial(_run_installed, token)
         try:
-            yield from self._handle(iterable, executor=executor)
+            yield from self._stream(iterable, executor, task)
         except GeneratorExit:
             # If we get an explicit .close() call, don't wait for existing futures to complete.
             executor.shutdown(wait=False)
         finally:
             executor.shutdown(wait=True)
+            # Thread workers share our registry, so clean up after them.
+            _WORKER_OPERATORS.pop(token, None)
 
-    def _handle(self, iterable, executor):
-        # After we submit a job, we'll store the future in the queue and the `not_done` set.
-        # If the not_done set is ever too small, we'll fill it up to maximize pool occupancy.
-        # If the not_done set is full, then we wait for the first future to complete.
-        # The remaining futures are used to prepopulate the `not_done` set for the next iteration.
-        # We yield the elements in submission order.
-        queue: collections.deque[cf.Future[U]] = collections.deque()
-        not_done: set[cf.Future[U]] = set()
-        for elem in iterable:
-            fut = executor.submit(self.op.send, elem)
-            queue.append(fut)
-            not_done.add(fut)
-            if len(not_done) < self.pool_size:
-                # Keep the pool full!
-                continue
+    def _stream(self, iterable, executor, task):
+        self._progress = None
+        if self._resume is not None:
+            # Resubmit the elements whose results weren't all yielded before.
+            (elements, skip), self._resume = self._resume, None
+            iterable = itertools.chain(elements, iterable)
+            self._progress = _Progress(skip)
+
+        if self.tracer is not None:
+            task = functools.partial(task, traced=True)
+        sizer = _ChunkSizer(self.chunksize)
+        return self._handle(sizer.chunk(iterable), executor=executor, task=task, sizer=sizer)
+
+    def _submit(self, executor, task, chunk, sizer, completions) -> cf.Future:
+        fut = self.transport.submit(executor, task, chunk)
+        fut.add_done_callback(sizer.observe)
+        fut.add_done_callback(completions.put)
+        if self.stats is not None:
+            fut.add_done_callback(self.stats.observe)
+        if self.tracer is not None:
+            name = f"{type(self).__name__}[{type(self.op).__name__}]"
+            fut.add_done_callback(functools.partial(self.tracer.record_worker_spans, name))
+        return fut
+
+    def _chunk_bytes(self, chunk: list) -> int:
+        if self.max_inflight_bytes is None:
+            return 0
+        return sum(map(self.sizer, chunk))
+
+    def _fits(self, used: int, nbytes: int) -> bool:
+        return self.max_inflight_bytes is None or used + nbytes <= self.max_inflight_bytes
+
+    def _handle(self, chunks, executor, task, sizer):
+        # Futures report their own completion onto `completions`, so each completion is
+        # handled in O(1) rather than by rescanning every in-flight future.
+        # `pending` holds submitted futures in order, both running ones and completed ones
+        # waiting behind a slower head. Its length is capped by the reorder window.
+        # A future can be done before its callback has queued it, so a future only counts
+        # as finished (and stops counting as in flight) once it has come off `completions`.
+        completions: queue.SimpleQueue[cf.Future] = queue.SimpleQueue()
+        pending: collections.deque[cf.Future] = collections.deque()
+        finished: set[cf.Future] = set()
+        pending_bytes: collections.deque[int] = collections.deque()
+        window = self.reorder_window or float("inf")
+        progress = self._progress
+        inflight = 0
+        used = 0
+        # A chunk taken from `chunks`, waiting for room in the byte budget.
+        held: tp.Optional[tuple[list, int]] = None
+        chunks = iter(chunks)
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and inflight < self.max_inflight and len(pending) < window:
+                    if held is None:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            exhausted = True
+                            break
+                        held = (chunk, self._chunk_bytes(chunk))
+                        if progress is not None:
+                            progress.chunks.append(chunk)
+                    chunk, nbytes = held
+                    if pending and not self._fits(used, nbytes):
+                        break
+
+                    held = None
+                    pending.append(self._submit(executor, task, chunk, sizer, completions))
+                    pending_bytes.append(nbytes)
+                    inflight += 1
+                    used += nbytes
+                    self.inflight_bytes += nbytes
+                    if self.stats is not None:
+                        self.stats.sample(inflight, len(pending) - inflight, used)
+
+                if not pending:
+                    return
 
-            _done, not_done = cf.wait(not_done, return_when=cf.FIRST_COMPLETED)
-            while queue and queue[0].done():
-                yield queue.popleft().result()
+                # We can't submit anything else, so block until something completes.
+                if pending[0] not in finished:
+                    finished.add(completions.get())
+                    inflight -= 1
+
+                inflight -= _drain(completions, finished)
+                while pending and pending[0] in finished:
+                    fut = pending.popleft()
+                    finished.remove(fut)
+                    results = self.transport.result(fut)
+                    yield from (results if progress is None else progress.emit(results))
+                    nbytes = pending_bytes.popleft()
+                    used -= nbytes
+                    self.inflight_bytes -= nbytes
+        finally:
+            # Only reached with pending futures if the consumer stopped early.
+            self.inflight_bytes -= used
+            for fut in pending:
+                fut.cancel()
+                self.transport.discard(fut)
+
+    # ---- Checkpointing (see `Checkpoint`) ----
+
+    def _checkpoint(self) -> tuple[list, int]:
+        if self._resume is not None:
+            return self._resume
+        return ([], 0) if self._progress is None else self._progress.state()
+
+    def _restore(self, state: tp.Optional[tuple[list, int]]) -> None:
+        self._resume = ([], 0) if state is None else state
 
-            # Filter out any elements that completed while we were iterating.
-            not_done = {f for f in not_done if not f.done()}
 
-        # If we exhaust the source iterable, make to sure to yield the remaining elements.
-        while queue:
-            yield queue.popleft().result()
+def _drain(completions: queue.SimpleQueue, finished: set) -> int:
+    """Move every completion already queued into `finished`, returning how many there were."""
+    count = 0
+    while True:
+        try:
+            finished.add(completions.get_nowait())
+        except queue.Empty:
+            return count
+        count += 1
 
 
 class UnorderedPoolMap(PoolMap[T, U], tp.Generic[T, U]):
     """A PoolMap-varients where items are not necessarily yielded in iteration order.
 
     For tasks where the order of yielded elements is not critical, this can be slightly
-    lower latency than the default PoolMap.
+    lower latency than the default PoolMap. Results are yielded as they complete, so
+    `reorder_window` does not apply.
     """
 
-    def _handle(self, iterable, executor):
-        not_done: set[cf.Future[U]] = set()
-        for elem in iterable:
-            not_done.add(executor.submit(self.op.send, elem))
+    # Completion order isn't input order, so slices can't move ahead of it.
+    pure = False
 
-            if len(not_done) < self.pool_size:
-                # Keep the pool full!
-                continue
+    def _restore(self, state):
+        msg = "An UnorderedPoolMap can't be checkpointed, since it yields out of order."
+        raise TypeError(msg)
 
-            done, not_done = cf.wait(not_done, return_when=cf.FIRST_COMPLETED)
+    def _handle(self, chunks, executor, task, sizer):
+        completions: queue.SimpleQueue[cf.Future] = queue.SimpleQueue()
+        inflight: dict[cf.Future, int] = {}
+        used = 0
+        held: tp.Optional[tuple[list, int]] = None
+        chunks = iter(chunks)
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(inflight) < self.max_inflight:
+                    if held is None:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            exhausted = True
+                            break
+                        held = (chunk, self._chunk_bytes(chunk))
+                    chunk, nbytes = held
+                    if inflight and not self._fits(used, nbytes):
+                        break
 
-            for fut in done:
-                yield fut.result()
+                    held = None
+                    inflight[self._submit(executor, task, chunk, sizer, completions)] = nbytes
+                    used += nbytes
+                    self.inflight_bytes += nbytes
+                    if self.stats is not None:
+                        self.stats.sample(len(inflight), 0, used)
 
-        for completed_fut in cf.as_completed(not_done):
-            yield completed_fut.result()
+                if not inflight:
+                    return
+
+                fut = completions.get()
+                # Once its results are decoded, closing early mustn't discard them again.
+                nbytes = inflight.pop(fut)
+                used -= nbytes
+                self.inflight_bytes -= nbytes
+                yield from self.transport.result(fut)
+        finally:
+            self.inflight_bytes -= used
+            for fut in inflight:
+                fut.cancel()
+                self.transport.discard(fut)
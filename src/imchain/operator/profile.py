@@ -0,0 +1,177 @@
+"""Statistics collected by `Pipeline.profile`."""
+
+import dataclasses
+import time
+
+import typing_extensions as tp
+
+T = tp.TypeVar("T")
+
+__all__ = ("PoolStats", "Profile", "StageStats")
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclasses.dataclass
+class PoolStats:
+    """Scheduling statistics for a PoolMap.
+
+    Set `PoolMap.stats` to an instance to start recording. `Pipeline.profile` does this
+    for the duration of a run.
+    """
+
+    pool_size: int = 1
+    submitted: int = 0
+    completed: int = 0
+    worker_time: float = 0.0
+    max_inflight: int = 0
+    max_buffered: int = 0
+    max_inflight_bytes: int = 0
+    start: tp.Optional[float] = None
+    end: tp.Optional[float] = None
+    _inflight_total: int = 0
+    _samples: int = 0
+
+    def sample(self, inflight: int, buffered: int = 0, nbytes: int = 0) -> None:
+        """Record the chunks in flight, completed-but-buffered chunks, and their bytes.
+
+        Bytes are only measured if the PoolMap has a byte budget.
+        """
+        if self.start is None:
+            self.start = time.perf_counter()
+        self.submitted += 1
+        self._samples += 1
+        self._inflight_total += inflight
+        self.max_inflight = max(self.max_inflight, inflight)
+        self.max_buffered = max(self.max_buffered, buffered)
+        self.max_inflight_bytes = max(self.max_inflight_bytes, nbytes)
+
+    def observe(self, fut) -> None:
+        """Done-callback recording a chunk's worker time."""
+        self.end = time.perf_counter()
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        self.completed += 1
+        self.worker_time += fut.result()[1]
+
+    @property
+    def mean_inflight(self) -> float:
+        return self._inflight_total / self._samples if self._samples else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the pool's capacity spent running tasks, between submit and finish."""
+        if self.start is None or self.end is None or self.end <= self.start:
+            return 0.0
+        return self.worker_time / ((self.end - self.start) * self.pool_size)
+
+
+@dataclasses.dataclass
+class StageStats:
+    """Statistics for one operator of a profiled Pipeline."""
+
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    total_time: float = 0.0
+    upstream_time: float = 0.0
+    pulls: list[float] = dataclasses.field(default_factory=list, repr=False)
+    pool: tp.Optional[PoolStats] = None
+
+    @property
+    def self_time(self) -> float:
+        """Time spent producing this stage's outputs, excluding time spent upstream.
+
+        Stages which iterate upstream in another thread (e.g. `Stage`, `Prefetch`) can't
+        be separated from their upstream, so their self time is approximate.
+        """
+        return max(0.0, self.total_time - self.upstream_time)
+
+    def latency(self, q: float) -> float:
+        """The `q`-th quantile of the time taken to pull each output, in seconds."""
+        return _percentile(sorted(self.pulls), q)
+
+    def meter_input(self, iterable: tp.Iterable[T]) -> tp.Generator[T, None, None]:
+        """Wrap a stage's input, counting items and the time spent producing them."""
+        iterator = iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.upstream_time += time.perf_counter() - start
+                self.items_in += 1
+                yield item
+        finally:
+            _close(iterator)
+
+    def meter_output(self, iterable: tp.Iterable[T]) -> tp.Generator[T, None, None]:
+        """Wrap a stage's output, counting items and timing each pull."""
+        iterator = iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed = time.perf_counter() - start
+                    self.total_time += elapsed
+                self.pulls.append(elapsed)
+                self.items_out += 1
+                yield item
+        finally:
+            _close(iterator)
+
+
+def _close(iterator) -> None:
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
+
+
+@dataclasses.dataclass
+class Profile:
+    """Per-stage statistics from `Pipeline.profile`."""
+
+    stages: list[StageStats] = dataclasses.field(default_factory=list)
+    wall_time: float = 0.0
+
+    def report(self) -> str:
+        """Render a summary table, one row per stage."""
+        header = (
+            f"{'#':>2}  {'stage':<24} {'in':>8} {'out':>8} {'self s':>9} {'self %':>7}"
+            f" {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}"
+        )
+        lines = [header, "-" * len(header)]
+        total = sum(stage.self_time for stage in self.stages) or 1.0
+        for idx, stage in enumerate(self.stages):
+            lines.append(
+                f"{idx:>2}  {stage.name[:24]:<24} {stage.items_in:>8} {stage.items_out:>8}"
+                f" {stage.self_time:>9.4f} {100 * stage.self_time / total:>6.1f}%"
+                f" {1e3 * stage.latency(0.5):>8.3f} {1e3 * stage.latency(0.9):>8.3f}"
+                f" {1e3 * stage.latency(0.99):>8.3f}"
+            )
+            if stage.pool is not None:
+                pool = stage.pool
+                line = (
+                    f"{'':>4}{'pool':<24} inflight mean {pool.mean_inflight:.1f}"
+                    f" max {pool.max_inflight}, buffered max {pool.max_buffered},"
+                    f" utilization {100 * pool.utilization:.1f}%"
+                )
+                if pool.max_inflight_bytes:
+                    line += f", bytes max {pool.max_inflight_bytes}"
+                lines.append(line)
+        lines.append(f"wall time: {self.wall_time:.4f}s")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.report()
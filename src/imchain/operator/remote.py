@@ -0,0 +1,391 @@
+"""A socket-based executor, for running PoolMap workers on other machines.
+
+Workers are started with `serve`, or from the command line:
+
+    python -m imchain.operator.remote 0.0.0.0:7000
+    python -m imchain.operator.remote unix:/tmp/imchain.sock
+
+Tasks and results are pickled, so a worker runs whatever its clients send it. Only
+expose workers on trusted networks.
+"""
+
+import argparse
+import collections
+import concurrent.futures as cf
+import functools
+import itertools
+import os
+import pickle
+import socket
+import struct
+import threading
+
+import typing_extensions as tp
+
+from .pool import _WORKER_OPERATORS, PoolMap, UnorderedPoolMap, _install_operator, _run_shipped
+
+T = tp.TypeVar("T")
+U = tp.TypeVar("U")
+
+__all__ = ("RemoteExecutor", "RemotePoolMap", "UnorderedRemotePoolMap", "serve")
+
+# A TCP (host, port) pair, or the path of a Unix socket.
+Address = tp.Union[tuple[str, int], str, os.PathLike]
+
+# Each message is a pickled tuple, prefixed by its length.
+#   Client to worker: ("init", fn, args) or ("task", id, fn, args, kwargs).
+#   Worker to client: ("result", id, ok, value), where `value` is an exception if not `ok`.
+_HEADER = struct.Struct("!Q")
+
+
+def _send(sock: socket.socket, msg: tuple) -> None:
+    data = pickle.dumps(msg, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> tp.Optional[bytearray]:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    while view:
+        received = sock.recv_into(view)
+        if not received:
+            return None
+        view = view[received:]
+    return buf
+
+
+def _recv(sock: socket.socket) -> tp.Optional[tuple]:
+    """Receive one message, or None if the peer closed the connection."""
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    data = _recv_exactly(sock, _HEADER.unpack(header)[0])
+    if data is None:
+        return None
+    return pickle.loads(data)
+
+
+def _is_unix(address: Address) -> bool:
+    return not isinstance(address, tuple)
+
+
+def _connect(address: Address) -> socket.socket:
+    if _is_unix(address):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(os.fspath(address))
+        return sock
+
+    sock = socket.create_connection(address)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def _listen(address: Address) -> socket.socket:
+    if _is_unix(address):
+        path = os.fspath(address)
+        if os.path.exists(path):
+            os.unlink(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+    else:
+        sock = socket.create_server(address)
+    sock.listen()
+    return sock
+
+
+def _picklable_error(exc: BaseException) -> BaseException:
+    try:
+        pickle.dumps(exc)
+    except Exception:
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+    return exc
+
+
+# How many client connections use each PoolMap operator installed in this worker, so
+# that an operator is removed once the last of them disconnects.
+_token_users: collections.Counter[str] = collections.Counter()
+_token_lock = threading.Lock()
+
+
+def _operator_token(fn: tp.Callable, args: tuple) -> tp.Optional[str]:
+    """The token of the PoolMap operator which calling `fn(*args)` installs, if any."""
+    if fn is _install_operator:
+        return args[0]
+    if isinstance(fn, functools.partial) and fn.func is _run_shipped:
+        return fn.args[0]
+    return None
+
+
+def _use_token(token: str, tokens: set[str]) -> None:
+    if token in tokens:
+        return
+    tokens.add(token)
+    with _token_lock:
+        _token_users[token] += 1
+
+
+def _release_tokens(tokens: set[str]) -> None:
+    with _token_lock:
+        for token in tokens:
+            _token_users[token] -= 1
+            if _token_users[token] <= 0:
+                del _token_users[token]
+                _WORKER_OPERATORS.pop(token, None)
+
+
+def _handle_client(conn: socket.socket) -> None:
+    """Run a client's tasks in the order they arrive, sending back each result."""
+    init_error = None
+    tokens: set[str] = set()
+    try:
+        with conn:
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            while (msg := _recv(conn)) is not None:
+                if msg[0] == "init":
+                    _, fn, args = msg
+                    token = _operator_token(fn, args)
+                    if token is not None:
+                        _use_token(token, tokens)
+                    try:
+                        fn(*args)
+                    except BaseException as exc:
+                        init_error = _picklable_error(exc)
+                    continue
+
+                _, task_id, fn, args, kwargs = msg
+                token = _operator_token(fn, args)
+                if token is not None:
+                    _use_token(token, tokens)
+                if init_error is not None:
+                    _send(conn, ("result", task_id, False, init_error))
+                    continue
+                try:
+                    value, ok = fn(*args, **kwargs), True
+                except BaseException as exc:
+                    value, ok = _picklable_error(exc), False
+                _send(conn, ("result", task_id, ok, value))
+    finally:
+        _release_tokens(tokens)
+
+
+def serve(address: Address, *, ready: tp.Optional[tp.Callable[[Address], None]] = None) -> None:
+    """Serve tasks from RemoteExecutor clients on `address`, forever.
+
+    Each client connection is handled in its own thread, running its tasks one at a
+    time. Start one worker per core, on different addresses, to use a whole machine.
+
+    Args:
+        address: A TCP (host, port) pair, or the path of a Unix socket. Port 0 picks a
+            free port.
+        ready: Called with the bound address once the worker is accepting connections.
+    """
+    with _listen(address) as server:
+        if ready is not None:
+            ready(server.getsockname())
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=_handle_client, args=(conn,), daemon=True).start()
+
+
+class _Connection:
+    """A client connection, on which tasks are pipelined and results stream back."""
+
+    def __init__(self, address: Address) -> None:
+        self.address = address
+        self.sock = _connect(address)
+        self.futures: dict[int, cf.Future] = {}
+        # Set once the reader has stopped, after which no result can arrive.
+        self.broken = False
+        # Sending is locked separately from the futures, so the reader never waits on a
+        # blocked send; otherwise both ends could wait on each other's full buffers.
+        self.send_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def send(self, msg: tuple, task_id: tp.Optional[int] = None, fut=None) -> None:
+        """Send `msg`. For a task, `fut` fails if the connection is, or gets, lost."""
+        if fut is None:
+            with self.send_lock:
+                _send(self.sock, msg)
+            return
+
+        with self.lock:
+            if self.broken:
+                fut.set_exception(self._lost())
+                return
+            self.futures[task_id] = fut
+        try:
+            with self.send_lock:
+                _send(self.sock, msg)
+        except OSError as exc:
+            # Unless the reader has already failed it, the future is ours to fail.
+            with self.lock:
+                owned = self.futures.pop(task_id, None) is not None
+            if owned:
+                lost = self._lost()
+                lost.__cause__ = exc
+                fut.set_exception(lost)
+
+    def _read(self) -> None:
+        try:
+            while (msg := _recv(self.sock)) is not None:
+                _, task_id, ok, value = msg
+                with self.lock:
+                    fut = self.futures.pop(task_id)
+                if ok:
+                    fut.set_result(value)
+                else:
+                    fut.set_exception(value)
+        except OSError:
+            pass
+        finally:
+            self._fail_outstanding()
+
+    def _fail_outstanding(self) -> None:
+        with self.lock:
+            self.broken = True
+            futures, self.futures = self.futures, {}
+        for fut in futures.values():
+            if not fut.done():
+                fut.set_exception(self._lost())
+
+    def _lost(self) -> cf.BrokenExecutor:
+        return cf.BrokenExecutor(f"Lost the connection to worker {self.address!r}.")
+
+    @property
+    def outstanding(self) -> int:
+        return len(self.futures)
+
+    def close(self) -> None:
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.reader.join()
+
+
+class RemoteExecutor(cf.Executor):
+    """An executor which runs tasks on workers started with `serve`.
+
+    One connection is opened per worker address. Each task is sent to the connection
+    with the fewest outstanding tasks, without waiting for earlier ones, and each result
+    is streamed back as soon as it's ready. `initializer` runs once on each worker
+    connection, so a PoolMap ships its operator once per worker. Tasks on a worker whose
+    connection is lost fail with `cf.BrokenExecutor`, and later tasks go to the others.
+
+    To use it as a PoolMap's `executor_cls`, bind the addresses first, e.g.
+    `functools.partial(RemoteExecutor, addresses)`, or use `RemotePoolMap`.
+
+    Examples:
+        >>> addresses = [("node1", 7000), ("node2", 7000)]
+        >>> op = iop.PoolMap(denoise, executor_cls=functools.partial(RemoteExecutor, addresses))
+    """
+
+    def __init__(
+        self,
+        addresses: tp.Sequence[Address],
+        max_workers: tp.Optional[int] = None,
+        initializer: tp.Optional[tp.Callable] = None,
+        initargs: tuple = (),
+    ) -> None:
+        """
+        Args:
+            addresses: Worker addresses: TCP (host, port) pairs, or Unix socket paths.
+            max_workers: Ignored; there is one worker per address. Accepted so this can
+                be used as a PoolMap's `executor_cls`.
+            initializer: A callable run on each worker before its first task.
+            initargs: Arguments for `initializer`.
+        """
+        if not addresses:
+            msg = "Expected at least one worker address."
+            raise ValueError(msg)
+
+        self._connections = [_Connection(address) for address in addresses]
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        if initializer is not None:
+            for conn in self._connections:
+                conn.send(("init", initializer, initargs))
+
+    def submit(self, fn, /, *args, **kwargs) -> cf.Future:
+        with self._lock:
+            if self._shutdown:
+                msg = "Cannot submit tasks after shutdown."
+                raise RuntimeError(msg)
+            task_id = next(self._ids)
+            # Prefer live connections; if none are left, the task fails on a lost one.
+            live = [conn for conn in self._connections if not conn.broken]
+            conn = min(live or self._connections, key=lambda c: c.outstanding)
+
+        fut = cf.Future()
+        fut.set_running_or_notify_cancel()
+        conn.send(("task", task_id, fn, args, kwargs), task_id, fut)
+        return fut
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._shutdown = True
+        if wait:
+            for conn in self._connections:
+                with conn.lock:
+                    futures = list(conn.futures.values())
+                cf.wait(futures)
+        for conn in self._connections:
+            conn.close()
+
+
+class RemotePoolMap(PoolMap[T, U]):
+    """A PoolMap whose workers run on other machines, via `RemoteExecutor`.
+
+    There is one worker per address, and up to `pipeline` chunks are queued on each, so
+    the network round trip overlaps with work. Other arguments are as for `PoolMap`.
+
+    Examples:
+        >>> op = iop.RemotePoolMap(denoise, [("node1", 7000), ("node2", 7000)], chunksize=8)
+    """
+
+    def __init__(
+        self,
+        func,
+        addresses: tp.Sequence[Address],
+        *,
+        pipeline: int = 2,
+        **kwargs,
+    ) -> None:
+        if pipeline < 1:
+            msg = f"Expected `pipeline` to be positive, but got {pipeline}."
+            raise ValueError(msg)
+
+        kwargs.setdefault("max_inflight", pipeline * len(addresses))
+        super().__init__(
+            func,
+            pool_size=len(addresses),
+            executor_cls=functools.partial(RemoteExecutor, list(addresses)),
+            **kwargs,
+        )
+        self.addresses = list(addresses)
+
+
+class UnorderedRemotePoolMap(RemotePoolMap[T, U], UnorderedPoolMap[T, U]):
+    """A RemotePoolMap which yields results as they complete."""
+
+
+def _parse_address(text: str) -> Address:
+    if text.startswith("unix:"):
+        return text[len("unix:") :]
+    host, _, port = text.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run an imchain remote worker.")
+    parser.add_argument("address", help='"HOST:PORT" to listen on TCP, or "unix:PATH".')
+    args = parser.parse_args()
+    serve(_parse_address(args.address), ready=lambda addr: print(f"Listening on {addr}"))
+
+
+if __name__ == "__main__":
+    main()
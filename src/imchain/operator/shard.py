@@ -0,0 +1,290 @@
+"""Running whole operators over partitions of a stream, in parallel."""
+
+import collections
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+
+import typing_extensions as tp
+
+from .core import Operator
+from .stage import _END, _POLL_INTERVAL, _get, _put
+
+T = tp.TypeVar("T")
+U = tp.TypeVar("U")
+
+__all__ = ("ShardedPipe",)
+
+# Shard workers send (done, value) messages onto a shared output queue, as Stage does.
+# For an item, `value` is one of:
+#   (shard, seq, output): an output, produced while processing input number `seq`.
+#   (shard, seq): progress; the shard won't produce any more outputs for inputs <= `seq`.
+#   (shard,): the shard has finished.
+
+
+def _run_shard(shard: int, op: Operator, inputs, outputs, stop) -> None:
+    consumed = -1
+    silent = False  # Whether the latest input hasn't produced any output yet.
+
+    def source():
+        nonlocal consumed, silent
+        while True:
+            if silent or inputs.empty():
+                # Let the merge move on, rather than wait for our next output.
+                if not _put(outputs, (False, (shard, consumed)), stop):
+                    return
+            done, value = _get(inputs, stop)
+            if done:
+                return
+            consumed, item = value
+            silent = True
+            yield item
+
+    results = op.pipe(source())
+    try:
+        for output in results:
+            if stop.is_set():
+                return
+            silent = False
+            if not _put(outputs, (False, (shard, consumed, output)), stop):
+                return
+        _put(outputs, (False, (shard,)), stop)
+    except BaseException as exc:
+        _put(outputs, (True, exc), stop)
+    finally:
+        close = getattr(results, "close", None)
+        if close is not None:
+            close()
+        if stop.is_set() and hasattr(outputs, "cancel_join_thread"):
+            # The parent stopped reading, so don't wait to flush our outputs at exit.
+            outputs.cancel_join_thread()
+
+
+class _Routing:
+    """Tracks which inputs went to which shard, to bound each shard's future outputs.
+
+    The merge records what each shard has reported, and the feeder waits while it is
+    `window` inputs ahead of the earliest position any shard may still produce outputs
+    for, so that no shard runs far ahead of the ordered merge.
+    """
+
+    def __init__(self, shards: int, window: tp.Optional[int]) -> None:
+        self.window = window
+        self.cond = threading.Condition()
+        self.routed = [collections.deque() for _ in range(shards)]
+        self.next_seq = 0
+        # The latest input each shard has reported, and whether it may still produce
+        # outputs for that input.
+        self.consumed = [-1] * shards
+        self.busy = [False] * shards
+        self.finished = [False] * shards
+        self.frontier = 0
+
+    def route(self, seq: int, shard: int, stop) -> bool:
+        """Record that input `seq` goes to `shard`, once it is within the window."""
+        with self.cond:
+            while self.window is not None and seq >= self.frontier + self.window:
+                if stop.is_set():
+                    return False
+                self.cond.wait(_POLL_INTERVAL)
+            self.routed[shard].append(seq)
+            self.next_seq = seq + 1
+        return True
+
+    def update(self, message: tuple) -> list[float]:
+        """Record a message from a shard, returning the bound on each shard's outputs."""
+        with self.cond:
+            shard = message[0]
+            if len(message) == 1:
+                self.finished[shard] = True
+            else:
+                self.consumed[shard] = message[1]
+                self.busy[shard] = len(message) == 3
+            lows = [self._low(idx) for idx in range(len(self.routed))]
+            self.frontier = min(lows)
+            self.cond.notify_all()
+        return lows
+
+    def _low(self, shard: int) -> float:
+        if self.finished[shard]:
+            return float("inf")
+        if self.busy[shard]:
+            return self.consumed[shard]
+        # The shard is done with its latest input, so its next output is for an input
+        # routed to it later.
+        routed = self.routed[shard]
+        while routed and routed[0] <= self.consumed[shard]:
+            routed.popleft()
+        return routed[0] if routed else self.next_seq
+
+
+def _feed(iterable, route, inputs, outputs, stop, routing=None) -> None:
+    """Send each item of `iterable` to its shard's queue, then end every shard's input."""
+    try:
+        for seq, item in enumerate(iterable):
+            shard = route(seq, item)
+            if routing is not None and not routing.route(seq, shard, stop):
+                return
+            if not _put(inputs[shard], (False, (seq, item)), stop):
+                return
+        for q in inputs:
+            _put(q, _END, stop)
+    except BaseException as exc:
+        _put(outputs, (True, exc), stop)
+    finally:
+        close = getattr(iterable, "close", None)
+        if close is not None:
+            close()
+
+
+class ShardedPipe(Operator[T, U]):
+    """Runs an operator over `shards` partitions of the stream, in parallel.
+
+    Each shard is a worker process (or thread, if `mode="thread"`) which calls `op.pipe`
+    once, over its own partition. Unlike `PoolMap`, which sends each element through
+    `op` in isolation, the operator keeps its state across the elements of a shard, so
+    `Buffer`, `Filter`, `Take` and the like work inside it, and any setup in `pipe` is
+    paid once per shard. The operator is pickled once per shard process.
+
+    Elements are dealt to shards round-robin, or by `hash(key(element))` if `key` is
+    given, so that elements with the same key always meet the same state. Each shard
+    holds at most `buffer` elements it hasn't started on, and the shards together hold
+    at most `shards * buffer` outputs which haven't been merged.
+
+    With `ordered=True`, outputs are merged in input order: each output is placed at the
+    position of the element its shard was processing when it was produced. Elements are
+    then read at most `shards * (buffer + 1)` ahead of the earliest one a shard may still
+    produce outputs for, so a slow shard holds the others back rather than letting
+    their outputs pile up. Otherwise, outputs are yielded as soon as any shard produces
+    them.
+
+    Examples:
+        >>> segment = iop.Map(decode) | iop.Filter(is_valid) | iop.Buffer(8) | iop.Map(model)
+        >>> chain = iop.ShardedPipe(segment, shards=4) | iop.Chain()
+    """
+
+    def __init__(
+        self,
+        op: Operator[T, U],
+        shards: tp.Optional[int] = None,
+        *,
+        key: tp.Optional[tp.Callable[[T], tp.Hashable]] = None,
+        ordered: bool = True,
+        mode: tp.Literal["thread", "process"] = "process",
+        buffer: int = 2,
+        mp_context: tp.Optional[multiprocessing.context.BaseContext] = None,
+    ) -> None:
+        """
+        Args:
+            op: The operator each shard runs.
+            shards: Number of shards. Defaults to the number of CPUs.
+            key: A function of an element choosing its shard. Defaults to round-robin.
+            ordered: Flag to merge outputs in input order.
+            mode: Whether shards are "process"es or "thread"s.
+            buffer: Maximum number of elements queued for each shard.
+            mp_context: Multiprocessing context for process shards.
+        """
+        self.op = op
+        self.shards = (os.cpu_count() if shards is None else shards) or 1
+        if self.shards < 1 or buffer < 1:
+            msg = f"Expected positive `shards` and `buffer`, but got {self.shards} and {buffer}."
+            raise ValueError(msg)
+        if mode not in ("thread", "process"):
+            msg = f'Expected `mode` to be "thread" or "process", but got {mode!r}.'
+            raise ValueError(msg)
+
+        self.key = key
+        self.ordered = ordered
+        self.mode = mode
+        self.buffer = buffer
+        self.mp_context = mp_context
+
+    def _route(self, seq: int, item) -> int:
+        if self.key is None:
+            return seq % self.shards
+        return hash(self.key(item)) % self.shards
+
+    def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[U, None, None]:
+        if self.mode == "process":
+            ctx = self.mp_context or multiprocessing.get_context()
+            inputs = [ctx.Queue(self.buffer) for _ in range(self.shards)]
+            outputs = ctx.Queue(self.shards * self.buffer)
+            stop = ctx.Event()
+            spawn = ctx.Process
+        else:
+            inputs = [queue.Queue(self.buffer) for _ in range(self.shards)]
+            outputs = queue.Queue(self.shards * self.buffer)
+            stop = threading.Event()
+            spawn = threading.Thread
+
+        workers = [
+            spawn(target=_run_shard, args=(idx, self.op, q, outputs, stop), daemon=True)
+            for idx, q in enumerate(inputs)
+        ]
+        for worker in workers:
+            worker.start()
+        routing = _Routing(self.shards, self.shards * (self.buffer + 1)) if self.ordered else None
+        feeder = threading.Thread(
+            target=_feed,
+            args=(iter(iterable), self._route, inputs, outputs, stop, routing),
+            daemon=True,
+        )
+        feeder.start()
+
+        try:
+            if self.ordered:
+                yield from self._merge_ordered(outputs, stop, routing)
+            else:
+                yield from self._merge_unordered(outputs, stop)
+        finally:
+            stop.set()
+            feeder.join()
+            for q in inputs:
+                if hasattr(q, "cancel_join_thread"):
+                    q.cancel_join_thread()
+            for worker in workers:
+                worker.join(timeout=1)
+                if worker.is_alive() and hasattr(worker, "terminate"):
+                    worker.terminate()
+                    worker.join()
+
+    def _messages(self, outputs, stop):
+        """Yield the item messages of all shards, until every shard has finished."""
+        running = self.shards
+        while running:
+            done, value = _get(outputs, stop)
+            if done:
+                if value is not None:
+                    raise value
+                return
+            if len(value) == 1:
+                running -= 1
+            yield value
+
+    def _merge_unordered(self, outputs, stop):
+        for message in self._messages(outputs, stop):
+            if len(message) == 3:
+                yield message[2]
+
+    def _merge_ordered(self, outputs, stop, routing):
+        heap = []
+        counter = itertools.count()
+        for message in self._messages(outputs, stop):
+            # `lows[shard]` bounds the input positions of the shard's future outputs.
+            lows = routing.update(message)
+            if len(message) == 3:
+                shard, seq, output = message
+                heapq.heappush(heap, (seq, next(counter), shard, output))
+
+            while heap:
+                seq, _, shard, output = heap[0]
+                if any(low <= seq for idx, low in enumerate(lows) if idx != shard):
+                    break
+                heapq.heappop(heap)
+                yield output
+
+        while heap:
+            yield heapq.heappop(heap)[3]
@@ -1,3 +1,4 @@
+import abc
 import itertools
 
 import typing_extensions as tp
@@ -8,14 +9,65 @@ T = tp.TypeVar("T")
 
 
 __all__ = (
+    "Seekable",
     "Skip",
     "Slice",
     "Take",
 )
 
 
+class Seekable(abc.ABC, tp.Generic[T]):
+    """A source which can produce a slice of its elements without reading the rest.
+
+    For example, a reader of a frame file can seek straight to the first frame wanted.
+    `Slice` calls `slice` with non-negative `start` and `stop` (or None) and a positive
+    `step` (or None), with the same meaning as for `itertools.islice`.
+
+    Sources opt in by subclassing Seekable, or with `Seekable.register`. Having a
+    `slice` method isn't enough, since others (e.g. pyarrow's and polars') take
+    different arguments.
+    """
+
+    @abc.abstractmethod
+    def slice(
+        self, start: tp.Optional[int], stop: tp.Optional[int], step: tp.Optional[int]
+    ) -> tp.Iterable[T]: ...
+
+
+# Sequences whose slices are known to be cheap. Not every Sequence supports slicing
+# (e.g. `collections.deque`), so others are iterated.
+_SLICEABLE = (list, tuple, range, str, bytes)
+
+
+def _slice_source(source, start, stop, step) -> tp.Optional[tp.Iterable]:
+    """Slice `source` directly, if it supports indexing or seeking. Otherwise, None."""
+    if (start is not None and start < 0) or (stop is not None and stop < 0):
+        return None
+    if step is not None and step < 1:
+        return None
+
+    if isinstance(source, Seekable):
+        return source.slice(start, stop, step)
+    if isinstance(source, _SLICEABLE):
+        return source[start:stop:step]
+    if getattr(source, "ndim", 0) > 0 and hasattr(source, "__array_interface__"):
+        # Slicing an array (or memmap) is a view, so skipped rows are never touched.
+        return source[start:stop:step]
+    return None
+
+
 class Slice(Operator[T, T]):
-    """Operator to apply slicing to an iterable."""
+    """Operator to apply slicing to an iterable.
+
+    Lists, tuples, ranges, strings and arrays are sliced by indexing, and `Seekable`
+    sources by calling their `slice` method, rather than by iterating over the skipped
+    elements. Within a Pipeline, this also applies when the only operators ahead of the
+    slice are pure (e.g. `Map(func, pure=True)`).
+    """
+
+    # How many inputs a checkpointed slice has consumed (see `Checkpoint`).
+    _consumed: int = 0
+    _resume: tp.Optional[int] = None
 
     def __init__(self, start=None, stop=None, step=None):
         self.start = start
@@ -23,11 +75,48 @@ class Slice(Operator[T, T]):
         self.step = step
 
     def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[T, None, None]:
+        if self._resume is not None:
+            yield from self._pipe_tracked(iterable)
+            return
+
+        sliced = _slice_source(iterable, self.start, self.stop, self.step)
+        if sliced is not None:
+            yield from sliced
+            return
+
         yield from itertools.islice(iterable, self.start, self.stop, self.step)
 
         if isinstance(iterable, tp.Generator):
             iterable.close()
 
+    def _pipe_tracked(self, iterable):
+        consumed, self._resume = self._resume, None
+        self._consumed = consumed
+
+        # The first index still to be yielded, after `consumed` inputs.
+        start, step = self.start or 0, self.step or 1
+        first = max(start, consumed)
+        first += -(first - start) % step
+        stop = None if self.stop is None else max(self.stop - consumed, 0)
+
+        yield from itertools.islice(self._count(iterable), first - consumed, stop, step)
+
+        if isinstance(iterable, tp.Generator):
+            iterable.close()
+
+    def _count(self, iterable):
+        for item in iterable:
+            self._consumed += 1
+            yield item
+
+    # ---- Checkpointing ----
+
+    def _checkpoint(self) -> int:
+        return self._consumed if self._resume is None else self._resume
+
+    def _restore(self, state: tp.Optional[int]) -> None:
+        self._resume = state or 0
+
 
 class Take(Slice[T]):
     """Operator to take the first `n`."""
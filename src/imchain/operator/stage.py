@@ -0,0 +1,161 @@
+import multiprocessing
+import queue
+import threading
+
+import typing_extensions as tp
+
+from .basics import Noop
+from .core import Operator
+
+T = tp.TypeVar("T")
+U = tp.TypeVar("U")
+
+__all__ = ("Prefetch", "Stage")
+
+# Items travel through stage queues as (done, value) pairs. `done` is False for an item.
+# When `done` is True, `value` is either None for the end of the stream, or an exception.
+_END = (True, None)
+_POLL_INTERVAL = 0.05
+
+
+def _put(q, msg, stop) -> bool:
+    """Put `msg` onto a bounded queue, giving up if `stop` is set while waiting."""
+    while True:
+        try:
+            q.put(msg, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                return False
+
+
+def _get(q, stop):
+    """Get a message from `q`, returning `_END` if `stop` is set while waiting."""
+    while True:
+        try:
+            return q.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            if stop.is_set():
+                return _END
+
+
+def _forward(iterable, q, stop) -> None:
+    """Put every item of `iterable` onto `q`, followed by an end or error message."""
+    try:
+        for item in iterable:
+            if not _put(q, (False, item), stop):
+                return
+        _put(q, _END, stop)
+    except BaseException as exc:
+        _put(q, (True, exc), stop)
+    finally:
+        close = getattr(iterable, "close", None)
+        if close is not None:
+            close()
+
+
+def _receive(q, stop) -> tp.Generator:
+    """Yield the items forwarded onto `q`, re-raising a forwarded error."""
+    while True:
+        done, value = _get(q, stop)
+        if done:
+            if value is not None:
+                raise value
+            return
+        yield value
+
+
+def _run_stage_process(op, inputs, outputs, stop) -> None:
+    _forward(op.pipe(_receive(inputs, stop)), outputs, stop)
+    if stop.is_set():
+        # The parent stopped reading, so don't wait to flush our outputs at exit.
+        outputs.cancel_join_thread()
+
+
+class Stage(Operator[T, U]):
+    """Runs an operator concurrently with the rest of the Pipeline.
+
+    The operator, along with everything upstream of it which isn't in another Stage,
+    runs in a background thread (or process, if `mode="process"`). Its outputs are
+    handed downstream through a queue of at most `buffer` items, which applies
+    backpressure: the stage pauses once it is `buffer` items ahead of its consumer.
+    That way an I/O-bound stage overlaps with a CPU-bound one.
+
+    In process mode, the upstream iterable is still iterated in this process, and its
+    items are pickled to the stage process; the operator is pickled once.
+
+    Closing the generator early (e.g. behind `Take`) stops the stage and closes its
+    operator's generator before `close` returns.
+
+    Examples:
+        >>> chain = Stage(iop.Map(read)) | Stage(iop.Map(decode), mode="process") | iop.Map(encode)
+    """
+
+    def __init__(
+        self,
+        op: tp.Optional[Operator[T, U]] = None,
+        *,
+        buffer: int = 1,
+        mode: tp.Literal["thread", "process"] = "thread",
+        mp_context: tp.Optional[multiprocessing.context.BaseContext] = None,
+    ) -> None:
+        if buffer < 1:
+            msg = f"Expected `buffer` to be positive, but got {buffer}."
+            raise ValueError(msg)
+        if mode not in ("thread", "process"):
+            msg = f'Expected `mode` to be "thread" or "process", but got {mode!r}.'
+            raise ValueError(msg)
+
+        self.op = Noop() if op is None else op
+        self.buffer = buffer
+        self.mode = mode
+        self.mp_context = mp_context
+
+    def pipe(self, iterable: tp.Iterable[T]) -> tp.Generator[U, None, None]:
+        if self.mode == "process":
+            yield from self._pipe_process(iterable)
+        else:
+            yield from self._pipe_thread(iterable)
+
+    def _pipe_thread(self, iterable):
+        outputs = queue.Queue(self.buffer)
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=_forward, args=(self.op.pipe(iterable), outputs, stop), daemon=True
+        )
+        worker.start()
+        try:
+            yield from _receive(outputs, stop)
+        finally:
+            stop.set()
+            worker.join()
+
+    def _pipe_process(self, iterable):
+        ctx = self.mp_context or multiprocessing.get_context()
+        inputs = ctx.Queue(self.buffer)
+        outputs = ctx.Queue(self.buffer)
+        stop = ctx.Event()
+
+        worker = ctx.Process(
+            target=_run_stage_process, args=(self.op, inputs, outputs, stop), daemon=True
+        )
+        worker.start()
+        feeder = threading.Thread(target=_forward, args=(iterable, inputs, stop), daemon=True)
+        feeder.start()
+        try:
+            yield from _receive(outputs, stop)
+        finally:
+            stop.set()
+            feeder.join()
+            inputs.cancel_join_thread()
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+
+
+class Prefetch(Stage[T, T]):
+    """Iterates upstream in a background thread, staying up to `n` items ahead."""
+
+    def __init__(self, n: int = 1) -> None:
+        super().__init__(buffer=n)
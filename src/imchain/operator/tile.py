@@ -0,0 +1,266 @@
+"""Splitting oversized arrays into overlapping tiles, and stitching results back together."""
+
+import collections
+import itertools
+import math
+
+import lazy_loader as lazy
+import typing_extensions as tp
+
+from .core import Operator
+
+np = lazy.load("numpy")
+
+__all__ = ("Tile", "Untile")
+
+
+def _origins(length: int, tile: int, overlap: int) -> list[int]:
+    """Start positions of the tiles along an axis, the last one flush with its end."""
+    if length <= tile:
+        return [0]
+    origins = list(range(0, length - tile + 1, tile - overlap))
+    if origins[-1] != length - tile:
+        origins.append(length - tile)
+    return origins
+
+
+def _cuts(origins: list[int], span: int, length: int) -> list[int]:
+    """Boundaries between the regions each tile keeps, halfway through each overlap."""
+    middles = [(start + prev + span) // 2 for prev, start in zip(origins, origins[1:])]
+    return [0, *middles, length]
+
+
+def _ramps(origins: list[int], span: int, length: int, dtype) -> list["np.ndarray"]:
+    """Blending weights along an axis for each tile, which taper across its overlaps.
+
+    The weights are normalized to sum to one at each position, so that the products of
+    the weights along each axis also sum to one over the tiles covering any element.
+    """
+    ramps = []
+    pos = np.arange(span, dtype=dtype)
+    total = np.zeros(length, dtype=dtype)
+    for idx, start in enumerate(origins):
+        ramp = np.ones(span, dtype=dtype)
+        if idx > 0:
+            lo = origins[idx - 1] + span - start
+            ramp = np.minimum(ramp, (pos + 1) / (lo + 1))
+        if idx < len(origins) - 1:
+            hi = start + span - origins[idx + 1]
+            ramp = np.minimum(ramp, (span - pos) / (hi + 1))
+        ramps.append(ramp)
+        total[start : start + span] += ramp
+    return [ramp / total[start : start + span] for ramp, start in zip(ramps, origins)]
+
+
+class Tile(Operator["np.ndarray", "np.ndarray"]):
+    """Splits each array into overlapping tiles, to be reassembled by `Untile`.
+
+    The leading `len(tile_shape)` axes are tiled; any others (e.g. channels) are kept
+    whole. Neighbouring tiles overlap by `overlap` along each tiled axis, and the last
+    tile along an axis is moved back to end flush with the array, so every tile has the
+    full `tile_shape` unless the array itself is smaller. Tiles are views of the array,
+    yielded in row-major order.
+
+    Tiles can be processed by any 1:1 operator which keeps them in order and doesn't
+    change their size along the tiled axes, such as a `PoolMap`, so that a single large
+    array is spread over all of its workers. The tile grid of each array is passed on
+    to the paired `Untile`, so a Tile must only be piped through one chain at a time.
+
+    Examples:
+        >>> tile = iop.Tile((1024, 1024), overlap=64)
+        >>> chain = tile | iop.PoolMap(denoise) | iop.Untile(tile, blend=True)
+    """
+
+    def __init__(
+        self, tile_shape: tp.Sequence[int], overlap: tp.Union[int, tp.Sequence[int]] = 0
+    ) -> None:
+        """
+        Args:
+            tile_shape: Size of a tile along each of the leading axes.
+            overlap: Overlap of neighbouring tiles, for all axes or for each one.
+        """
+        self.tile_shape = tuple(tile_shape)
+        if isinstance(overlap, int):
+            overlap = (overlap,) * len(self.tile_shape)
+        self.overlap = tuple(overlap)
+
+        if len(self.overlap) != len(self.tile_shape):
+            msg = f"Expected {len(self.tile_shape)} overlaps, but got {len(self.overlap)}."
+            raise ValueError(msg)
+        if not all(0 <= o < t for t, o in zip(self.tile_shape, self.overlap)):
+            msg = (
+                f"Expected each overlap to be non-negative and less than the tile size, but"
+                f" got tiles of {self.tile_shape} with overlap {self.overlap}."
+            )
+            raise ValueError(msg)
+
+        # The tile grid of each array, from `Tile.pipe` to `Untile.pipe`.
+        self._layouts: collections.deque[tuple[tuple[int, ...], list[list[int]]]] = (
+            collections.deque()
+        )
+
+    def pipe(self, iterable: tp.Iterable["np.ndarray"]) -> tp.Generator["np.ndarray", None, None]:
+        self._layouts.clear()
+        ndim = len(self.tile_shape)
+        for image in iterable:
+            image = np.asarray(image)
+            shape = image.shape[:ndim]
+            if image.ndim < ndim or 0 in shape:
+                msg = (
+                    f"Can't split an array of shape {image.shape} into tiles of {self.tile_shape}."
+                )
+                raise ValueError(msg)
+
+            grid = [_origins(*args) for args in zip(shape, self.tile_shape, self.overlap)]
+            # The layout is recorded before the tiles, so it is there when Untile needs it.
+            self._layouts.append((shape, grid))
+            for corner in itertools.product(*grid):
+                yield image[tuple(slice(c, c + t) for c, t in zip(corner, self.tile_shape))]
+
+
+class _Canvas:
+    """An output array under assembly from its tiles."""
+
+    def __init__(self, shape, grid, tile_shape, blend, allocate):
+        self.shape = shape
+        self.grid = grid
+        self.spans = tuple(min(t, n) for t, n in zip(tile_shape, shape))
+        # Tiles arrive in row-major order, so their grid positions are known in advance.
+        self.positions = itertools.product(*(range(len(origins)) for origins in grid))
+        self.count = 0
+        self.total = math.prod(len(origins) for origins in grid)
+        self.blend = blend
+        self.allocate = allocate
+        self.out = None
+
+    def _setup(self, result) -> None:
+        out_shape = self.shape + result.shape[len(self.shape) :]
+        self.out = self.allocate(out_shape, result.dtype)
+        if not self.blend:
+            self.cuts = [
+                _cuts(origins, span, n)
+                for origins, span, n in zip(self.grid, self.spans, self.shape)
+            ]
+            return
+
+        acc_dtype = np.result_type(result.dtype, np.float32)
+        self.ramps = [
+            _ramps(origins, span, n, acc_dtype)
+            for origins, span, n in zip(self.grid, self.spans, self.shape)
+        ]
+        # Tiles are accumulated into a band one tile high, starting at `self.band_start`;
+        # once a row of tiles is complete, the rows above the next one are final.
+        self.band = np.zeros((self.spans[0], *out_shape[1:]), dtype=acc_dtype)
+        self.band_start = 0
+
+    def add(self, result) -> None:
+        position = next(self.positions)
+        corner = [origins[idx] for origins, idx in zip(self.grid, position)]
+        if result.shape[: len(self.shape)] != self.spans:
+            msg = (
+                f"Expected a tile result of size {self.spans} along the tiled axes, but got"
+                f" shape {result.shape}."
+            )
+            raise ValueError(msg)
+        if self.count == 0:
+            self._setup(result)
+        self.count += 1
+
+        if not self.blend:
+            # Keep the part of the tile between the cuts either side of it.
+            region, part = [], []
+            for cuts, idx, start in zip(self.cuts, position, corner):
+                lo, hi = cuts[idx], cuts[idx + 1]
+                region.append(slice(lo, hi))
+                part.append(slice(lo - start, hi - start))
+            self.out[tuple(region)] = result[tuple(part)]
+            return
+
+        weight = None
+        for axis, idx in enumerate(position):
+            ramp = self.ramps[axis][idx]
+            ramp = ramp.reshape((-1,) + (1,) * (len(self.shape) - axis - 1))
+            weight = ramp if weight is None else weight * ramp
+        region = (slice(corner[0] - self.band_start, corner[0] - self.band_start + self.spans[0]),)
+        region += tuple(slice(c, c + s) for c, s in zip(corner[1:], self.spans[1:]))
+        extra = (1,) * (result.ndim - len(self.shape))
+        self.band[region] += result * weight.reshape(weight.shape + extra)
+
+        if all(idx == len(origins) - 1 for origins, idx in zip(self.grid[1:], position[1:])):
+            self._flush(position[0])
+
+    def _flush(self, row: int) -> None:
+        """Write out the rows which no tile after the `row`th row of tiles overlaps."""
+        origins = self.grid[0]
+        end = origins[row + 1] if row + 1 < len(origins) else self.shape[0]
+        done = self.band[: end - self.band_start]
+        if np.issubdtype(self.out.dtype, np.integer):
+            np.rint(done, out=done)
+        self.out[self.band_start : end] = done
+
+        # Move the rows the next row of tiles overlaps to the top of the band.
+        shift = end - self.band_start
+        self.band[:-shift] = self.band[shift:]
+        self.band[-shift:] = 0
+        self.band_start = end
+
+    @property
+    def complete(self) -> bool:
+        return self.count == self.total
+
+    def finish(self) -> "np.ndarray":
+        return self.out
+
+
+class Untile(Operator["np.ndarray", "np.ndarray"]):
+    """Stitches the (processed) tiles from a `Tile` back into whole arrays.
+
+    Each output is allocated once, with `allocate(shape, dtype)`, when the first tile
+    of its array arrives, and tiles are written into it as they arrive, so only one
+    output is held at a time. Its dtype and any trailing untiled axes come from the
+    tile results. Pass e.g. a function opening a `np.memmap` as `allocate` to assemble
+    outputs larger than memory.
+
+    Overlaps are cropped by default: each tile fills the region up to halfway through
+    its overlaps with its neighbours. With `blend`, overlapping tiles are instead
+    averaged with weights which taper linearly across each overlap, which hides seams
+    from operators with edge effects. Tiles are then accumulated into a floating-point
+    band one tile high and the width of the output, and rows are cast to the output's
+    dtype and written out as soon as no later tile overlaps them.
+    """
+
+    def __init__(
+        self,
+        tile: Tile,
+        *,
+        blend: bool = False,
+        allocate: tp.Optional[tp.Callable[[tuple[int, ...], tp.Any], "np.ndarray"]] = None,
+    ) -> None:
+        """
+        Args:
+            tile: The Tile which split the arrays.
+            blend: Flag to blend overlapping tiles, rather than cropping them.
+            allocate: A function of a shape and dtype creating an output array.
+                Defaults to `np.empty`.
+        """
+        self.tile = tile
+        self.blend = blend
+        self.allocate = allocate
+
+    def pipe(self, iterable: tp.Iterable["np.ndarray"]) -> tp.Generator["np.ndarray", None, None]:
+        allocate = np.empty if self.allocate is None else self.allocate
+        layouts = self.tile._layouts
+        canvas = None
+        for result in iterable:
+            if canvas is None:
+                shape, grid = layouts.popleft()
+                canvas = _Canvas(shape, grid, self.tile.tile_shape, self.blend, allocate)
+
+            canvas.add(np.asarray(result))
+            if canvas.complete:
+                yield canvas.finish()
+                canvas = None
+
+        if canvas is not None:
+            msg = f"The stream ended after {canvas.count} of {canvas.total} tiles of an array."
+            raise ValueError(msg)
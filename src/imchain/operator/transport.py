@@ -0,0 +1,352 @@
+"""Transports control how elements cross the boundary between a PoolMap and its workers."""
+
+import collections
+import concurrent.futures as cf
+import dataclasses
+import mmap
+import threading
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import lazy_loader as lazy
+import typing_extensions as tp
+
+np = lazy.load("numpy")
+
+T = tp.TypeVar("T")
+U = tp.TypeVar("U")
+
+__all__ = ("SharedMemoryTransport", "Transport")
+
+
+class Transport:
+    """The default transport, which lets the executor pickle elements and results.
+
+    A transport has a parent side (`submit`, `result` and `discard`), called by the
+    PoolMap which owns the executor, and a worker side (`apply`), called inside the
+    worker with the transport's initializer-shipped copy.
+    """
+
+    def submit(self, executor: cf.Executor, task: tp.Callable, chunk: list) -> cf.Future:
+        """Submit `task(chunk)` to `executor`."""
+        return executor.submit(task, chunk)
+
+    def result(self, fut: cf.Future) -> list:
+        """Get the per-element results of a completed future from `submit`."""
+        return fut.result()[0]
+
+    def discard(self, fut: cf.Future) -> None:
+        """Release any resources held for a future whose results will never be read."""
+
+    def apply(self, func: tp.Callable[[T], U], chunk: list[T]) -> list[U]:
+        """Apply `func` to each element of `chunk`, on the worker side."""
+        return [func(elem) for elem in chunk]
+
+
+@dataclasses.dataclass(frozen=True)
+class _SharedArray:
+    """A descriptor for an array stored at the start of a shared memory segment."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+    # True if the worker created the segment for this result, and the parent must adopt it.
+    created: bool = False
+
+
+class _Lease:
+    """A reference-counted claim on a segment owned by a `_SegmentPool`."""
+
+    __slots__ = ("pool", "refs", "shm")
+
+    def __init__(self, pool: "_SegmentPool", shm: shared_memory.SharedMemory):
+        self.pool = pool
+        self.shm = shm
+        self.refs = 1
+
+    def incref(self):
+        with self.pool.lock:
+            self.refs += 1
+
+    def decref(self):
+        with self.pool.lock:
+            self.refs -= 1
+            if self.refs:
+                return
+        self.pool.release(self.shm)
+
+
+class _SegmentPool:
+    """A pool of reusable shared memory segments, owned by the parent process."""
+
+    def __init__(self, max_idle: int):
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.idle: list[shared_memory.SharedMemory] = []
+        self.closed = False
+
+    def lease(self, nbytes: int) -> _Lease:
+        lease = self.lease_idle(nbytes)
+        if lease is not None:
+            return lease
+
+        size = -(-max(nbytes, 1) // mmap.PAGESIZE) * mmap.PAGESIZE
+        return _Lease(self, shared_memory.SharedMemory(create=True, size=size))
+
+    def lease_idle(self, nbytes: int) -> tp.Optional[_Lease]:
+        """Lease the smallest idle segment with room for `nbytes`, if there is one."""
+        with self.lock:
+            fits = [shm for shm in self.idle if shm.size >= nbytes]
+            if not fits:
+                return None
+
+            shm = min(fits, key=lambda s: s.size)
+            self.idle.remove(shm)
+            return _Lease(self, shm)
+
+    def adopt(self, name: str) -> _Lease:
+        return _Lease(self, shared_memory.SharedMemory(name=name))
+
+    def release(self, shm: shared_memory.SharedMemory) -> None:
+        with self.lock:
+            if not self.closed:
+                self.idle.append(shm)
+                if len(self.idle) <= self.max_idle:
+                    return
+                # Evict the smallest segment; the larger ones are more broadly reusable.
+                shm = min(self.idle, key=lambda s: s.size)
+                self.idle.remove(shm)
+
+        _destroy(shm)
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+
+        for shm in idle:
+            _destroy(shm)
+
+
+def _destroy(shm: shared_memory.SharedMemory) -> None:
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        shm.close()
+    except BufferError:
+        # Someone still holds a view; the mapping is freed when that view dies.
+        pass
+
+
+def _copy_into(shm: shared_memory.SharedMemory, array) -> None:
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+
+
+class SharedMemoryTransport(Transport):
+    """A transport which moves large NumPy arrays through shared memory.
+
+    Arrays with at least `min_nbytes` bytes, either as elements or nested inside
+    tuples/lists, are copied into a `multiprocessing.shared_memory` segment and only
+    a small descriptor is pickled. Results are returned the same way, and are yielded
+    as arrays backed by shared memory. A segment returns to a reusable pool once the
+    consumer drops every view of the result, so steady-state streams do not allocate.
+
+    Each large input is sent with an idle segment of the same size, if the pool has
+    one, which the worker fills with its result instead of creating a new segment.
+    A result which is the same object as an input array (e.g. an in-place operation
+    which returns its argument) is passed back without any copy.
+
+    The transport owns its segment pool, and can be reused across `pipe` calls and
+    PoolMaps. Call `close` (or let it be garbage collected) to free idle segments.
+
+    Examples:
+        >>> op = iop.PoolMap(denoise, transport=iop.SharedMemoryTransport())
+    """
+
+    def __init__(self, *, min_nbytes: int = 1 << 16, max_idle: int = 32):
+        """
+        Args:
+            min_nbytes: Arrays smaller than this are pickled as usual.
+            max_idle: Maximum number of idle segments kept for reuse.
+        """
+        # Fail fast if NumPy is missing.
+        np.ndarray  # noqa: B018
+
+        self.min_nbytes = min_nbytes
+        self.max_idle = max_idle
+        self._init_state()
+        # Workers must share our resource tracker, or a forked worker's tracker would
+        # unlink the result segments it hands to us when it exits.
+        resource_tracker.ensure_running()
+
+    def _init_state(self):
+        self._pool = _SegmentPool(self.max_idle)
+        self._leases: dict[cf.Future, list[_Lease]] = {}
+        self._attached: collections.OrderedDict[str, shared_memory.SharedMemory] = (
+            collections.OrderedDict()
+        )
+        self._attach_lock = threading.Lock()
+        weakref.finalize(self, self._pool.close)
+
+    def __getstate__(self):
+        return {"min_nbytes": self.min_nbytes, "max_idle": self.max_idle}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
+
+    def close(self) -> None:
+        """Free all idle segments. Segments still in use are freed when released."""
+        self._pool.close()
+
+    # ---- Parent side ----
+
+    def submit(self, executor, task, chunk):
+        leases = []
+        payload = [self._encode(elem, leases.append) for elem in chunk]
+
+        # Offer the worker somewhere to put results of the same size as the inputs.
+        spares = []
+        for lease in leases[:]:
+            spare = self._pool.lease_idle(lease.shm.size)
+            if spare is not None:
+                leases.append(spare)
+                spares.append((spare.shm.name, spare.shm.size))
+
+        try:
+            fut = executor.submit(task, (payload, spares))
+        except BaseException:
+            for lease in leases:
+                lease.decref()
+            raise
+
+        self._leases[fut] = leases
+        return fut
+
+    def result(self, fut):
+        leases = self._leases.pop(fut, [])
+        try:
+            results = fut.result()[0]
+            by_name = {lease.shm.name: lease for lease in leases}
+            return [self._decode_result(res, by_name) for res in results]
+        finally:
+            # Drop the in-flight claim. Results which use a leased segment hold their own.
+            for lease in leases:
+                lease.decref()
+
+    def discard(self, fut):
+        if fut.done():
+            self._discard(fut)
+        else:
+            fut.add_done_callback(self._discard)
+
+    def _discard(self, fut):
+        if fut.cancelled() or fut.exception() is not None:
+            for lease in self._leases.pop(fut, []):
+                lease.decref()
+            return
+
+        # Decoding adopts worker-created segments; dropping the arrays pools them.
+        self.result(fut)
+
+    def _encode(self, obj, on_lease):
+        if isinstance(obj, (tuple, list)):
+            return type(obj)(self._encode(item, on_lease) for item in obj)
+
+        if not self._is_large_array(obj):
+            return obj
+
+        lease = self._pool.lease(obj.nbytes)
+        on_lease(lease)
+        _copy_into(lease.shm, obj)
+        return _SharedArray(lease.shm.name, obj.shape, obj.dtype.str)
+
+    def _decode_result(self, obj, by_name):
+        if isinstance(obj, (tuple, list)):
+            return type(obj)(self._decode_result(item, by_name) for item in obj)
+
+        if not isinstance(obj, _SharedArray):
+            return obj
+
+        if obj.created:
+            lease = self._pool.adopt(obj.name)
+        else:
+            lease = by_name[obj.name]
+            lease.incref()
+
+        array = np.ndarray(obj.shape, dtype=obj.dtype, buffer=lease.shm.buf)
+        # Views of `array` keep it alive, so the segment is free once it is collected.
+        weakref.finalize(array, lease.decref)
+        return array
+
+    def _is_large_array(self, obj) -> bool:
+        return (
+            isinstance(obj, np.ndarray)
+            and not obj.dtype.hasobject
+            and obj.nbytes >= self.min_nbytes
+        )
+
+    # ---- Worker side ----
+
+    def apply(self, func, chunk):
+        payload, spares = chunk
+        return [self._apply_one(func, elem, spares) for elem in payload]
+
+    def _apply_one(self, func, elem, spares):
+        # Maps id(array) to (descriptor, array); holding the array keeps its id unique.
+        inputs: dict[int, tuple[_SharedArray, tp.Any]] = {}
+        result = func(self._decode_task(elem, inputs))
+        return self._encode_result(result, inputs, spares)
+
+    def _decode_task(self, obj, inputs):
+        if isinstance(obj, (tuple, list)):
+            return type(obj)(self._decode_task(item, inputs) for item in obj)
+
+        if not isinstance(obj, _SharedArray):
+            return obj
+
+        shm = self._attach(obj.name)
+        array = np.ndarray(obj.shape, dtype=obj.dtype, buffer=shm.buf)
+        inputs[id(array)] = (obj, array)
+        return array
+
+    def _encode_result(self, obj, inputs, spares):
+        if isinstance(obj, (tuple, list)):
+            return type(obj)(self._encode_result(item, inputs, spares) for item in obj)
+
+        if not self._is_large_array(obj):
+            return obj
+
+        if id(obj) in inputs:
+            return inputs[id(obj)][0]
+
+        spare = next((spare for spare in spares if spare[1] >= obj.nbytes), None)
+        if spare is not None:
+            spares.remove(spare)
+            _copy_into(self._attach(spare[0]), obj)
+            return _SharedArray(spare[0], obj.shape, obj.dtype.str)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(obj.nbytes, 1))
+        _copy_into(shm, obj)
+        shm.close()
+        return _SharedArray(shm.name, obj.shape, obj.dtype.str, created=True)
+
+    def _attach(self, name: str) -> shared_memory.SharedMemory:
+        # Parent segments are reused, so keep recently used attachments open.
+        with self._attach_lock:
+            shm = self._attached.pop(name, None)
+            if shm is None:
+                shm = shared_memory.SharedMemory(name=name)
+            self._attached[name] = shm
+
+            while len(self._attached) > self.max_idle:
+                _name, stale = self._attached.popitem(last=False)
+                try:
+                    stale.close()
+                except BufferError:
+                    pass
+
+        return shm
@@ -1,5 +1,8 @@
 from .testing import Log as Log
+from .testing import MakeArray as MakeArray
+from .testing import Spin as Spin
 from .testing import Suppress as Suppress
 from .testing import Wait as Wait
 from .testing import WaitData as WaitData
 from .testing import WaitRandom as WaitRandom
+from .testing import random_arrays as random_arrays
@@ -4,15 +4,21 @@ import random
 import time
 from functools import partial
 
+import lazy_loader as lazy
 import typing_extensions as tp
 
-from ..basics import Effect, Filter
+from ..basics import Effect, Filter, Map
+
+np = lazy.load("numpy")
 
 __all__ = (
     "Log",
+    "MakeArray",
+    "Spin",
     "Wait",
     "WaitData",
     "WaitRandom",
+    "random_arrays",
 )
 
 # Define our own wrappers at the global namespace to assist pickling.
@@ -30,6 +36,17 @@ def _sleep(t):
     time.sleep(t)
 
 
+def _spin(t):
+    # Busy-wait, holding the GIL, to emulate CPU-bound work.
+    deadline = time.perf_counter() + t
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _make_array(x, shape, dtype):
+    return np.full(shape, x, dtype=dtype)
+
+
 # Actual objects
 
 
@@ -53,6 +70,29 @@ class WaitData(Effect):
         super().__init__(func)
 
 
+class Spin(Effect):
+    """Like Wait, but busy-waits for `t` seconds, emulating CPU-bound work."""
+
+    def __init__(self, t=0.0):
+        super().__init__(partial(_spin, t))
+
+
+class MakeArray(Map):
+    """Replace each element `x` with a NumPy array of `shape`, filled with `x`."""
+
+    def __init__(self, shape: tuple[int, ...] = (1024, 1024), dtype="uint8"):
+        super().__init__(partial(_make_array, shape=shape, dtype=dtype))
+
+
+def random_arrays(
+    n: int, shape: tuple[int, ...] = (1024, 1024), dtype="uint8", seed: int = 314
+) -> tp.Generator:
+    """Lazily generate `n` reproducible, random image-sized NumPy arrays."""
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        yield rng.integers(0, 255, size=shape, endpoint=True).astype(dtype)
+
+
 def _printer(spacer):
     def log(x):
         print(f"{spacer}{x}")
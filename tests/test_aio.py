@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+import imchain.operator as iop
+
+
+async def _sleep_then_double(x):
+    await asyncio.sleep(x)
+    return 2 * x
+
+
+async def _arange(n):
+    for i in range(n):
+        yield i
+
+
+async def _collect(aiterable):
+    return [item async for item in aiterable]
+
+
+@pytest.mark.parametrize("mapper_cls", [iop.AsyncMap, iop.UnorderedAsyncMap])
+def test_asyncmap_concurrency(mapper_cls):
+    op = mapper_cls(_sleep_then_double, concurrency=3)
+
+    start = time.perf_counter()
+    res = op.process([0.1] * 6)
+    delta = time.perf_counter() - start
+
+    assert res == [0.2] * 6
+    assert delta < 0.3
+
+
+def test_asyncmap_ordering():
+    inp = [0.1, 0.05, 0.0]
+
+    assert iop.AsyncMap(_sleep_then_double, concurrency=3).process(inp) == [0.2, 0.1, 0.0]
+    res = iop.UnorderedAsyncMap(_sleep_then_double, concurrency=3).process(inp)
+    assert res == [0.0, 0.1, 0.2]
+
+
+def test_sync_operators_in_async_pipeline():
+    chain = iop.Map(lambda x: x / 100) | iop.AsyncMap(_sleep_then_double) | iop.Filter(bool)
+    res = asyncio.run(_collect(chain.apipe(_arange(5))))
+    assert res == [0.02, 0.04, 0.06, 0.08]
+
+    # Standalone sync operators also support apipe.
+    res = asyncio.run(_collect(iop.Map(lambda x: x + 1).apipe(_arange(3))))
+    assert res == [1, 2, 3]
+
+
+def test_async_operator_in_sync_pipeline_closes_early():
+    seen = []
+    chain = iop.Effect(seen.append) | iop.AsyncMap(_sleep_then_double, concurrency=2) | iop.Take(3)
+    assert chain.process(x / 1000 for x in range(100)) == [0.0, 0.002, 0.004]
+    assert len(seen) < 10
+
+
+def test_async_pipeline_propagates_errors():
+    def boom(x):
+        raise KeyError(x)
+
+    chain = iop.AsyncMap(_sleep_then_double) | iop.Map(boom)
+    with pytest.raises(KeyError):
+        asyncio.run(_collect(chain.apipe(_arange(3))))
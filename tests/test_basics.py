@@ -1,3 +1,5 @@
+import itertools
+
 import imchain.operator as iop
 import imchain.operator.util as iopu
 
@@ -22,3 +24,69 @@ def test_where_one_to_many():
     src = [0, 1, 2, 3]
     res = op.process(src)
     assert res == [0, 0, 11, 2, 2, 13]
+
+
+def test_where_stateful_branch():
+    # The branch sees the whole stream once, so Take applies across elements.
+    op = iop.Where(lambda x: x % 2 == 0).then(iop.Take(2)).otherwise(lambda x: -x)
+    assert op.process(range(8)) == [0, -1, 2, -3, -5, -7]
+
+
+def test_where_buffered_branch():
+    op = iop.Where(lambda x: x % 3 == 0).then(iop.Buffer(2)).otherwise(lambda x: x)
+    # A batch is yielded at the position of the last element the branch processed, and
+    # a partial batch once the stream ends.
+    assert op.process(range(8)) == [1, 2, (0, 3), 4, 5, 7, (6,)]
+
+
+def test_where_pipes_each_branch_once():
+    calls = []
+
+    class Counting(iop.Noop):
+        def pipe(self, iterable):
+            calls.append(1)
+            yield from iterable
+
+    op = iop.Where(lambda x: x > 2).then(Counting()).otherwise(Counting())
+    assert op.process(range(6)) == list(range(6))
+    assert len(calls) == 2
+
+
+def test_where_pooled_branch():
+    import concurrent.futures as cf
+
+    pool = iop.PoolMap(lambda x: x * 10, pool_size=2, executor_cls=cf.ThreadPoolExecutor)
+    op = iop.Where(lambda x: x % 2 == 0).then(pool).otherwise(lambda x: x)
+    res = op.process(range(10))
+    assert sorted(res) == sorted([0, 1, 20, 3, 40, 5, 60, 7, 80, 9])
+    # Outputs are never yielded ahead of the element they came from.
+    assert [x for x in res if x % 10 == 0] == [0, 20, 40, 60, 80]
+    assert res.index(20) > res.index(1)
+
+
+def test_where_unordered():
+    op = iop.Where(lambda x: x % 3 == 0, ordered=False).then(iop.Buffer(2)).otherwise(lambda x: x)
+    res = op.process(range(8))
+    assert sorted(x for x in res if not isinstance(x, tuple)) == [1, 2, 4, 5, 7]
+    assert [x for x in res if isinstance(x, tuple)] == [(0, 3), (6,)]
+
+
+def test_where_close_early():
+    op = iop.Where(lambda x: x % 2 == 0).then(lambda x: x).otherwise(lambda x: x)
+    assert (op | iop.Take(3)).process(iter(range(100))) == [0, 1, 2]
+
+
+def test_where_reads_one_element_per_output():
+    pulled = []
+
+    def source():
+        for x in itertools.count():
+            pulled.append(x)
+            yield x
+
+    # The branches are only fed as far as the outputs taken, however rarely one is used.
+    for then in (lambda x: -x, iop.Buffer(1) | iop.Chain()):
+        pulled.clear()
+        op = iop.Where(lambda x: x == 0).then(then).otherwise(lambda x: x)
+        assert (op | iop.Take(3)).process(source()) == [0, 1, 2]
+        assert pulled == [0, 1, 2]
@@ -0,0 +1,76 @@
+import pytest
+
+import imchain.operator as iop
+
+np = pytest.importorskip("numpy")
+
+
+def _frames(n, shape=(4, 3)):
+    return [np.full(shape, i, dtype=np.float64) for i in range(n)]
+
+
+def test_batch_map_matches_per_item():
+    calls = []
+
+    def scale(batch):
+        calls.append(batch.shape)
+        return batch * 2
+
+    res = iop.BatchMap(scale, 4).process(_frames(10))
+    assert [r[0, 0] for r in res] == [2 * i for i in range(10)]
+    assert all(r.shape == (4, 3) for r in res)
+    # Two full batches, then a ragged one.
+    assert calls == [(4, 4, 3), (4, 4, 3), (2, 4, 3)]
+
+
+def test_batch_map_yields_views():
+    res = iop.BatchMap(lambda b: b + 1, 3).process(_frames(3))
+    assert all(r.base is not None for r in res)
+    assert res[0].base is res[2].base
+
+
+def test_batch_map_pads_final_batch():
+    shapes = []
+
+    def mean(batch):
+        shapes.append(batch.shape)
+        return batch.mean(axis=(1, 2))
+
+    res = iop.BatchMap(mean, 4, pad=True).process(_frames(6))
+    assert [float(r) for r in res] == [0, 1, 2, 3, 4, 5]
+    assert shapes == [(4, 4, 3), (4, 4, 3)]
+
+
+def test_batch_map_mismatched_shapes_fall_back():
+    calls = []
+
+    def negate(batch):
+        calls.append(len(batch))
+        return -batch
+
+    items = [np.ones((2, 2)), np.ones((3, 3)), np.ones((2, 2))]
+    res = iop.BatchMap(negate, 3).process(items)
+    assert [r.shape for r in res] == [(2, 2), (3, 3), (2, 2)]
+    assert all((r == -1).all() for r in res)
+    assert calls == [1, 1, 1]
+
+
+def test_batch_map_in_place_results_are_not_overwritten():
+    def negate_inplace(batch):
+        np.negative(batch, out=batch)
+        return batch
+
+    res = iop.BatchMap(negate_inplace, 2).process(_frames(5))
+    assert [r[0, 0] for r in res] == [-i for i in range(5)]
+
+
+def test_batch_map_sequence_of_views_is_not_overwritten():
+    # Iterating over the batch array gives views of its rows.
+    for sink in (list, tuple):
+        res = iop.BatchMap(sink, 2).process(_frames(5))
+        assert [r[0, 0] for r in res] == [0, 1, 2, 3, 4]
+
+
+def test_batch_map_checks_result_length():
+    with pytest.raises(ValueError, match="results"):
+        iop.BatchMap(lambda b: b[:1], 2).process(_frames(2))
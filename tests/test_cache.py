@@ -0,0 +1,83 @@
+import concurrent.futures as cf
+
+import pytest
+
+import imchain.operator as iop
+from imchain.operator.cache import content_key
+
+np = pytest.importorskip("numpy")
+
+
+class Counter:
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, x):
+        self.calls += 1
+        return self.func(x)
+
+
+def test_cache_skips_hits():
+    double = Counter(lambda x: 2 * x)
+    op = iop.Cache(double)
+    assert op.process([1, 2, 1, 3, 2]) == [2, 4, 2, 6, 4]
+    assert op.process([3, 1]) == [6, 2]
+    assert double.calls == 3
+    assert (op.stats.hits, op.stats.misses) == (4, 3)
+    assert op.stats.hit_rate == pytest.approx(4 / 7)
+
+
+def test_cache_poolmap_streams_misses():
+    pool = iop.PoolMap(lambda x: x + 1, pool_size=2, executor_cls=cf.ThreadPoolExecutor)
+    op = iop.Cache(pool, key=lambda x: x)
+    assert op.process([5, 1, 5, 2, 1, 3]) == [6, 2, 6, 3, 2, 4]
+    assert op.stats.misses == 4
+
+
+def test_cache_lru_eviction():
+    op = iop.Cache(lambda x: x, key=lambda x: x, max_entries=2)
+    op.drain([1, 2, 1, 3])  # 2 is least recently used when 3 arrives.
+    assert op.stats.evictions == 1
+    op.drain([1, 3, 2])
+    assert (op.stats.hits, op.stats.misses) == (3, 4)
+
+
+def test_cache_max_bytes():
+    op = iop.Cache(lambda x: np.zeros(x, dtype=np.uint8), key=lambda x: x, max_bytes=100)
+    op.drain([40, 50, 30])
+    assert op.nbytes == 80
+    assert op.stats.evictions == 1
+
+
+def test_cache_content_key():
+    a = np.arange(6).reshape(2, 3)
+    assert content_key(a) == content_key(a.copy())
+    assert content_key(a) != content_key(a.reshape(3, 2))
+    assert content_key(a) != content_key(a.astype(np.int8))
+    assert content_key("x") == content_key("x")
+
+
+def test_cache_on_disk(tmp_path):
+    negate = Counter(lambda x: -x)
+    frames = [np.full((4, 4), i, dtype=np.float32) for i in range(3)]
+    iop.Cache(negate, directory=tmp_path).drain(frames)
+    iop.Cache(lambda x: str(x), key=lambda x: ("label", x), directory=tmp_path).drain([7])
+    assert negate.calls == 3
+
+    # A fresh Cache reads the stored results back from disk.
+    op = iop.Cache(negate, directory=tmp_path)
+    res = op.process(frames)
+    assert negate.calls == 3
+    assert op.stats.disk_hits == 3
+    assert all(isinstance(r, np.memmap) for r in res)
+    assert [float(r[0, 0]) for r in res] == [0, -1, -2]
+
+    labels = iop.Cache(lambda x: None, key=lambda x: ("label", x), directory=tmp_path)
+    assert labels.process([7]) == ["7"]
+
+
+def test_cache_checks_one_to_one():
+    op = iop.Cache(iop.Filter(lambda x: x > 0), key=lambda x: x)
+    with pytest.raises(ValueError, match="one output per input"):
+        op.process([0, 1])
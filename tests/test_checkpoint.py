@@ -0,0 +1,102 @@
+import concurrent.futures as cf
+import itertools
+
+import pytest
+
+import imchain.operator as iop
+
+
+def _double(x):
+    return 2 * x
+
+
+def _chain():
+    return (
+        iop.Skip(3)
+        | iop.Map(_double)
+        | iop.PoolMap(
+            iop.Filter(lambda x: x % 3 != 0),
+            pool_size=2,
+            executor_cls=cf.ThreadPoolExecutor,
+            chunksize=3,
+            reorder_window=2,
+        )
+        | iop.Buffer(4)
+        | iop.Map(lambda batch: [batch[0], batch[-1]])
+        | iop.Chain()
+        | iop.Slice(1, 40, 2)
+    )
+
+
+def _run(path, source, limit=None):
+    outputs = []
+    gen = iop.Checkpoint(_chain(), path, every=1).pipe(source)
+    for output in itertools.islice(gen, limit):
+        outputs.append(output)
+    gen.close()
+    return outputs
+
+
+@pytest.mark.parametrize("source", [range, lambda n: iter(range(n))])
+def test_checkpoint_resumes(tmp_path, source):
+    expected = _chain().process(range(100))
+    assert len(expected) > 10
+
+    for stop in range(1, len(expected)):
+        path = tmp_path / f"{stop}.ckpt"
+        first = _run(path, source(100), limit=stop)
+        # The last output was never followed by a request for more, so isn't committed.
+        second = _run(path, source(100))
+        assert first[:-1] + second == expected
+        assert _run(path, source(100)) == []
+
+
+def test_checkpoint_buffer_max_bytes(tmp_path):
+    path = tmp_path / "run.ckpt"
+    chain = iop.Buffer(10, max_bytes=3, sizer=lambda x: 1) | iop.Map(list)
+    expected = [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+
+    gen = iop.Checkpoint(chain, path, every=1).pipe(range(10))
+    assert next(gen) == expected[0]
+    assert next(gen) == expected[1]
+    gen.close()
+    # Item 3 was taken from the source to find the first buffer full, but not buffered.
+    checkpoint = iop.Checkpoint(chain, path).load()
+    assert (checkpoint["offset"], checkpoint["states"]) == (4, [[3]])
+
+    assert iop.Checkpoint(chain, path, every=1).process(range(10)) == expected[1:]
+
+
+def test_checkpoint_after_error(tmp_path):
+    path = tmp_path / "run.ckpt"
+    seen = []
+
+    def save(x):
+        if x == 14 and not seen.count(14):
+            seen.append(x)
+            msg = "crash"
+            raise RuntimeError(msg)
+        seen.append(x)
+        return x
+
+    op = iop.Checkpoint(iop.Buffer(3) | iop.Chain() | iop.Map(save), path, every=2)
+    with pytest.raises(RuntimeError, match="crash"):
+        op.drain(range(0, 40, 2))
+    assert op.load()["offset"] == 6
+
+    op.drain(range(0, 40, 2))
+    # Outputs after the last commit are handled again, but nothing is lost.
+    assert seen == [0, 2, 4, 6, 8, 10, 12, 14, 12, 14, *range(16, 40, 2)]
+
+
+def test_checkpoint_rejects_unsupported(tmp_path):
+    with pytest.raises(TypeError, match="Stage"):
+        iop.Checkpoint(iop.Map(_double) | iop.Stage(), tmp_path / "run.ckpt")
+
+    op = iop.Checkpoint(iop.Buffer(2, max_wait=1.0), tmp_path / "run.ckpt")
+    with pytest.raises(TypeError, match="max_wait"):
+        op.process(range(4))
+
+    iop.Checkpoint(iop.Buffer(2), tmp_path / "run.ckpt").process(range(4))
+    with pytest.raises(ValueError, match="operators"):
+        iop.Checkpoint(iop.Take(2), tmp_path / "run.ckpt").process(range(4))
@@ -0,0 +1,85 @@
+import concurrent.futures as cf
+import itertools
+
+import pytest
+
+import imchain.operator as iop
+
+
+def _double(x):
+    return 2 * x
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_broadcast(concurrent):
+    op = iop.Broadcast(iop.Map(_double), iop.Noop(), iop.Map(str), concurrent=concurrent)
+    assert op.process(range(3)) == [(0, 0, "0"), (2, 1, "1"), (4, 2, "2")]
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_broadcast_pooled_branch(concurrent):
+    pool = iop.PoolMap(_double, pool_size=4, executor_cls=cf.ThreadPoolExecutor)
+    op = iop.Broadcast(pool, iop.Noop(), max_lag=8, concurrent=concurrent)
+    assert op.process(range(20)) == [(2 * x, x) for x in range(20)]
+
+
+def test_broadcast_max_lag():
+    # A buffering branch reads ahead of its sibling.
+    op = iop.Broadcast(iop.Buffer(4) | iop.Chain(), iop.Noop(), max_lag=2)
+    with pytest.raises(BufferError, match="lagged"):
+        op.process(range(10))
+
+    op.max_lag = 4
+    assert op.process(range(10)) == [(x, x) for x in range(10)]
+    op.concurrent, op.max_lag = True, 1
+    assert op.process(range(10)) == [(x, x) for x in range(10)]
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_broadcast_checks_one_to_one(concurrent):
+    op = iop.Broadcast(iop.Noop(), iop.Filter(lambda x: x < 2), concurrent=concurrent)
+    with pytest.raises(ValueError, match="one output per input"):
+        op.process(range(5))
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_broadcast_close_early(concurrent):
+    chain = iop.Broadcast(iop.Noop(), iop.Map(_double), concurrent=concurrent) | iop.Take(2)
+    assert chain.process(itertools.count()) == [(0, 0), (1, 2)]
+
+
+def test_tee():
+    evens, batches = [], []
+    op = iop.Tee(
+        iop.Filter(lambda x: x % 2 == 0) | iop.Effect(evens.append),
+        iop.Buffer(3) | iop.Effect(batches.append),
+        max_lag=2,
+    )
+    assert op.process(range(7)) == list(range(7))
+    assert evens == [0, 2, 4, 6]
+    assert batches == [(0, 1, 2), (3, 4, 5), (6,)]
+
+
+def test_tee_branch_finishes_early():
+    seen = []
+    op = iop.Tee(iop.Take(2) | iop.Effect(seen.append), max_lag=4)
+    assert op.process(range(100)) == list(range(100))
+    assert seen == [0, 1]
+
+
+def test_tee_errors():
+    def fail(x):
+        if x == 3:
+            msg = "boom"
+            raise RuntimeError(msg)
+
+    op = iop.Tee(iop.Effect(fail), max_lag=1)
+    with pytest.raises(RuntimeError, match="boom"):
+        op.drain(range(100))
+
+
+def test_tee_close_early():
+    seen = []
+    chain = iop.Tee(iop.Effect(seen.append)) | iop.Take(3)
+    assert chain.process(itertools.count()) == [0, 1, 2]
+    assert len(seen) < 100
@@ -0,0 +1,95 @@
+import concurrent.futures as cf
+import pickle
+
+import pytest
+
+import imchain.operator as iop
+
+np = pytest.importorskip("numpy")
+
+
+def _stack(n=10, shape=(4, 5)):
+    return np.arange(n * np.prod(shape), dtype=np.uint16).reshape(n, *shape)
+
+
+def _add_one(frame):
+    return frame + 1
+
+
+def test_frame_source_npy(tmp_path):
+    path = tmp_path / "frames.npy"
+    np.save(path, _stack())
+    source = iop.FrameSource(path)
+
+    assert len(source) == 10
+    frames = list(source)
+    assert all(isinstance(f, np.memmap) for f in frames)
+    np.testing.assert_array_equal(np.stack(frames), _stack())
+
+
+def test_frame_source_raw(tmp_path):
+    path = tmp_path / "frames.raw"
+    header = b"\0" * 16
+    path.write_bytes(header + _stack().tobytes() + b"\1")  # A trailing partial frame.
+    source = iop.FrameSource(path, frame_shape=(4, 5), dtype=np.uint16, offset=16)
+
+    assert len(source) == 10
+    np.testing.assert_array_equal(source[3], _stack()[3])
+
+    with pytest.raises(ValueError, match="frame_shape"):
+        iop.FrameSource(path)
+
+
+def test_frame_source_slicing(tmp_path):
+    path = tmp_path / "frames.npy"
+    np.save(path, _stack())
+    source = iop.FrameSource(path)
+
+    assert isinstance(source, iop.Seekable)
+    chain = iop.Map(_add_one, pure=True) | iop.Skip(2) | iop.Slice(step=3)
+    res = chain.process(source)
+    np.testing.assert_array_equal(np.stack(res), _stack()[2::3] + 1)
+
+
+def test_frame_source_pickles(tmp_path):
+    path = tmp_path / "frames.npy"
+    np.save(path, _stack())
+    source = iop.FrameSource(path)
+    len(source)
+
+    clone = pickle.loads(pickle.dumps(source))
+    assert clone._frames is None
+    np.testing.assert_array_equal(clone[-1], _stack()[-1])
+
+
+@pytest.mark.parametrize("name", ["out.npy", "out.raw"])
+def test_frame_sink(tmp_path, name):
+    path = tmp_path / name
+    sink = iop.FrameSink(path, length=10)
+    chain = iop.PoolMap(_add_one, pool_size=2, executor_cls=cf.ThreadPoolExecutor) | sink
+    assert len(chain.process(_stack())) == 10
+
+    if name.endswith(".npy"):
+        written = np.load(path)
+    else:
+        written = np.fromfile(path, dtype=np.uint16).reshape(10, 4, 5)
+    np.testing.assert_array_equal(written, _stack() + 1)
+
+
+def test_frame_sink_strided(tmp_path):
+    path = tmp_path / "out.npy"
+    iop.FrameSink(path, length=4, frame_shape=(4, 5), dtype=np.float32).drain([])
+    assert not path.exists()
+
+    iop.FrameSink(path, length=4, step=2).drain(_stack(2))
+    iop.FrameSink(path, length=4, start=1, step=2, mode="r+").drain(_stack(2) + 100)
+
+    written = np.load(path)
+    assert written.dtype == np.uint16
+    np.testing.assert_array_equal(written[::2], _stack(2))
+    np.testing.assert_array_equal(written[1::2], _stack(2) + 100)
+
+
+def test_frame_sink_overflow(tmp_path):
+    with pytest.raises(ValueError, match="at most 2 frames"):
+        iop.FrameSink(tmp_path / "out.npy", length=2).drain(_stack(3))
@@ -1,3 +1,8 @@
+import itertools
+import time
+
+import pytest
+
 import imchain.operator as iop
 
 
@@ -32,3 +37,89 @@ def test_chain():
 def test_flatmap():
     op = iop.FlatMap(lambda x: (x, x))
     assert op.process(range(3)) == [0, 0, 1, 1, 2, 2]
+
+
+def test_buffer_max_bytes():
+    sizes = []
+    bufferer = iop.Buffer(4, max_bytes=10, sizer=lambda x: x)
+
+    def record(batch):
+        sizes.append(bufferer.nbytes)
+        return tuple(batch)
+
+    bufferer.sink = record
+    res = bufferer.process([3, 3, 3, 3, 2, 20, 1, 1, 1, 1, 1])
+    assert res == [(3, 3, 3), (3, 2), (20,), (1, 1, 1, 1), (1,)]
+    assert sizes == [9, 5, 20, 4, 1]
+    assert bufferer.nbytes == 0
+
+
+def test_window():
+    assert iop.Window(3).process(range(5)) == [(0, 1, 2), (1, 2, 3), (2, 3, 4)]
+    assert iop.Window(2, step=2).process(range(6)) == [(0, 1), (2, 3), (4, 5)]
+    assert iop.Window(3, step=2).process(range(6)) == [(0, 1, 2), (2, 3, 4)]
+    assert iop.Window(4).process(range(3)) == []
+
+
+def test_window_stacked():
+    np = pytest.importorskip("numpy")
+    frames = [np.full((2, 2), i, dtype=np.float32) for i in range(7)]
+    expected = [list(range(i, i + 3)) for i in range(5)]
+
+    windows = []
+    ring = None
+    for window in iop.Window(3, stack=True).pipe(frames):
+        assert window.shape == (3, 2, 2)
+        assert window.flags.c_contiguous
+        # Every window is a view of the same ring buffer.
+        ring = window.base if ring is None else ring
+        assert window.base is ring
+        windows.append(window[:, 0, 0].tolist())
+    assert windows == expected
+
+    res = iop.Window(3, step=2, stack=True).pipe(frames)
+    assert [w[:, 0, 0].tolist() for w in res] == expected[::2]
+
+    with pytest.raises(ValueError, match="shape"):
+        iop.Window(2, stack=True).process([np.zeros(2), np.zeros(3)])
+
+
+def _bursts(*bursts, gap=0.3):
+    for i, burst in enumerate(bursts):
+        if i:
+            time.sleep(gap)
+        yield from burst
+
+
+def test_buffer_max_wait():
+    op = iop.Buffer(4, max_wait=0.05)
+    assert op.process(_bursts([0, 1], [2, 3, 4, 5, 6])) == [(0, 1), (2, 3, 4, 5), (6,)]
+    assert op.process(range(10)) == [(0, 1, 2, 3), (4, 5, 6, 7), (8, 9)]
+
+    op = iop.Buffer(4, max_wait=0.05, drop_last=True)
+    assert op.process(_bursts([0, 1], [2, 3, 4, 5, 6])) == [(0, 1), (2, 3, 4, 5)]
+
+    op = iop.Buffer(4, max_wait=0.05, max_bytes=2, sizer=lambda x: 1)
+    assert op.process(_bursts([0], [1, 2, 3])) == [(0,), (1, 2), (3,)]
+
+
+def test_buffer_max_wait_errors_and_close():
+    def source():
+        yield 0
+        msg = "upstream"
+        raise RuntimeError(msg)
+
+    with pytest.raises(RuntimeError, match="upstream"):
+        iop.Buffer(4, max_wait=0.05).process(source())
+
+    closed = []
+
+    def endless():
+        try:
+            yield from itertools.count()
+        finally:
+            closed.append(True)
+
+    chain = iop.Buffer(2, max_wait=0.05) | iop.Take(2)
+    assert chain.process(endless()) == [(0, 1), (2, 3)]
+    assert closed == [True]
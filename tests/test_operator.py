@@ -1,6 +1,7 @@
 import pytest
 
 import imchain.operator as iop
+from imchain.operator.core import Fused
 
 
 def test_pipe():
@@ -101,3 +102,99 @@ def test_chain_3():
     assert id(chained) == orig_id
 
     assert chained.send(1) == (((1 + 1) * 2) + 10) * 3
+
+
+def test_compile_fuses_stateless_runs():
+    seen = []
+    chain = (
+        iop.Map(lambda x: x + 1)
+        | iop.Filter(lambda x: x % 2 == 0)
+        | iop.Effect(seen.append)
+        | iop.Take(3)
+        | (iop.Noop() | iop.Map(lambda x: x * 10))
+    )
+    compiled = chain.compile()
+
+    assert len(compiled) == 3
+    assert isinstance(compiled.operators[0], Fused)
+    assert isinstance(compiled.operators[1], iop.Take)
+    assert isinstance(compiled.operators[2], Fused)
+
+    assert compiled.process(range(10)) == chain.process(range(10)) == [20, 40, 60]
+    assert seen == [2, 4, 6, 2, 4, 6]
+
+
+def test_compile_is_lazy():
+    it = iter(range(5))
+    compiled = (iop.Map(lambda x: x + 1) | iop.Noop()).compile()
+    git = compiled.pipe(it)
+
+    assert next(git) == 1
+    assert next(it) == 1
+    assert next(git) == 3
+
+
+def test_compile_skips_overridden_pipe():
+    class Doubler(iop.Map):
+        def pipe(self, iterable):
+            for item in super().pipe(iterable):
+                yield item
+                yield item
+
+    compiled = (iop.Map(lambda x: x + 1) | Doubler(lambda x: x)).compile()
+    assert len(compiled) == 2
+    assert compiled.process([0]) == [1, 1]
+
+
+def test_send_many():
+    chain = iop.Map(lambda x: x + 1) | iop.Filter(lambda x: x % 2 == 0) | iop.Buffer(2)
+    assert chain.send_many(range(6)) == chain.process(range(6)) == [(2, 4), (6,)]
+    assert iop.Noop().send_many(iter([1, 2])) == [1, 2]
+
+
+def test_send_fast_path_matches_pipe():
+    seen = []
+    chain = (
+        iop.Map(lambda x: x + 1)
+        | iop.Effect(seen.append)
+        | iop.Filter(None)
+        | iop.Where(lambda x: x > 2).then(iop.FlatMap(lambda x: (x, x)))
+    )
+    assert chain.send_to_tuple(-1) == ()
+    assert chain.send_to_tuple(1) == (2,)
+    assert chain.send(3) == (4, 4)
+    assert chain.compile().send(3) == (4, 4)
+    assert seen == [0, 2, 4, 4]
+
+
+def test_send_respects_pipe_overrides():
+    class Doubled(iop.Map):
+        def pipe(self, iterable):
+            for item in super().pipe(iterable):
+                yield item
+                yield item
+
+    assert Doubled(lambda x: x + 1).send(1) == (2, 2)
+    assert Doubled(lambda x: x + 1).send_many([1]) == [2, 2]
+
+
+def test_send_fast_path_is_lazy():
+    seen = []
+    chain = iop.Effect(seen.append) | iop.Take(2)
+    assert chain.send_many(range(5)) == [0, 1]
+    assert seen == [0, 1]
+
+    # Also for a single value which becomes several, as in PoolMap workers.
+    seen.clear()
+    chain = iop.FlatMap(lambda x: [x] * 5) | iop.Effect(seen.append) | iop.Take(2)
+    assert chain.send(3) == (3, 3)
+    assert chain.compile().send(3) == (3, 3)
+    assert seen == [3, 3, 3, 3]
+
+    # Element-wise chains interleave their side effects element by element.
+    seen.clear()
+    chain = iop.Effect(lambda x: seen.append(("a", x))) | iop.Effect(
+        lambda x: seen.append(("b", x))
+    )
+    assert chain.send_many([0, 1]) == [0, 1]
+    assert seen == [("a", 0), ("b", 0), ("a", 1), ("b", 1)]
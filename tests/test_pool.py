@@ -1,12 +1,31 @@
 import concurrent.futures as cf
+import functools
+import multiprocessing
+import os
+import threading
 import time
 
 import pytest
 
 import imchain.operator as iop
+from imchain.operator import pool as iop_pool
 from imchain.operator import util as iopu
 
 
+class PickleCounter(iop.Map):
+    """A Map which counts how many times it is pickled in this process."""
+
+    pickles = 0
+
+    def __getstate__(self):
+        type(self).pickles += 1
+        return self.__dict__
+
+
+def _double(x):
+    return 2 * x
+
+
 @pytest.mark.parametrize("exec_cls", [cf.ThreadPoolExecutor, cf.ProcessPoolExecutor])
 @pytest.mark.parametrize("mapper_cls", [iop.PoolMap, iop.UnorderedPoolMap])
 def test_poolmap(exec_cls, mapper_cls):
@@ -35,3 +54,188 @@ def test_ordered_poolmap(exec_cls):
     chain = iop.UnorderedPoolMap(pool_op, pool_size=3, executor_cls=exec_cls)
     res = chain.process(inp)
     assert res == inp[::-1]
+
+
+def test_poolmap_ships_operator_once_per_worker():
+    spawn_executor = functools.partial(
+        cf.ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")
+    )
+    PickleCounter.pickles = 0
+    chain = iop.PoolMap(PickleCounter(_double), pool_size=2, executor_cls=spawn_executor)
+
+    assert chain.process(range(20)) == [2 * x for x in range(20)]
+    assert PickleCounter.pickles <= 2
+
+
+def test_poolmap_cleans_up_thread_registry():
+    chain = iop.PoolMap(_double, pool_size=2, executor_cls=cf.ThreadPoolExecutor)
+    assert chain.process(range(5)) == [0, 2, 4, 6, 8]
+    assert not iop_pool._WORKER_OPERATORS
+
+
+@pytest.mark.parametrize("chunksize", [1, 3, "auto"])
+@pytest.mark.parametrize("exec_cls", [cf.ThreadPoolExecutor, cf.ProcessPoolExecutor])
+def test_poolmap_chunksize(exec_cls, chunksize):
+    chain = iop.PoolMap(_double, pool_size=2, executor_cls=exec_cls, chunksize=chunksize)
+    assert chain.process(range(50)) == [2 * x for x in range(50)]
+
+    chain = iop.UnorderedPoolMap(_double, pool_size=2, executor_cls=exec_cls, chunksize=chunksize)
+    assert sorted(chain.process(range(50))) == [2 * x for x in range(50)]
+
+
+def test_poolmap_rejects_bad_chunksize():
+    with pytest.raises(ValueError):
+        iop.PoolMap(_double, chunksize=0)
+
+
+def test_adaptive_chunksize_grows_for_cheap_tasks():
+    sizer = iop_pool._ChunkSizer("auto")
+    assert sizer.size == 1
+
+    fut = cf.Future()
+    fut.set_result(([0] * 10, 1e-5))
+    sizer.observe(fut)
+    assert sizer.size > 10
+
+    fut = cf.Future()
+    fut.set_result(([0], 1.0))
+    for _ in range(20):
+        sizer.observe(fut)
+    assert sizer.size == 1
+
+    # Traced tasks also return the worker's spans.
+    sizer = iop_pool._ChunkSizer("auto")
+    fut = cf.Future()
+    fut.set_result(([0] * 10, 1e-5, (0, 0, [])))
+    sizer.observe(fut)
+    assert sizer.size > 10
+
+
+def _pid(x):
+    return os.getpid()
+
+
+def test_poolmap_context_manager_reuses_workers():
+    with iop.PoolMap(_pid, pool_size=2) as chain:
+        first = set(chain.process(range(20)))
+        second = set(chain.process(range(20)))
+        assert first == second
+
+    assert chain._executor is None
+    # After closing, pipe falls back to a one-shot executor.
+    assert chain.process([1, 2]) and set(chain.process([1, 2])).isdisjoint(first)
+
+
+@pytest.mark.parametrize("exec_cls", [cf.ThreadPoolExecutor, cf.ProcessPoolExecutor])
+def test_poolmap_external_executor(exec_cls):
+    with exec_cls(max_workers=2) as executor:
+        chain = iop.PoolMap(_double, pool_size=2, executor=executor)
+        assert chain.process(range(10)) == [2 * x for x in range(10)]
+        assert chain.process(range(3)) == [0, 2, 4]
+
+        chain.close()
+        # The external executor is still usable.
+        assert executor.submit(_double, 4).result() == 8
+
+        # An executor opened afterwards is the PoolMap's own, so `close` shuts it down.
+        chain.open()
+        owned = chain._executor
+        assert chain.process(range(3)) == [0, 2, 4]
+        chain.close()
+        with pytest.raises(RuntimeError):
+            owned.submit(_double, 1)
+
+
+def test_poolmap_concurrent_streams():
+    with iop.PoolMap(_double, pool_size=2) as chain, cf.ThreadPoolExecutor(4) as clients:
+        results = list(clients.map(lambda n: chain.process(range(n)), range(10, 20)))
+
+    assert results == [[2 * x for x in range(n)] for n in range(10, 20)]
+
+
+def test_poolmap_reorder_window_bounds_buffering():
+    pulled = []
+
+    def source():
+        yield 0.3
+        for _ in range(20):
+            pulled.append(None)
+            yield 0.0
+
+    chain = iop.PoolMap(
+        iopu.WaitData(),
+        pool_size=2,
+        executor_cls=cf.ThreadPoolExecutor,
+        max_inflight=2,
+        reorder_window=4,
+    )
+    res = chain.pipe(source())
+    assert next(res) == 0.3
+    # Only the head and three others may be submitted before the head is yielded.
+    assert len(pulled) <= 3
+    assert list(res) == [0.0] * 20
+
+
+class _SlowCompletions:
+    """Delays the callback reporting a future's completion, after it is already done."""
+
+    def __init__(self, completions):
+        self.completions = completions
+
+    def put(self, fut):
+        threading.Timer(0.01, self.completions.put, [fut]).start()
+
+
+class SlowCallbackPoolMap(iop.PoolMap):
+    def _submit(self, executor, task, chunk, sizer, completions):
+        return super()._submit(executor, task, chunk, sizer, _SlowCompletions(completions))
+
+
+def test_poolmap_late_completion_callbacks():
+    chain = SlowCallbackPoolMap(
+        _double, pool_size=4, executor_cls=cf.ThreadPoolExecutor, max_inflight=2
+    )
+    assert chain.process(range(50)) == [2 * x for x in range(50)]
+
+
+@pytest.mark.parametrize("mapper_cls", [iop.PoolMap, iop.UnorderedPoolMap])
+def test_poolmap_max_inflight(mapper_cls):
+    chain = mapper_cls(_double, pool_size=2, executor_cls=cf.ThreadPoolExecutor, max_inflight=8)
+    assert sorted(chain.process(range(30))) == [2 * x for x in range(30)]
+
+
+def test_poolmap_rejects_bad_window():
+    with pytest.raises(ValueError):
+        iop.PoolMap(_double, max_inflight=0)
+
+
+@pytest.mark.parametrize("mapper_cls", [iop.PoolMap, iop.UnorderedPoolMap])
+def test_poolmap_max_inflight_bytes(mapper_cls):
+    chain = mapper_cls(
+        iopu.WaitData(),
+        pool_size=4,
+        executor_cls=cf.ThreadPoolExecutor,
+        max_inflight=8,
+        max_inflight_bytes=250,
+        sizer=lambda _: 100,
+    )
+    chain.stats = iop.PoolStats()
+    res = chain.pipe([0.01] * 10)
+    next(res)
+    assert 0 < chain.inflight_bytes <= 250
+    assert len(list(res)) == 9
+
+    # Only two 100-byte elements fit in the budget at once.
+    assert chain.stats.max_inflight == 2
+    assert chain.stats.max_inflight_bytes == 200
+    assert chain.inflight_bytes == 0
+
+
+def test_poolmap_max_inflight_bytes_oversized():
+    chain = iop.PoolMap(
+        _double, pool_size=2, executor_cls=cf.ThreadPoolExecutor, max_inflight_bytes=10
+    )
+    # Elements bigger than the whole budget still go through, one at a time.
+    assert chain.process([1000, 2000]) == [2000, 4000]
+    with pytest.raises(ValueError):
+        iop.PoolMap(_double, max_inflight_bytes=0)
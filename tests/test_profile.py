@@ -0,0 +1,42 @@
+import concurrent.futures as cf
+
+import imchain.operator as iop
+import imchain.operator.util as iopu
+
+
+def test_profile_counts_and_self_time():
+    chain = iop.Map(lambda x: x + 1) | iopu.Wait(0.01) | iop.Filter(lambda x: x % 2 == 0)
+    profile = chain.profile(range(10))
+
+    assert [stage.name for stage in profile.stages] == ["Map", "Wait", "Filter"]
+    assert [(s.items_in, s.items_out) for s in profile.stages] == [(10, 10), (10, 10), (10, 5)]
+
+    _, waited, filtered = profile.stages
+    # Upstream time is excluded, so the Wait dominates.
+    assert waited.self_time >= 0.1
+    assert filtered.self_time < 0.05
+    assert filtered.latency(0.5) >= 0.01
+
+    report = profile.report()
+    assert "Wait" in report
+    assert "wall time" in report
+
+
+def test_profile_early_stop():
+    profile = (iop.Noop() | iop.Take(3)).profile(iter(range(100)))
+    assert profile.stages[0].items_out <= 4
+    assert profile.stages[1].items_out == 3
+
+
+def test_profile_poolmap_stats():
+    pool = iop.PoolMap(iopu.Wait(0.02), pool_size=2, executor_cls=cf.ThreadPoolExecutor)
+    profile = pool.profile(range(10))
+
+    stats = profile.stages[0].pool
+    assert stats.submitted == stats.completed == 10
+    assert stats.max_inflight == 2
+    assert 0.5 < stats.utilization <= 1.0
+    assert "utilization" in profile.report()
+
+    # Instrumentation is removed afterwards.
+    assert pool.stats is None
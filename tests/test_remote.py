@@ -0,0 +1,133 @@
+import concurrent.futures as cf
+import functools
+import multiprocessing
+import time
+
+import pytest
+
+import imchain.operator as iop
+from imchain.operator import pool as iop_pool
+from imchain.operator import remote
+from imchain.operator import util as iopu
+
+
+def _double(x):
+    return 2 * x
+
+
+def _fail(x):
+    msg = f"bad {x}"
+    raise ValueError(msg)
+
+
+def _registry_size(_):
+    return len(iop_pool._WORKER_OPERATORS)
+
+
+def _serve(address, ready):
+    remote.serve(address, ready=ready.put)
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Start two workers on localhost: one on TCP, one on a Unix socket."""
+    ctx = multiprocessing.get_context("fork")
+    ready = ctx.Queue()
+    procs = [
+        ctx.Process(target=_serve, args=(("127.0.0.1", 0), ready), daemon=True),
+        ctx.Process(target=_serve, args=(str(tmp_path / "worker.sock"), ready), daemon=True),
+    ]
+    for proc in procs:
+        proc.start()
+    addresses = [ready.get(timeout=10) for _ in procs]
+    yield [tuple(addr) if isinstance(addr, (tuple, list)) else addr for addr in addresses]
+    for proc in procs:
+        proc.terminate()
+        proc.join()
+
+
+def test_remote_executor(workers):
+    executor = remote.RemoteExecutor(workers)
+    futures = [executor.submit(_double, x) for x in range(20)]
+    assert [fut.result(timeout=10) for fut in futures] == [2 * x for x in range(20)]
+
+    with pytest.raises(ValueError, match="bad 3"):
+        executor.submit(_fail, 3).result(timeout=10)
+    executor.shutdown()
+
+    with pytest.raises(RuntimeError):
+        executor.submit(_double, 1)
+
+
+def test_remote_executor_as_executor_cls(workers):
+    op = iop.PoolMap(
+        _double, executor_cls=functools.partial(iop.RemoteExecutor, workers), chunksize=4
+    )
+    assert op.process(range(50)) == [2 * x for x in range(50)]
+
+
+def test_remote_poolmap_ordered(workers):
+    # The first element is the slowest, but still comes out first.
+    op = iop.RemotePoolMap(iopu.WaitData(), workers)
+    assert op.process([0.2, 0.0, 0.0, 0.0]) == [0.2, 0.0, 0.0, 0.0]
+
+
+def test_remote_poolmap_unordered(workers):
+    # With one chunk queued per worker, nothing waits behind the slow element.
+    op = iop.UnorderedRemotePoolMap(iopu.WaitData(), workers, pipeline=1)
+    start = time.perf_counter()
+    res = op.process([0.3, 0.0, 0.0, 0.0])
+    assert res[-1] == 0.3
+    assert time.perf_counter() - start < 0.6
+
+
+def test_remote_poolmap_reuses_connections(workers):
+    with iop.RemotePoolMap(_double, workers, pipeline=4) as op:
+        assert op.process(range(10)) == [2 * x for x in range(10)]
+        assert op.process(range(3)) == [0, 2, 4]
+
+
+def test_remote_executor_lost_worker(workers):
+    executor = remote.RemoteExecutor(workers[:1])
+    executor._connections[0].close()
+    with pytest.raises(cf.BrokenExecutor):
+        executor.submit(_double, 1).result(timeout=10)
+    executor.shutdown()
+
+    with pytest.raises(ValueError):
+        remote.RemoteExecutor([])
+
+
+def test_remote_executor_worker_dies():
+    ctx = multiprocessing.get_context("fork")
+    ready = ctx.Queue()
+    proc = ctx.Process(target=_serve, args=(("127.0.0.1", 0), ready), daemon=True)
+    proc.start()
+    executor = remote.RemoteExecutor([tuple(ready.get(timeout=10))])
+    assert executor.submit(_double, 1).result(timeout=10) == 2
+
+    proc.terminate()
+    proc.join()
+    executor._connections[0].reader.join(timeout=10)
+    # Tasks submitted after the reader has stopped fail, rather than waiting forever.
+    for x in range(3):
+        with pytest.raises(cf.BrokenExecutor):
+            executor.submit(_double, x).result(timeout=2)
+    executor.shutdown()
+
+
+def test_remote_worker_releases_operators(workers):
+    for _ in range(5):
+        assert iop.RemotePoolMap(_double, workers).process(range(3)) == [0, 2, 4]
+
+    executor = remote.RemoteExecutor(workers)
+    deadline = time.monotonic() + 10
+    while True:
+        # The workers notice the disconnections in their own time.
+        futures = [executor.submit(_registry_size, None) for _ in workers]
+        sizes = [fut.result(timeout=10) for fut in futures]
+        if sizes == [0, 0] or time.monotonic() > deadline:
+            break
+        time.sleep(0.01)
+    executor.shutdown()
+    assert sizes == [0, 0]
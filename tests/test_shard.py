@@ -0,0 +1,105 @@
+import itertools
+import time
+
+import pytest
+
+import imchain.operator as iop
+
+
+def _double(x):
+    return 2 * x
+
+
+def _is_odd(x):
+    return x % 2 == 1
+
+
+def _mod3(x):
+    return x % 3
+
+
+def _fail(x):
+    if x == 5:
+        msg = "boom"
+        raise RuntimeError(msg)
+    return x
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_sharded_pipe_ordered(mode):
+    op = iop.ShardedPipe(iop.Map(_double), shards=3, mode=mode)
+    assert op.process(range(50)) == [2 * x for x in range(50)]
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_sharded_pipe_keeps_state_per_shard(mode):
+    # Round-robin deals the evens to one shard and the odds to the other.
+    op = iop.ShardedPipe(iop.Buffer(2), shards=2, mode=mode)
+    assert op.process(range(8)) == [(0, 2), (1, 3), (4, 6), (5, 7)]
+
+
+def test_sharded_pipe_filters():
+    op = iop.ShardedPipe(iop.Filter(_is_odd) | iop.Map(_double), shards=4, mode="thread")
+    assert op.process(range(100)) == [2 * x for x in range(100) if x % 2]
+
+
+def test_sharded_pipe_by_key():
+    op = iop.ShardedPipe(iop.Take(2), shards=3, key=_mod3, mode="thread")
+    assert sorted(op.process(range(30))) == [0, 1, 2, 3, 4, 5]
+
+
+def test_sharded_pipe_unordered():
+    op = iop.ShardedPipe(iop.Map(_double), shards=3, ordered=False, mode="thread")
+    assert sorted(op.process(range(50))) == [2 * x for x in range(50)]
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_sharded_pipe_close_early(mode):
+    chain = iop.ShardedPipe(iop.Map(_double), shards=2, mode=mode) | iop.Take(3)
+    assert chain.process(itertools.count()) == [0, 2, 4]
+
+
+def test_sharded_pipe_errors():
+    op = iop.ShardedPipe(iop.Map(_fail), shards=2, mode="thread")
+    with pytest.raises(RuntimeError, match="boom"):
+        op.process(range(10))
+
+
+def _slow_first(x):
+    if x == 0:
+        time.sleep(0.3)
+    return x
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_sharded_pipe_backpressure(ordered):
+    pulled = []
+
+    def source():
+        for x in itertools.count():
+            pulled.append(x)
+            yield x
+
+    op = iop.ShardedPipe(iop.Map(_double), shards=2, mode="thread", buffer=2, ordered=ordered)
+    res = op.pipe(source())
+    next(res)
+    time.sleep(0.2)
+    # Queued inputs, unmerged outputs and the ordered window are all bounded.
+    assert len(pulled) < 20
+    res.close()
+
+
+def test_sharded_pipe_slow_shard_holds_back_others():
+    pulled = []
+
+    def source():
+        for x in range(1000):
+            pulled.append(x)
+            yield x
+
+    op = iop.ShardedPipe(iop.Map(_slow_first), shards=2, mode="thread", buffer=2)
+    res = op.pipe(source())
+    assert next(res) == 0
+    # While element 0 was slow, the other shard could only run `shards * (buffer + 1)` ahead.
+    assert len(pulled) < 20
+    assert list(res) == list(range(1, 1000))
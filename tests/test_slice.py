@@ -0,0 +1,102 @@
+import collections
+
+import pytest
+
+import imchain.operator as iop
+
+
+class Unsliceable:
+    """An iterable which records how many elements were pulled from it."""
+
+    def __init__(self, n):
+        self.n = n
+        self.pulled = 0
+
+    def __iter__(self):
+        for i in range(self.n):
+            self.pulled += 1
+            yield i
+
+
+class FrameFile(iop.Seekable):
+    def __init__(self, n):
+        self.n = n
+        self.calls = []
+
+    def __iter__(self):
+        msg = "Expected the source to be sliced, not iterated."
+        raise AssertionError(msg)
+
+    def slice(self, start, stop, step):
+        self.calls.append((start, stop, step))
+        return range(self.n)[start:stop:step]
+
+
+def test_slice_iterables():
+    source = Unsliceable(10)
+    assert iop.Slice(2, 8, 3).process(source) == [2, 5]
+    assert source.pulled == 8
+
+
+def test_slice_sequences():
+    assert (iop.Skip(3) | iop.Take(2)).process(range(10**12)) == [3, 4]
+    assert iop.Take(2).process((5, 6, 7)) == [5, 6]
+    assert iop.Slice(1, None, 2).process([0, 1, 2, 3]) == [1, 3]
+    # Deques are sequences, but can't be sliced.
+    assert iop.Slice(1, None, 2).process(collections.deque([0, 1, 2, 3])) == [1, 3]
+
+
+def test_slice_arrays():
+    np = pytest.importorskip("numpy")
+    frames = np.arange(24).reshape(6, 2, 2)
+    res = iop.Slice(1, 5, 2).process(frames)
+    assert [r[0, 0] for r in res] == [4, 12]
+    assert all(np.shares_memory(r, frames) for r in res)
+
+
+def test_slice_seekable():
+    source = FrameFile(10)
+    assert isinstance(source, iop.Seekable)
+    assert iop.Skip(7).process(source) == [7, 8, 9]
+    assert source.calls == [(7, None, None)]
+
+
+class OffsetSliced:
+    """An iterable whose unrelated `slice` method takes an offset and a length."""
+
+    def __iter__(self):
+        return iter(range(10))
+
+    def slice(self, offset, length):
+        raise AssertionError
+
+
+def test_slice_needs_seekable_opt_in():
+    source = OffsetSliced()
+    assert not isinstance(source, iop.Seekable)
+    assert iop.Slice(2, 8, 3).process(source) == [2, 5]
+
+
+def test_slice_pushdown_past_pure_operators():
+    calls = []
+
+    def double(x):
+        calls.append(x)
+        return 2 * x
+
+    source = FrameFile(100)
+    chain = iop.Map(double, pure=True) | iop.Noop() | iop.Skip(95) | iop.Take(2)
+    assert chain.process(source) == [190, 192]
+    assert calls == [95, 96]
+    assert source.calls == [(95, None, None)]
+
+
+def test_slice_no_pushdown_past_impure_operators():
+    calls = []
+    chain = iop.Map(calls.append) | iop.Skip(3)
+    assert len(chain.process(range(5))) == 2
+    assert calls == [0, 1, 2, 3, 4]
+
+    # Filters change which elements a slice selects.
+    chain = iop.Map(lambda x: x, pure=True) | iop.Filter(lambda x: x % 2) | iop.Take(2)
+    assert chain.process(range(10)) == [1, 3]
@@ -0,0 +1,67 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+import imchain.operator as iop
+import imchain.operator.util as iopu
+
+
+def _double(x):
+    return 2 * x
+
+
+def _fail_on_three(x):
+    if x == 3:
+        raise KeyError(x)
+    return x
+
+
+def test_stages_overlap():
+    chain = iop.Stage(iopu.Wait(0.05)) | iop.Stage(iopu.Wait(0.05))
+
+    start = time.perf_counter()
+    assert chain.process(range(10)) == list(range(10))
+    delta = time.perf_counter() - start
+
+    # Sequentially this takes 1s; with both stages overlapping, ~0.55s.
+    assert delta < 0.8
+
+
+def test_prefetch_is_bounded():
+    pulled = []
+    chain = iop.Effect(pulled.append) | iop.Prefetch(3)
+
+    res = chain.pipe(range(100))
+    assert next(res) == 0
+    time.sleep(0.1)
+    # One yielded, three buffered, and at most one more waiting to be put.
+    assert len(pulled) <= 5
+    res.close()
+
+
+def test_stage_closes_early():
+    threads = threading.active_count()
+    chain = iop.Stage(iop.Map(_double)) | iop.Prefetch(2) | iop.Take(3)
+
+    assert chain.process(itertools.count()) == [0, 2, 4]
+    assert threading.active_count() == threads
+
+
+def test_stage_propagates_errors():
+    chain = iop.Stage(iop.Map(_fail_on_three))
+    with pytest.raises(KeyError):
+        chain.process(range(5))
+
+
+def test_process_stage():
+    chain = iop.Stage(iop.Map(_double), buffer=4, mode="process")
+    assert chain.process(range(20)) == [2 * x for x in range(20)]
+
+    chain = iop.Stage(iop.Map(_double), mode="process") | iop.Take(3)
+    assert chain.process(itertools.count()) == [0, 2, 4]
+
+    chain = iop.Stage(iop.Map(_fail_on_three), mode="process")
+    with pytest.raises(KeyError):
+        chain.process(range(5))
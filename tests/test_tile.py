@@ -0,0 +1,104 @@
+import concurrent.futures as cf
+import tracemalloc
+
+import pytest
+
+import imchain.operator as iop
+
+np = pytest.importorskip("numpy")
+
+
+def _images(*shapes):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for shape in shapes]
+
+
+def test_tile_grid():
+    image = np.arange(10 * 7).reshape(10, 7)
+    tiles = iop.Tile((4, 4), overlap=1).process([image])
+    # Rows start at 0, 3, 6 (flush with the end); columns at 0, 3.
+    assert len(tiles) == 6
+    assert all(tile.shape == (4, 4) for tile in tiles)
+    assert np.shares_memory(tiles[0], image)
+    np.testing.assert_array_equal(tiles[-1], image[6:10, 3:7])
+
+    # An array smaller than the tile is a single tile.
+    (small,) = iop.Tile((16, 16)).process([image])
+    assert small.shape == (10, 7)
+
+    with pytest.raises(ValueError, match="overlap"):
+        iop.Tile((4, 4), overlap=4)
+
+
+@pytest.mark.parametrize("blend", [False, True])
+def test_untile_roundtrip(blend):
+    images = _images((37, 50, 3), (8, 8, 3), (64, 33, 3))
+    tile = iop.Tile((16, 16), overlap=5)
+    chain = tile | iop.Map(lambda t: t // 2) | iop.Untile(tile, blend=blend)
+    outputs = chain.process(images)
+    assert len(outputs) == 3
+    for image, output in zip(images, outputs):
+        assert output.dtype == np.uint8
+        np.testing.assert_array_equal(output, image // 2)
+
+
+def test_untile_poolmap_and_channels():
+    images = _images((100, 90, 3), (30, 20, 3))
+    tile = iop.Tile((32, 32), overlap=4)
+    pool = iop.PoolMap(lambda t: t.mean(axis=-1), pool_size=4, executor_cls=cf.ThreadPoolExecutor)
+    outputs = (tile | pool | iop.Untile(tile)).process(images)
+    for image, output in zip(images, outputs):
+        np.testing.assert_allclose(output, image.mean(axis=-1))
+
+
+def test_untile_blends_seams():
+    # A tile result which depends on the tile, leaving seams unless overlaps blend.
+    image = np.zeros((20, 20))
+    tile = iop.Tile((10, 10), overlap=4)
+    offsets = iter(range(100))
+    op = iop.Map(lambda t: t + next(offsets))
+
+    cropped = (tile | op | iop.Untile(tile)).send(image)
+    assert np.abs(np.diff(cropped, axis=1)).max() >= 1
+
+    offsets = iter(range(100))
+    blended = (tile | op | iop.Untile(tile, blend=True)).send(image)
+    # Across an overlap, the blend moves gradually from one tile's value to the next.
+    assert np.abs(np.diff(blended, axis=1)).max() < 1
+
+
+def test_untile_blend_memory():
+    # Blending holds one row of tiles in floating point, not the whole output.
+    (image,) = _images((2000, 100))
+    tile = iop.Tile((50, 50), overlap=10)
+    untile = iop.Untile(tile, blend=True, allocate=np.zeros)
+    tracemalloc.start()
+    try:
+        (output,) = (tile | untile).process([image])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    np.testing.assert_array_equal(output, image)
+    assert peak < output.nbytes + 10 * 50 * 100 * 4
+
+
+def test_untile_allocate_and_errors(tmp_path):
+    (image,) = _images((40, 40))
+    tile = iop.Tile((16, 16), overlap=2)
+
+    def allocate(shape, dtype):
+        return np.lib.format.open_memmap(tmp_path / "out.npy", "w+", dtype, shape)
+
+    (output,) = (tile | iop.Untile(tile, allocate=allocate)).process([image])
+    assert isinstance(output, np.memmap)
+    np.testing.assert_array_equal(np.load(tmp_path / "out.npy"), image)
+
+    (output,) = (tile | iop.Untile(tile, blend=True, allocate=allocate)).process([image])
+    assert isinstance(output, np.memmap)
+    np.testing.assert_array_equal(np.load(tmp_path / "out.npy"), image)
+
+    with pytest.raises(ValueError, match="tile result"):
+        (tile | iop.Map(lambda t: t[1:]) | iop.Untile(tile)).process([image])
+
+    with pytest.raises(ValueError, match="ended"):
+        (tile | iop.Take(3) | iop.Untile(tile)).process([image])
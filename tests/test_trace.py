@@ -0,0 +1,60 @@
+import concurrent.futures as cf
+import json
+import logging
+import os
+
+import imchain.operator as iop
+import imchain.operator.util as iopu
+
+
+def _double(x):
+    return 2 * x
+
+
+def test_trace_spans_per_element(tmp_path):
+    tracer = iop.Tracer()
+    chain = iop.Map(_double) | iop.Filter(lambda x: x % 4 == 0)
+
+    assert list(chain.trace(range(6), tracer)) == [0, 4, 8]
+
+    names = [span[0] for span in tracer.spans]
+    assert names.count("Map") == 6
+    assert names.count("Filter") == 3
+
+    path = tmp_path / "trace.json"
+    tracer.flush(path, clear=True)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert len(events) == 9
+    assert {event["ph"] for event in events} == {"X"}
+    assert all(event["pid"] == os.getpid() for event in events)
+    assert not tracer.spans
+
+
+def test_trace_ring_buffer_is_bounded():
+    tracer = iop.Tracer(capacity=5)
+    list(iop.Noop().trace(range(100), tracer))
+    assert len(tracer.spans) == 5
+    assert tracer.spans[-1][-1] == {"index": 99}
+
+
+def test_trace_poolmap_workers():
+    tracer = iop.Tracer()
+    pool = iop.PoolMap(_double, pool_size=2, executor_cls=cf.ProcessPoolExecutor)
+    chain = iopu.Wait(0) | pool
+
+    assert list(chain.trace(range(10), tracer)) == [2 * x for x in range(10)]
+    worker_spans = [span for span in tracer.spans if span[0] == "PoolMap[Map]"]
+    assert len(worker_spans) == 10
+    assert {span[3] for span in worker_spans} != {os.getpid()}
+    assert pool.tracer is None
+
+
+def test_trace_poolmap_adaptive_chunksize(caplog):
+    tracer = iop.Tracer()
+    pool = iop.PoolMap(_double, pool_size=2, executor_cls=cf.ThreadPoolExecutor, chunksize="auto")
+
+    with caplog.at_level(logging.ERROR):
+        assert list(pool.trace(range(200), tracer)) == [2 * x for x in range(200)]
+    # Chunks are still sized from the traced results, without errors in callbacks.
+    assert not caplog.records
+    assert len([span for span in tracer.spans if span[0] == "PoolMap[Map]"]) == 200
@@ -0,0 +1,114 @@
+import concurrent.futures as cf
+import gc
+
+import pytest
+
+import imchain.operator as iop
+
+np = pytest.importorskip("numpy")
+
+
+def _negate(x):
+    return -x
+
+
+def _negate_inplace(x):
+    np.negative(x, out=x)
+    return x
+
+
+def _stats(x):
+    return x.shape, float(x.sum())
+
+
+def _frames(n, shape=(64, 64)):
+    return [np.full(shape, i, dtype=np.float64) for i in range(n)]
+
+
+@pytest.mark.parametrize("exec_cls", [cf.ThreadPoolExecutor, cf.ProcessPoolExecutor])
+@pytest.mark.parametrize("func", [_negate, _negate_inplace])
+def test_shared_memory_roundtrip(exec_cls, func):
+    transport = iop.SharedMemoryTransport(min_nbytes=1024)
+    chain = iop.PoolMap(func, pool_size=2, executor_cls=exec_cls, transport=transport)
+
+    res = chain.process(_frames(10))
+    for i, frame in enumerate(res):
+        np.testing.assert_array_equal(frame, np.full((64, 64), -i))
+
+    transport.close()
+
+
+def test_shared_memory_passes_through_small_and_nested():
+    transport = iop.SharedMemoryTransport(min_nbytes=1024)
+    chain = iop.PoolMap(_stats, pool_size=2, transport=transport)
+
+    frames = [*_frames(3), np.zeros(2)]
+    assert chain.process(frames) == [
+        ((64, 64), 0.0),
+        ((64, 64), 4096.0),
+        ((64, 64), 8192.0),
+        ((2,), 0.0),
+    ]
+    transport.close()
+
+
+def test_shared_memory_segments_are_reused():
+    transport = iop.SharedMemoryTransport(min_nbytes=1024)
+    chain = iop.PoolMap(
+        _negate,
+        pool_size=1,
+        max_inflight=1,
+        executor_cls=cf.ThreadPoolExecutor,
+        transport=transport,
+    )
+
+    segments = set()
+    for frame in chain.pipe(_frames(20)):
+        del frame
+        segments.update(shm.name for shm in transport._pool.idle)
+    gc.collect()
+
+    # One chunk at a time needs an input segment, and result segments for the result
+    # being consumed and the next one. After the first frames, no more are created.
+    assert len(segments) == 3
+    assert sorted(shm.name for shm in transport._pool.idle) == sorted(segments)
+    assert not transport._leases
+    transport.close()
+    assert not transport._pool.idle
+
+
+def test_shared_memory_result_outlives_pool():
+    transport = iop.SharedMemoryTransport(min_nbytes=1024)
+    chain = iop.PoolMap(_negate, pool_size=2, transport=transport)
+
+    first = next(iter(chain.process(_frames(3))))
+    idle = len(transport._pool.idle)
+    # Views of a result keep its segment leased.
+    view = first[::2]
+    del first
+    gc.collect()
+    assert len(transport._pool.idle) == idle
+    np.testing.assert_array_equal(view, np.zeros((32, 64)))
+
+
+@pytest.mark.parametrize("mapper_cls", [iop.PoolMap, iop.UnorderedPoolMap])
+def test_shared_memory_close_early(mapper_cls):
+    transport = iop.SharedMemoryTransport(min_nbytes=1024)
+    chain = mapper_cls(
+        _negate,
+        pool_size=2,
+        executor_cls=cf.ProcessPoolExecutor,
+        chunksize=4,
+        transport=transport,
+    )
+
+    results = chain.pipe(_frames(20))
+    assert next(results).shape == (64, 64)
+    results.close()
+    gc.collect()
+
+    # Each segment is pooled once, or it could be leased to two tasks at a time.
+    names = [shm.name for shm in transport._pool.idle]
+    assert len(names) == len(set(names))
+    assert not transport._leases
+    transport.close()
@@ -0,0 +1,24 @@
+import time
+
+import pytest
+
+import imchain.operator.util as iopu
+
+
+def test_spin():
+    start = time.perf_counter()
+    assert iopu.Spin(0.05).process([1, 2]) == [1, 2]
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_array_payloads():
+    np = pytest.importorskip("numpy")
+
+    first = list(iopu.random_arrays(2, shape=(4, 4)))
+    second = list(iopu.random_arrays(2, shape=(4, 4)))
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+    assert first[0].shape == (4, 4)
+
+    (arr,) = iopu.MakeArray((2, 3), dtype="float32").process([7])
+    assert arr.dtype == np.float32
+    assert (arr == 7).all()